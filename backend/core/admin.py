@@ -1,6 +1,6 @@
 # core/admin.py
 from django.contrib import admin
-from .models import Cliente, Bot, Servicio, Horario, Reserva
+from .models import Cliente, Bot, Servicio, Horario, Reserva, ResumenReservasDiario
 
 class ClienteAdmin(admin.ModelAdmin):
     list_display = ['nombre_emprendimiento', 'user', 'telefono']
@@ -13,7 +13,7 @@ class BotAdmin(admin.ModelAdmin):
     fields = ['cliente', 'nombre', 'descripcion', 'activo', 'whatsapp_phone_id', 'prompt_sistema']
 
 class ServicioAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'bot', 'precio']
+    list_display = ['nombre', 'bot', 'precio', 'duracion_minutos']
     list_filter = ['bot__cliente']
     search_fields = ['nombre', 'bot__nombre']
 
@@ -23,7 +23,7 @@ class HorarioAdmin(admin.ModelAdmin):
 
 class ReservaAdmin(admin.ModelAdmin):
     list_display = ['bot', 'servicio', 'cliente_final_nombre', 'fecha_hora_inicio', 'estado']
-    list_filter = ['estado', 'bot__cliente', 'fecha_hora_inicio']
+    list_filter = ['estado', 'cliente', 'fecha_hora_inicio']
     search_fields = ['cliente_final_nombre', 'bot__nombre']
     readonly_fields = ['puede_cancelar']
     
@@ -42,9 +42,15 @@ class ReservaAdmin(admin.ModelAdmin):
         })
     )
 
+class ResumenReservasDiarioAdmin(admin.ModelAdmin):
+    list_display = ['bot', 'fecha', 'confirmadas', 'pendientes', 'canceladas', 'ingresos']
+    list_filter = ['cliente', 'fecha']
+    readonly_fields = ['cliente', 'bot', 'fecha', 'confirmadas', 'pendientes', 'canceladas', 'ingresos']
+
 # Registrar los modelos
 admin.site.register(Cliente, ClienteAdmin)
 admin.site.register(Bot, BotAdmin)
 admin.site.register(Servicio, ServicioAdmin)
 admin.site.register(Horario, HorarioAdmin)
 admin.site.register(Reserva, ReservaAdmin)
+admin.site.register(ResumenReservasDiario, ResumenReservasDiarioAdmin)
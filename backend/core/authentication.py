@@ -0,0 +1,84 @@
+# core/authentication.py
+"""
+Autenticación JWT sin consultas para tokens con claims de tenant.
+
+TenantJWTAuthentication arma un UsuarioToken con los claims del token en
+lugar de cargar el User. id, is_staff, is_superuser y cliente_id salen del
+token; cualquier otro atributo del usuario se carga de la base la primera
+vez que se pide. Los tokens sin claims de tenant usan el User de la base.
+Los tokens revocados se rechazan (ver core/revocacion.py); desactivar,
+degradar o eliminar un usuario revoca sus tokens, así que los claims de
+permisos de un token vigente coinciden con los del User.
+"""
+from functools import cached_property
+from django.contrib.auth.models import User
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .models import Cliente
+from . import revocacion
+
+# El mismo error que lanza user.cliente cuando el usuario no tiene cliente
+SinCliente = User.cliente.RelatedObjectDoesNotExist
+
+
+class UsuarioToken:
+    """Usuario perezoso construido a partir de los claims del token"""
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.token = token
+        # simplejwt guarda el id como texto en el claim
+        self.id = self.pk = User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM])
+        self.is_staff = token.get('is_staff', False)
+        self.is_superuser = token.get('is_superuser', False)
+        self.cliente_id = token.get('cliente_id')
+        self.dashboard_type = token.get('dashboard_type')
+
+    @cached_property
+    def usuario(self):
+        """User de la base, cargado solo si se pide un atributo fuera del token"""
+        try:
+            return User.objects.get(pk=self.id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed('Usuario no encontrado', code='user_not_found')
+
+    @cached_property
+    def cliente(self):
+        if self.cliente_id is None:
+            raise SinCliente('El usuario no tiene cliente.')
+        return Cliente.objects.get(pk=self.cliente_id)
+
+    def __getattr__(self, nombre):
+        # Solo se llama para atributos que no están en el token
+        if nombre == 'cliente':
+            raise SinCliente('El usuario no tiene cliente.')
+        if nombre.startswith('_') or nombre == 'token':
+            raise AttributeError(nombre)
+        return getattr(self.usuario, nombre)
+
+    def __eq__(self, otro):
+        return getattr(otro, 'pk', None) == self.pk and isinstance(otro, (User, UsuarioToken))
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return f'UsuarioToken {self.id}'
+
+
+class TenantJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que no consulta la base cuando el token trae los claims de tenant"""
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocacion.token_revocado(token):
+            raise InvalidToken('El token fue revocado')
+        return token
+
+    def get_user(self, validated_token):
+        if 'cliente_id' not in validated_token or api_settings.USER_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        return UsuarioToken(validated_token)
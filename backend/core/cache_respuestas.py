@@ -0,0 +1,112 @@
+# core/cache_respuestas.py
+"""
+Cache de respuestas de los endpoints de dashboard, por rol y cliente.
+
+La clave de cada respuesta incluye el rol del usuario (tipo de dashboard),
+el cliente y la versión de ese cliente en core/colecciones.py; los admins
+usan la versión global. Como las señales incrementan la versión solo del
+cliente que cambió (y la global), una escritura invalida únicamente las
+entradas de ese tenant y las de los admins; las entradas viejas quedan sin
+uso hasta que vence su TTL.
+
+El backend es el alias RESPONSE_CACHE_ALIAS de CACHES (locmem, archivo o
+base de datos) y el TTL de cada vista sale de RESPONSE_CACHE_TTLS.
+"""
+import functools
+import hashlib
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+from . import colecciones
+from .permissions import cliente_id_de
+
+PREFIJO = 'respuestas'
+TTL_POR_DEFECTO = 60
+
+
+class Contadores:
+    """Aciertos y fallos por vista en este proceso"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.vistas = {}
+
+    def sumar(self, vista, acierto):
+        with self.lock:
+            aciertos, fallos = self.vistas.get(vista, (0, 0))
+            self.vistas[vista] = (aciertos + 1, fallos) if acierto else (aciertos, fallos + 1)
+
+    def estadisticas(self):
+        with self.lock:
+            return {
+                vista: {
+                    'hits': aciertos,
+                    'misses': fallos,
+                    'hit_ratio': round(aciertos / (aciertos + fallos), 3),
+                }
+                for vista, (aciertos, fallos) in sorted(self.vistas.items())
+            }
+
+    def reiniciar(self):
+        with self.lock:
+            self.vistas = {}
+
+
+contadores = Contadores()
+
+
+def cache_respuestas():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def ttl(vista):
+    return getattr(settings, 'RESPONSE_CACHE_TTLS', {}).get(vista, TTL_POR_DEFECTO)
+
+
+def clave(vista, request, por_usuario):
+    """Clave de la respuesta: vista, rol, cliente, versión y parámetros"""
+    from .dashboard_views import get_dashboard_type
+
+    user = request.user
+    rol = get_dashboard_type(user)
+    cliente_id = None if user.is_staff else cliente_id_de(user)
+    alcance = cliente_id if cliente_id is not None else colecciones.GLOBAL
+    partes = [PREFIJO, vista, rol, str(alcance), str(colecciones.version(alcance))]
+    if por_usuario:
+        partes.append(str(user.pk))
+    consulta = request.META.get('QUERY_STRING', '')
+    if consulta:
+        partes.append(hashlib.blake2b(consulta.encode(), digest_size=8).hexdigest())
+    return ':'.join(partes)
+
+
+def cacheada(vista, por_usuario=False):
+    """
+    Decorador de vistas @api_view de solo lectura: guarda los datos de las
+    respuestas 200 por rol y cliente. Con `por_usuario` la clave incluye
+    además el usuario, para respuestas con sus datos personales.
+    Debe ir debajo de @api_view para que la autenticación y los permisos se
+    apliquen también a los aciertos.
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(request, *args, **kwargs):
+            if request.method != 'GET':
+                return funcion(request, *args, **kwargs)
+
+            backend = cache_respuestas()
+            clave_respuesta = clave(vista, request, por_usuario)
+            data = backend.get(clave_respuesta)
+            if data is not None:
+                contadores.sumar(vista, True)
+                return Response(data, status=status.HTTP_200_OK)
+
+            contadores.sumar(vista, False)
+            response = funcion(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                backend.set(clave_respuesta, response.data, ttl(vista))
+            return response
+        return envoltura
+    return decorador
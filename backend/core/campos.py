@@ -0,0 +1,141 @@
+# core/campos.py
+"""
+Selección de campos (sparse fieldsets) con ?fields= y ?exclude=.
+
+Los serializers con CamposDinamicosMixin quitan los campos no pedidos y
+CamposDinamicosViewMixin restringe el queryset con .only() a las columnas
+que esos campos necesitan, así las columnas no pedidas (por ejemplo
+prompt_sistema o descripcion) ni se leen de la base ni se serializan.
+
+Las columnas de cada campo se deducen de su `source`; los campos calculados
+declaran las suyas en `Meta.columnas` del serializer.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from .medicion import SerializacionMedida
+
+PARAM_FIELDS = 'fields'
+PARAM_EXCLUDE = 'exclude'
+
+
+def nombres(valor):
+    return [nombre.strip() for nombre in (valor or '').split(',') if nombre.strip()]
+
+
+def seleccion(request, disponibles):
+    """
+    Campos a incluir, en el orden de `disponibles`, según ?fields= y
+    ?exclude=; None si no se pidió una selección. Los nombres desconocidos
+    retornan 400.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    incluir = nombres(request.query_params.get(PARAM_FIELDS))
+    excluir = nombres(request.query_params.get(PARAM_EXCLUDE))
+    if not incluir and not excluir:
+        return None
+    desconocidos = (set(incluir) | set(excluir)) - set(disponibles)
+    if desconocidos:
+        raise ValidationError({PARAM_FIELDS: f"Campos desconocidos: {', '.join(sorted(desconocidos))}"})
+    return [
+        nombre for nombre in disponibles
+        if (not incluir or nombre in incluir) and nombre not in excluir
+    ]
+
+
+def columnas_orden(queryset):
+    """Columnas por las que ordena el queryset (las necesita el cursor de paginación)"""
+    orden = queryset.query.order_by or (
+        queryset.query.get_meta().ordering if queryset.query.default_ordering else ()
+    )
+    columnas = {campo.lstrip('-') for campo in orden if isinstance(campo, str)}
+    return columnas - set(queryset.query.annotations)
+
+
+def columnas(serializer, campos):
+    """
+    Retorna (lookups, relaciones): los lookups de modelo que necesitan los
+    `campos` del serializer y las relaciones a cargar completas con
+    select_related. None si algún campo no permite deducirlo.
+    """
+    model = serializer.Meta.model
+    declaradas = getattr(serializer.Meta, 'columnas', {})
+    fields = serializer.fields
+    lookups = {model._meta.pk.name}
+    relaciones = set()
+    for nombre in campos:
+        if nombre in declaradas:
+            lookups.update(declaradas[nombre])
+            continue
+        field = fields[nombre]
+        if field.source == '*':
+            return None
+        partes = field.source_attrs
+        try:
+            model_field = model._meta.get_field(partes[0])
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete:
+            # Relaciones inversas: las carga un prefetch, no el SELECT principal
+            continue
+        lookups.add('__'.join(partes))
+        if len(partes) == 1 and isinstance(field, serializers.BaseSerializer):
+            relaciones.add(partes[0])
+    return lookups, relaciones
+
+
+def restringir(queryset, lookups, relaciones=()):
+    """
+    Aplica .only() con los lookups y las columnas de orden, conservando
+    solo los select_related que esos lookups recorren
+    """
+    lookups = set(lookups) | columnas_orden(queryset)
+    recorridas = {lookup.rsplit('__', 1)[0] for lookup in lookups if '__' in lookup}
+    recorridas |= set(relaciones)
+    queryset = queryset.select_related(None)
+    if recorridas:
+        queryset = queryset.select_related(*recorridas)
+    return queryset.only(*lookups)
+
+
+class CamposDinamicosMixin(SerializacionMedida):
+    """
+    Serializer que respeta ?fields= y ?exclude= del request del contexto.
+    Su tiempo de serialización se suma al Server-Timing del request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = seleccion(self.context.get('request'), list(self.fields))
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+
+class CamposDinamicosViewMixin:
+    """
+    Mixin de ViewSet: en list y retrieve restringe el queryset a las
+    columnas de los campos pedidos
+    """
+    acciones_campos = ('list', 'retrieve')
+
+    def campos_pedidos(self):
+        """Campos pedidos para el serializer de la acción, o None"""
+        if not hasattr(self, '_campos_pedidos'):
+            self._campos_pedidos = None
+            if self.action in self.acciones_campos:
+                self._campos_pedidos = seleccion(
+                    self.request, list(self.get_serializer_class()().fields)
+                )
+        return self._campos_pedidos
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        campos = self.campos_pedidos()
+        if campos is None:
+            return queryset
+        requeridas = columnas(self.get_serializer_class()(), campos)
+        if requeridas is None:
+            return queryset
+        return restringir(queryset, *requeridas)
@@ -0,0 +1,124 @@
+# core/colecciones.py
+"""
+ETags de los listados de bots, servicios y reservas.
+
+Cada cliente tiene un contador de versión en el cache de Django que las
+señales de Bot, Servicio, Reserva, Horario y Cliente incrementan; los admins,
+que ven todo, usan un contador global que se incrementa con cualquier
+cambio. El ETag de un listado sale de esa versión y de la URL pedida, así
+que un If-None-Match vigente se responde con 304 leyendo solo el cache, sin
+consultas SQL.
+
+Igual que en core/contexto_bot.py, con varios procesos CACHES debe apuntar a
+un backend compartido.
+"""
+import hashlib
+import time
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from .models import Bot
+from .permissions import cliente_id_de
+
+PREFIJO_VERSION = 'colecciones:version'
+GLOBAL = 'global'
+
+
+def clave_version(alcance):
+    return f'{PREFIJO_VERSION}:{alcance}'
+
+
+def version_inicial():
+    # Basada en el reloj para que un contador perdido del cache no reaparezca
+    # con un valor que coincida con un ETag ya entregado
+    return time.time_ns() // 1000
+
+
+def incrementar(alcance):
+    clave = clave_version(alcance)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.add(clave, version_inicial(), timeout=None)
+
+
+def invalidar(cliente_id):
+    """Invalida los listados del cliente (si hay) y los de los admins"""
+    if cliente_id is not None:
+        incrementar(cliente_id)
+    incrementar(GLOBAL)
+
+
+def invalidar_bot(bot_id):
+    """Invalida los listados del cliente dueño del bot"""
+    invalidar(Bot.objects.filter(pk=bot_id).values_list('cliente_id', flat=True).first())
+
+
+def version(alcance):
+    clave = clave_version(alcance)
+    actual = cache.get(clave)
+    if actual is None:
+        cache.add(clave, version_inicial(), timeout=None)
+        actual = cache.get(clave)
+    return actual
+
+
+def etag_listado(request, vigencia=None, variante=None):
+    """
+    ETag del listado pedido para el usuario del request. Con `vigencia`
+    (segundos) el ETag cambia además cada ese intervalo, para campos que
+    dependen de la hora como Reserva.puede_cancelar. `variante` agrega al
+    ETag un valor resuelto en el servidor que no está en la URL (p. ej. el
+    mes actual por defecto).
+    """
+    if request.user.is_staff:
+        alcance = GLOBAL
+    else:
+        alcance = cliente_id_de(request.user)
+    partes = [
+        str(alcance), str(version(alcance)) if alcance is not None else '',
+        request.get_full_path(), request.headers.get('Accept', ''),
+    ]
+    if vigencia:
+        partes.append(str(int(time.time() // vigencia)))
+    if variante is not None:
+        partes.append(str(variante))
+    return '"%s"' % hashlib.blake2b('\n'.join(partes).encode(), digest_size=16).hexdigest()
+
+
+class ETagListadoMixin:
+    """
+    Mixin de ViewSet: el `list` entrega un ETag por versión del cliente y
+    responde 304 a un If-None-Match vigente antes de armar el queryset. Con
+    `Cache-Control: no-cache` el navegador revalida cada vez con el ETag.
+    """
+    vigencia_etag = None
+
+    def list(self, request, *args, **kwargs):
+        return self.condicional(
+            request, lambda: super(ETagListadoMixin, self).list(request, *args, **kwargs), self.vigencia_etag
+        )
+
+    def condicional(self, request, generar, vigencia=None, variante=None):
+        """
+        Responde 304 si el If-None-Match sigue vigente y, si no, la respuesta
+        de `generar()` con su ETag. Sirve también para acciones de solo
+        lectura que dependen de las mismas colecciones.
+        """
+        etag = etag_listado(request, vigencia, variante)
+        pedidos = {e.removeprefix('W/') for e in parse_etags(request.headers.get('If-None-Match', ''))}
+        if etag in pedidos or '*' in pedidos:
+            return self.con_etag(HttpResponse(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        response = generar()
+        if response.status_code == status.HTTP_200_OK:
+            self.con_etag(response, etag)
+        return response
+
+    def con_etag(self, response, etag):
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,194 @@
+# core/contexto_bot.py
+"""
+Contexto de ejecución compilado de un bot, por whatsapp_phone_id.
+
+El agente externo necesita por cada mensaje el prompt, los servicios, los
+horarios y el status del emprendimiento. Se compila una vez a JSON y se
+guarda en un LRU en proceso junto con los contadores de versión del bot y
+del cliente. Las señales de Bot, Servicio, Horario y Cliente incrementan
+esos contadores en el cache de Django, así que un mensaje con el contexto
+vigente se resuelve con una lectura del cache y sin consultas SQL.
+
+Con varios procesos, CACHES debe apuntar a un backend compartido (Redis,
+Memcached) para que la invalidación llegue a todos.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from rest_framework.utils.encoders import JSONEncoder
+from .models import Bot, Horario, Servicio
+
+PREFIJO_VERSION = 'contexto_bot:version'
+
+
+def clave_version(tipo, pk):
+    return f'{PREFIJO_VERSION}:{tipo}:{pk}'
+
+
+def version_inicial():
+    # Basada en el reloj para que un contador perdido del cache no reaparezca
+    # con un valor viejo que coincida con una entrada compilada antes
+    return time.time_ns() // 1000
+
+
+def incrementar(tipo, pk):
+    """Invalida los contextos que dependen de (tipo, pk)"""
+    clave = clave_version(tipo, pk)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.add(clave, version_inicial(), timeout=None)
+
+
+def invalidar_bot(bot_id):
+    incrementar('bot', bot_id)
+
+
+def invalidar_cliente(cliente_id):
+    incrementar('cliente', cliente_id)
+
+
+def versiones(bot_id, cliente_id):
+    """Lee (version_bot, version_cliente) en una sola ida al cache"""
+    claves = [clave_version('bot', bot_id), clave_version('cliente', cliente_id)]
+    actuales = cache.get_many(claves)
+    faltantes = {clave: version_inicial() for clave in claves if clave not in actuales}
+    if faltantes:
+        for clave, valor in faltantes.items():
+            cache.add(clave, valor, timeout=None)
+        actuales = cache.get_many(claves)
+    return tuple(actuales.get(clave) for clave in claves)
+
+
+class ContextoLRU:
+    """LRU en proceso: phone_id -> (bot_id, cliente_id, versiones, json)"""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.entradas = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, phone_id):
+        with self.lock:
+            entrada = self.entradas.get(phone_id)
+            if entrada is not None:
+                self.entradas.move_to_end(phone_id)
+            return entrada
+
+    def set(self, phone_id, entrada):
+        with self.lock:
+            self.entradas[phone_id] = entrada
+            self.entradas.move_to_end(phone_id)
+            while len(self.entradas) > self.maximo:
+                self.entradas.popitem(last=False)
+
+    def contar(self, acierto):
+        """Suma un acierto o un fallo bajo el mismo lock que el LRU"""
+        with self.lock:
+            if acierto:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def pop(self, phone_id):
+        with self.lock:
+            self.entradas.pop(phone_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entradas.clear()
+            self.hits = self.misses = 0
+
+
+contextos = ContextoLRU(getattr(settings, 'BOT_CONTEXT_CACHE_SIZE', 1024))
+
+
+def compilar(bot, version):
+    """Arma el contexto del bot (con servicios y horarios precargados) como JSON"""
+    dias = dict(Horario.DIA_CHOICES)
+    contexto = {
+        'version': version,
+        'bot': {
+            'id': bot.id,
+            'nombre': bot.nombre,
+            'descripcion': bot.descripcion,
+            'prompt_sistema': bot.prompt_sistema,
+            'whatsapp_phone_id': bot.whatsapp_phone_id,
+            'activo': bot.activo,
+            'bloqueado': bot.bloqueado,
+            'esta_operativo': bot.esta_operativo,
+        },
+        'cliente': {
+            'id': bot.cliente.id,
+            'nombre_emprendimiento': bot.cliente.nombre_emprendimiento,
+            'telefono': bot.cliente.telefono,
+            'status': bot.cliente.status,
+        },
+        'servicios': [
+            {
+                'id': servicio.id,
+                'nombre': servicio.nombre,
+                'descripcion': servicio.descripcion,
+                'precio': str(servicio.precio),
+                'duracion_minutos': servicio.duracion_minutos,
+            }
+            for servicio in bot.servicios.all()
+        ],
+        'horarios': [
+            {
+                'dia_semana': horario.dia_semana,
+                'dia': dias[horario.dia_semana],
+                'hora_inicio': horario.hora_inicio,
+                'hora_fin': horario.hora_fin,
+            }
+            for horario in bot.horarios.all()
+        ],
+    }
+    return json.dumps(contexto, cls=JSONEncoder, ensure_ascii=False).encode('utf-8')
+
+
+def obtener_contexto(phone_id):
+    """
+    Retorna (bot_id, cliente_id, version, json) del bot con ese phone_id,
+    o None si no existe. Con la entrada vigente en el LRU no consulta la base.
+    """
+    entrada = contextos.get(phone_id)
+    if entrada is not None:
+        bot_id, cliente_id, version, _ = entrada
+        if versiones(bot_id, cliente_id) == version:
+            contextos.contar(True)
+            return entrada
+
+    contextos.contar(False)
+    bot_ids = list(
+        Bot.objects.filter(whatsapp_phone_id=phone_id).values_list('id', 'cliente_id')[:1]
+    )
+    if not bot_ids:
+        contextos.pop(phone_id)
+        return None
+
+    # La versión se lee antes de compilar: un cambio concurrente deja la
+    # entrada con una versión vieja y el próximo mensaje la recompila
+    bot_id, cliente_id = bot_ids[0]
+    version = versiones(bot_id, cliente_id)
+    bot = (
+        Bot.objects.select_related('cliente')
+        .prefetch_related(
+            Prefetch('servicios', queryset=Servicio.objects.order_by('nombre', 'id')),
+            Prefetch('horarios', queryset=Horario.objects.order_by('dia_semana', 'hora_inicio')),
+        )
+        .filter(pk=bot_id).first()
+    )
+    if bot is None or bot.whatsapp_phone_id != phone_id:
+        contextos.pop(phone_id)
+        return None
+
+    entrada = (bot.id, bot.cliente_id, version, compilar(bot, '%d.%d' % version))
+    contextos.set(phone_id, entrada)
+    return entrada
@@ -5,11 +5,23 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Cliente, Bot, Reserva
+from django.conf import settings
+from django.utils import timezone
+from django.urls import reverse
+from .models import Cliente, Bot, Servicio, Reserva
+from . import listados, stats as dashboard_stats
+from .campos import nombres
+from .permissions import cliente_id_de
+from .serializers import UserSerializer, ClienteSerializer
+from .views import ReservaPagination, filtrar_por_fechas
+from .tokens import TenantRefreshToken
+from . import cache_respuestas, metricas, revocacion
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 import json
 
 
@@ -17,9 +29,13 @@ def get_dashboard_type(user):
     """
     Determina el tipo de dashboard según el tipo de usuario
     """
+    # Los usuarios autenticados por token ya lo traen en sus claims
+    tipo = getattr(user, 'dashboard_type', None)
+    if tipo:
+        return tipo
     if user.is_superuser or user.is_staff:
         return 'admin_dashboard'
-    elif hasattr(user, 'cliente'):
+    elif cliente_id_de(user) is not None:
         return 'emprendimiento_dashboard'
     else:
         return 'limited_dashboard'
@@ -46,9 +62,8 @@ def dashboard_login(request):
             # Determinar tipo de dashboard
             dashboard_type = get_dashboard_type(user)
             
-            # Generar tokens JWT
-            from rest_framework_simplejwt.tokens import RefreshToken
-            refresh = RefreshToken.for_user(user)
+            # Generar tokens JWT con los claims del tenant
+            refresh = TenantRefreshToken.for_user(user)
             
             return Response({
                 'access': str(refresh.access_token),
@@ -75,11 +90,19 @@ def dashboard_login(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_respuestas.cacheada('dashboard_config', por_usuario=True)
 def get_dashboard_config(request):
     """
     Retorna la configuración del dashboard según el tipo de usuario
     """
-    user = request.user
+    return Response(configuracion_dashboard(request.user), status=status.HTTP_200_OK)
+
+
+def configuracion_dashboard(user, cliente=None):
+    """
+    Configuración del dashboard según el tipo de usuario. `cliente` evita
+    volver a cargar el perfil cuando ya se tiene.
+    """
     dashboard_type = get_dashboard_type(user)
     
     config = {
@@ -124,9 +147,10 @@ def get_dashboard_config(request):
     
     elif dashboard_type == 'emprendimiento_dashboard':
         # Configuración para usuario emprendimiento
-        cliente = user.cliente
-        user_bots = Bot.objects.filter(cliente=cliente)
-        user_reservations = Reserva.objects.filter(bot__cliente=cliente)
+        if cliente is None:
+            cliente = user.cliente
+        bots = dashboard_stats.bots_stats(Bot.objects.filter(cliente=cliente))
+        reservas = dashboard_stats.reservas_stats(Reserva.objects.filter(cliente=cliente))
         
         config.update({
             'cliente_info': {
@@ -142,10 +166,10 @@ def get_dashboard_config(request):
                 'client_stats'
             ],
             'stats': {
-                'total_bots': user_bots.count(),
-                'active_bots': user_bots.filter(activo=True).count(),
-                'total_reservations': user_reservations.count(),
-                'pending_reservations': user_reservations.filter(estado='Pendiente').count()
+                'total_bots': bots['total'],
+                'active_bots': bots['active'],
+                'total_reservations': reservas['total'],
+                'pending_reservations': reservas['pending']
             },
             'navigation': [
                 {'name': 'Dashboard', 'icon': 'fas fa-tachometer-alt', 'section': 'dashboard'},
@@ -169,18 +193,104 @@ def get_dashboard_config(request):
             'message': 'Tu cuenta tiene acceso limitado. Contacta al administrador para más información.'
         })
     
-    return Response(config, status=status.HTTP_200_OK)
+    return config
+
+
+SECCIONES_BOOTSTRAP = ('me', 'config', 'bots', 'servicios', 'reservas')
+
+
+def del_tenant(queryset, user, cliente_id, campo='cliente_id'):
+    """Restringe el queryset a los datos del cliente, salvo para admins"""
+    if user.is_staff:
+        return queryset
+    if cliente_id is None:
+        return queryset.none()
+    return queryset.filter(**{campo: cliente_id})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_bootstrap(request):
+    """
+    Datos iniciales del dashboard en una sola respuesta: lo mismo que me/,
+    dashboard/config/, bots/, servicios/ y la primera página de reservas/
+    (con sus filtros fecha/desde/hasta y page_size; 'next' apunta a
+    reservas/). ?secciones=config,bots limita las secciones incluidas.
+    """
+    secciones = nombres(request.query_params.get('secciones')) or SECCIONES_BOOTSTRAP
+    desconocidas = set(secciones) - set(SECCIONES_BOOTSTRAP)
+    if desconocidas:
+        return Response({
+            'error': f"Secciones desconocidas: {', '.join(sorted(desconocidas))}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Contexto del tenant compartido por todas las secciones
+    user = request.user
+    cliente_id = cliente_id_de(user)
+    cliente = None
+    if cliente_id is not None and {'me', 'config'} & set(secciones):
+        cliente = Cliente.objects.select_related('user').with_stats().get(pk=cliente_id)
+        user = cliente.user
+
+    data = {}
+    if 'me' in secciones:
+        data['me'] = {
+            'user': UserSerializer(user).data,
+            'cliente': ClienteSerializer(cliente).data if cliente is not None else None,
+        }
+    if 'config' in secciones:
+        data['config'] = configuracion_dashboard(user, cliente)
+    if 'bots' in secciones:
+        listado = listados.ListadoBots()
+        bots = del_tenant(Bot.objects.all(), request.user, cliente_id)
+        data['bots'] = listado.formatear(listado.proyectar(bots))
+    if 'servicios' in secciones:
+        listado = listados.ListadoServicios()
+        servicios = del_tenant(Servicio.objects.order_by('id'), request.user, cliente_id, 'bot__cliente_id')
+        data['servicios'] = listado.formatear(listado.proyectar(servicios))
+    if 'reservas' in secciones:
+        data['reservas'] = primera_pagina_reservas(request, cliente_id)
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
+def primera_pagina_reservas(request, cliente_id):
+    """Primera página de reservas/ con los filtros de fecha del request"""
+    listado = listados.ListadoReservas()
+    reservas = filtrar_por_fechas(
+        del_tenant(Reserva.objects.all(), request.user, cliente_id), request.query_params
+    ).order_by('-fecha_hora_inicio', '-id')
+    paginator = ReservaPagination()
+    page = paginator.paginate_queryset(listado.proyectar(reservas), request)
+
+    # Las páginas siguientes se piden a reservas/ con los mismos filtros
+    params = request.query_params.copy()
+    params.pop('secciones', None)
+    params.pop(paginator.cursor_query_param, None)
+    paginator.base_url = request.build_absolute_uri(reverse('reserva-list'))
+    if params:
+        paginator.base_url += '?' + params.urlencode()
+    return {'next': paginator.get_next_link(), 'results': listado.formatear(page)}
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def dashboard_logout(request):
     """
-    Vista de logout que invalida la sesión
+    Vista de logout que invalida la sesión: revoca el access token usado y,
+    si se envía, el refresh token (y con él los access tokens que emitió)
     """
     try:
-        # En una implementación completa, aquí se invalidaría el refresh token
-        # Por ahora retornamos éxito
+        if request.auth is not None:
+            revocacion.revocar(request.auth)
+        refresh = request.data.get('refresh')
+        if refresh:
+            try:
+                token = TenantRefreshToken(refresh)
+            except TokenError:
+                token = None  # Ya vencido o inválido: no hay nada que revocar
+            if token is not None and str(token.get(api_settings.USER_ID_CLAIM)) == str(request.user.id):
+                revocacion.revocar(token)
         return Response({
             'message': 'Logout exitoso',
             'redirect_to': '/login'
@@ -202,94 +312,57 @@ def admin_dashboard_stats(request):
             'error': 'Acceso denegado'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    from django.contrib.auth.models import User
-    from django.db.models import Count
-    from datetime import datetime, timedelta
-    
-    # Estadísticas generales
-    stats = {
-        'users': {
-            'total': User.objects.count(),
-            'active': User.objects.filter(is_active=True).count(),
-            'superusers': User.objects.filter(is_superuser=True).count(),
-            'staff': User.objects.filter(is_staff=True).count()
-        },
-        'clientes': {
-            'total': Cliente.objects.count(),
-            'with_bots': Cliente.objects.annotate(
-                bot_count=Count('bots')
-            ).filter(bot_count__gt=0).count()
-        },
-        'bots': {
-            'total': Bot.objects.count(),
-            'active': Bot.objects.filter(activo=True).count(),
-            'inactive': Bot.objects.filter(activo=False).count()
-        },
-        'reservations': {
-            'total': Reserva.objects.count(),
-            'confirmed': Reserva.objects.filter(estado='Confirmada').count(),
-            'pending': Reserva.objects.filter(estado='Pendiente').count(),
-            'cancelled': Reserva.objects.filter(estado='Cancelada').count()
-        }
-    }
-    
-    # Estadísticas de tiempo
-    now = datetime.now()
-    last_30_days = now - timedelta(days=30)
-    
-    stats['recent_activity'] = {
-        'new_users_30d': User.objects.filter(date_joined__gte=last_30_days).count(),
-        'new_reservations_30d': Reserva.objects.filter(fecha_hora_inicio__gte=last_30_days).count()
-    }
+    stats = dashboard_stats.admin_stats()
     
     return Response(stats, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_respuestas.cacheada('emprendimiento_dashboard_stats')
 def emprendimiento_dashboard_stats(request):
     """
     Estadísticas específicas para el dashboard de emprendimiento
     """
-    if not hasattr(request.user, 'cliente'):
+    cliente_id = cliente_id_de(request.user)
+    if cliente_id is None:
         return Response({
             'error': 'Usuario sin perfil de cliente'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    cliente = request.user.cliente
-    user_bots = Bot.objects.filter(cliente=cliente)
-    user_reservations = Reserva.objects.filter(bot__cliente=cliente)
+    now = timezone.now()
     
-    from datetime import datetime, timedelta
-    now = datetime.now()
-    this_month = now.replace(day=1)
-    last_month = (this_month - timedelta(days=1)).replace(day=1)
-    
-    stats = {
-        'bots': {
-            'total': user_bots.count(),
-            'active': user_bots.filter(activo=True).count(),
-            'inactive': user_bots.filter(activo=False).count()
-        },
-        'reservations': {
-            'total': user_reservations.count(),
-            'confirmed': user_reservations.filter(estado='Confirmada').count(),
-            'pending': user_reservations.filter(estado='Pendiente').count(),
-            'cancelled': user_reservations.filter(estado='Cancelada').count(),
-            'this_month': user_reservations.filter(
-                fecha_hora_inicio__gte=this_month
-            ).count(),
-            'last_month': user_reservations.filter(
-                fecha_hora_inicio__gte=last_month,
-                fecha_hora_inicio__lt=this_month
-            ).count()
-        },
-        'upcoming_reservations': user_reservations.filter(
-            fecha_hora_inicio__gt=now,
-            estado__in=['Confirmada', 'Pendiente']
-        ).order_by('fecha_hora_inicio')[:5].values(
-            'id', 'fecha_hora_inicio', 'estado', 'servicio__nombre'
-        )
-    }
+    stats = dashboard_stats.emprendimiento_stats(cliente_id, now=now)
+    stats['upcoming_reservations'] = list(Reserva.objects.filter(
+        cliente_id=cliente_id,
+        fecha_hora_inicio__gt=now,
+        estado__in=['Confirmada', 'Pendiente']
+    ).order_by('fecha_hora_inicio')[:5].values(
+        'id', 'fecha_hora_inicio', 'estado', 'servicio__nombre'
+    ))
     
-    return Response(stats, status=status.HTTP_200_OK)
\ No newline at end of file
+    return Response(stats, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def response_cache_stats(request):
+    """
+    Aciertos y fallos del cache de respuestas por vista en este proceso
+    """
+    return Response({
+        'backend': getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default'),
+        'ttls': getattr(settings, 'RESPONSE_CACHE_TTLS', {}),
+        'views': cache_respuestas.contadores.estadisticas(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@renderer_classes([metricas.PrometheusRenderer])
+def metrics(request):
+    """
+    Requests, latencias, consultas SQL y cache de respuestas por vista en
+    formato de texto de Prometheus, sumando todos los procesos
+    """
+    return Response(metricas.exposicion(), content_type='text/plain; version=0.0.4; charset=utf-8')
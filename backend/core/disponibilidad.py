@@ -0,0 +1,130 @@
+# core/disponibilidad.py
+"""
+Motor de disponibilidad de turnos.
+
+Construye los intervalos de apertura de un bot a partir de sus Horarios y les
+resta las reservas activas del rango con un barrido sobre listas ordenadas.
+El costo depende de los días y reservas del rango, no del historial completo.
+"""
+from datetime import datetime, timedelta
+from django.utils import timezone
+from .models import Horario, Reserva
+
+# Estados que ocupan el turno
+ESTADOS_OCUPADOS = ('Confirmada', 'Pendiente')
+
+# Margen para encontrar reservas que empiezan antes del rango y lo solapan
+MARGEN_RESERVAS = timedelta(days=1)
+
+
+def horario_semanal(bot):
+    """
+    Retorna un dict {dia_semana: [(hora_inicio, hora_fin), ...]} ordenado,
+    con una sola consulta a Horario
+    """
+    semana = {dia: [] for dia, _ in Horario.DIA_CHOICES}
+    for dia, inicio, fin in (
+        Horario.objects.filter(bot=bot)
+        .order_by('dia_semana', 'hora_inicio')
+        .values_list('dia_semana', 'hora_inicio', 'hora_fin')
+    ):
+        semana[dia].append((inicio, fin))
+    return semana
+
+
+def fusionar(intervalos):
+    """Une intervalos ordenados por inicio que se solapan o se tocan"""
+    fusionados = []
+    for inicio, fin in intervalos:
+        if fusionados and inicio <= fusionados[-1][1]:
+            if fin > fusionados[-1][1]:
+                fusionados[-1] = (fusionados[-1][0], fin)
+        else:
+            fusionados.append((inicio, fin))
+    return fusionados
+
+
+def aperturas(semana, desde, hasta):
+    """
+    Retorna los intervalos de apertura (datetimes aware, ordenados y sin
+    solapamientos) entre las fechas `desde` y `hasta` inclusive. Un horario
+    con hora_fin <= hora_inicio cierra al día siguiente.
+    """
+    intervalos = []
+    fecha = desde
+    while fecha <= hasta:
+        for hora_inicio, hora_fin in semana.get(fecha.weekday(), ()):
+            inicio = timezone.make_aware(datetime.combine(fecha, hora_inicio))
+            fin_fecha = fecha if hora_fin > hora_inicio else fecha + timedelta(days=1)
+            fin = timezone.make_aware(datetime.combine(fin_fecha, hora_fin))
+            intervalos.append((inicio, fin))
+        fecha += timedelta(days=1)
+    intervalos.sort()
+    return fusionar(intervalos)
+
+
+def restar_intervalos(abiertos, ocupados):
+    """
+    Resta los intervalos `ocupados` de los `abiertos`. Ambas listas deben
+    estar ordenadas por inicio y `abiertos` no debe tener solapamientos.
+    Recorre cada lista una vez salvo por ocupados que cruzan dos aperturas.
+    """
+    libres = []
+    j = 0
+    for inicio, fin in abiertos:
+        while j < len(ocupados) and ocupados[j][1] <= inicio:
+            j += 1
+        cursor = inicio
+        k = j
+        while k < len(ocupados) and ocupados[k][0] < fin:
+            ocupado_inicio, ocupado_fin = ocupados[k]
+            if ocupado_inicio > cursor:
+                libres.append((cursor, ocupado_inicio))
+            cursor = max(cursor, ocupado_fin)
+            k += 1
+        if cursor < fin:
+            libres.append((cursor, fin))
+    return libres
+
+
+def reservas_ocupadas(bot, inicio, fin, excluir=None):
+    """
+    Intervalos (inicio, fin) ordenados de las reservas activas del bot que
+    solapan [inicio, fin). El filtro por fecha_hora_inicio usa el índice
+    (bot, fecha_hora_inicio).
+    """
+    queryset = Reserva.objects.filter(
+        bot=bot,
+        estado__in=ESTADOS_OCUPADOS,
+        fecha_hora_inicio__gte=inicio - MARGEN_RESERVAS,
+        fecha_hora_inicio__lt=fin,
+        fecha_hora_fin__gt=inicio,
+    )
+    if excluir is not None:
+        queryset = queryset.exclude(pk=excluir)
+    return list(
+        queryset.order_by('fecha_hora_inicio').values_list('fecha_hora_inicio', 'fecha_hora_fin')
+    )
+
+
+def turnos_libres(bot, desde, hasta, duracion, ahora=None):
+    """
+    Retorna la lista de turnos libres (inicio, fin) de `duracion` para el bot
+    entre las fechas `desde` y `hasta` inclusive. Los turnos se alinean al
+    inicio de cada tramo libre y se omiten los que ya comenzaron.
+    """
+    abiertos = aperturas(horario_semanal(bot), desde, hasta)
+    if not abiertos:
+        return []
+
+    ocupados = reservas_ocupadas(bot, abiertos[0][0], abiertos[-1][1])
+    ahora = ahora or timezone.now()
+
+    turnos = []
+    for inicio, fin in restar_intervalos(abiertos, ocupados):
+        turno = inicio
+        while turno + duracion <= fin:
+            if turno >= ahora:
+                turnos.append((turno, turno + duracion))
+            turno += duracion
+    return turnos
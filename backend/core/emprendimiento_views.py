@@ -12,6 +12,9 @@ from .serializers import (
     BotSerializer, BotDetailSerializer, BotManagementSerializer,
     UserSerializer
 )
+from . import cache_respuestas, colecciones, contexto_bot, exportar as exportacion, stats as dashboard_stats
+from .campos import CamposDinamicosViewMixin
+from .idempotencia import idempotente
 from django.core.exceptions import ValidationError
 from datetime import datetime, timedelta
 from django.utils import timezone
@@ -24,7 +27,7 @@ class EmprendimientoPagination(PageNumberPagination):
     max_page_size = 50
 
 
-class EmprendimientoViewSet(viewsets.ModelViewSet):
+class EmprendimientoViewSet(CamposDinamicosViewMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión completa de emprendimientos desde superusuario
     """
@@ -42,7 +45,14 @@ class EmprendimientoViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Aplica filtros según los parámetros de consulta"""
-        queryset = Cliente.objects.all()
+        queryset = Cliente.objects.select_related('user')
+        
+        # Contadores calculados en SQL para las acciones de lectura
+        if self.action in ('list', 'retrieve', 'profile', 'exportar'):
+            queryset = queryset.with_stats()
+        campos = self.campos_pedidos()
+        if self.action in ('retrieve', 'profile') and (campos is None or 'bots' in campos):
+            queryset = queryset.with_bots_detalle()
         
         # Filtros
         status_filter = self.request.query_params.get('status', None)
@@ -163,6 +173,9 @@ class EmprendimientoViewSet(viewsets.ModelViewSet):
         # Si se suspende o inactiva, desactivar todos sus bots
         if new_status in ['suspendido', 'inactivo']:
             cliente.bots.update(activo=False)
+            # update() no dispara señales
+            contexto_bot.invalidar_cliente(cliente.id)
+            colecciones.invalidar(cliente.id)
         
         return Response({
             'message': f'Status cambiado de {old_status} a {new_status}',
@@ -203,6 +216,22 @@ class EmprendimientoViewSet(viewsets.ModelViewSet):
                 'error': 'El límite de bots debe ser un número entero válido'
             }, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exporta todos los emprendimientos en CSV o NDJSON según ?formato=,
+        con los mismos filtros y orden que el listado
+        """
+        columnas = [
+            ('id', 'id'), ('nombre_emprendimiento', 'nombre_emprendimiento'),
+            ('username', 'user__username'), ('email', 'user__email'),
+            ('telefono', 'telefono'), ('status', 'status'),
+            ('max_bots_allowed', 'max_bots_allowed'), ('cantidad_bots', 'num_bots'),
+            ('cantidad_reservas', 'num_reservas'), ('fecha_registro', 'fecha_registro'),
+            ('fecha_ultimo_acceso', 'fecha_ultimo_acceso'),
+        ]
+        return exportacion.exportar(request, self.get_queryset(), columnas, 'emprendimientos')
+
     @action(detail=True, methods=['get'])
     def profile(self, request, pk=None):
         """Obtiene el perfil completo del emprendimiento"""
@@ -214,11 +243,12 @@ class EmprendimientoViewSet(viewsets.ModelViewSet):
     def bots(self, request, pk=None):
         """Lista los bots del emprendimiento"""
         cliente = self.get_object()
-        bots = cliente.bots.all()
+        bots = Bot.objects.with_detalle().filter(cliente=cliente)
         serializer = BotDetailSerializer(bots, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
+    @idempotente
     def create_bot(self, request, pk=None):
         """Crea un nuevo bot para el emprendimiento"""
         cliente = self.get_object()
@@ -245,46 +275,37 @@ class EmprendimientoViewSet(viewsets.ModelViewSet):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
+@cache_respuestas.cacheada('emprendimientos_stats')
 def emprendimientos_stats(request):
     """
     Estadísticas generales de emprendimientos para el dashboard de admin
     """
-    total_emprendimientos = Cliente.objects.count()
-    emprendimientos_activos = Cliente.objects.filter(status='activo').count()
-    emprendimientos_suspendidos = Cliente.objects.filter(status='suspendido').count()
-    emprendimientos_inactivos = Cliente.objects.filter(status='inactivo').count()
-    
-    # Estadísticas de tiempo
     now = timezone.now()
     ultimo_mes = now - timedelta(days=30)
-    nuevos_ultimo_mes = Cliente.objects.filter(fecha_registro__gte=ultimo_mes).count()
+    clientes = dashboard_stats.clientes_stats(desde=ultimo_mes)
+    total_bots = Bot.objects.count()
     
     # Promedio de bots por emprendimiento
-    from django.db.models import Avg
-    promedio_bots = Cliente.objects.aggregate(
-        avg_bots=Avg('bots__id')
-    )['avg_bots'] or 0
+    promedio_bots = total_bots / clientes['total'] if clientes['total'] else 0
     
     # Top emprendimientos por reservas
-    top_emprendimientos = Cliente.objects.annotate(
-        total_reservas=Count('bots__reservas')
-    ).order_by('-total_reservas')[:5]
+    top_emprendimientos = Cliente.objects.with_stats().order_by('-num_reservas')[:5]
     
     top_data = []
     for emp in top_emprendimientos:
         top_data.append({
             'id': emp.id,
             'nombre': emp.nombre_emprendimiento,
-            'total_reservas': emp.total_reservas,
-            'cantidad_bots': emp.cantidad_bots
+            'total_reservas': emp.num_reservas,
+            'cantidad_bots': emp.num_bots
         })
     
     return Response({
-        'total_emprendimientos': total_emprendimientos,
-        'emprendimientos_activos': emprendimientos_activos,
-        'emprendimientos_suspendidos': emprendimientos_suspendidos,
-        'emprendimientos_inactivos': emprendimientos_inactivos,
-        'nuevos_ultimo_mes': nuevos_ultimo_mes,
+        'total_emprendimientos': clientes['total'],
+        'emprendimientos_activos': clientes['activo'],
+        'emprendimientos_suspendidos': clientes['suspendido'],
+        'emprendimientos_inactivos': clientes['inactivo'],
+        'nuevos_ultimo_mes': clientes['nuevos'],
         'promedio_bots': round(promedio_bots, 1),
         'top_emprendimientos': top_data
     })
@@ -301,12 +322,12 @@ def bot_management(request, cliente_id, bot_id=None):
     if request.method == 'GET':
         if bot_id:
             # Obtener bot específico
-            bot = get_object_or_404(Bot, id=bot_id, cliente=cliente)
+            bot = get_object_or_404(Bot.objects.with_detalle(), id=bot_id, cliente=cliente)
             serializer = BotDetailSerializer(bot)
             return Response(serializer.data)
         else:
             # Listar todos los bots del emprendimiento
-            bots = cliente.bots.all()
+            bots = Bot.objects.with_detalle().filter(cliente=cliente)
             serializer = BotDetailSerializer(bots, many=True)
             return Response(serializer.data)
     
@@ -0,0 +1,106 @@
+# core/exportar.py
+"""
+Exportación en streaming de listados completos en CSV o NDJSON.
+
+Las filas se leen con .values_list().iterator(chunk_size=...) y se escriben
+a medida que llegan en una StreamingHttpResponse, así que la memoria no
+depende de la cantidad de filas y el encabezado sale antes de ejecutar la
+consulta.
+"""
+import csv
+import datetime
+import decimal
+import json
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from .listados import fecha_iso
+
+PARAM_FORMATO = 'formato'
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+CHUNK_SIZE_POR_DEFECTO = 2000
+# Inicios de celda que una planilla interpreta como fórmula (inyección CSV)
+INICIOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Eco:
+    """Pseudo archivo para csv.writer: write() retorna la línea en vez de guardarla"""
+
+    def write(self, valor):
+        return valor
+
+
+def formato_pedido(request):
+    formato = request.query_params.get(PARAM_FORMATO, 'csv')
+    if formato not in FORMATOS:
+        raise ValidationError({PARAM_FORMATO: f"Formato inválido. Use {' o '.join(FORMATOS)}."})
+    return formato
+
+
+def valor_texto(valor, zona):
+    """Convierte fechas y decimales a texto; el resto queda igual"""
+    if isinstance(valor, datetime.datetime):
+        return fecha_iso(valor, zona)
+    if isinstance(valor, (datetime.date, decimal.Decimal)):
+        return str(valor)
+    return valor
+
+
+def celda_csv(valor, zona):
+    """Como valor_texto, pero neutraliza el texto que una planilla tomaría por fórmula"""
+    if isinstance(valor, str) and valor.startswith(INICIOS_FORMULA):
+        return "'" + valor
+    return valor_texto(valor, zona)
+
+
+def en_bloques(lineas, lote):
+    """Agrupa las líneas de a `lote`; la primera sale sola para no demorar el inicio"""
+    lineas = iter(lineas)
+    primera = next(lineas, None)
+    if primera is None:
+        return
+    yield primera
+    bloque = []
+    for linea in lineas:
+        bloque.append(linea)
+        if len(bloque) >= lote:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+def lineas_csv(encabezados, filas, zona):
+    escritor = csv.writer(Eco())
+    yield escritor.writerow(encabezados)
+    for fila in filas:
+        yield escritor.writerow([celda_csv(valor, zona) for valor in fila])
+
+
+def lineas_ndjson(encabezados, filas, zona):
+    for fila in filas:
+        registro = dict(zip(encabezados, (valor_texto(valor, zona) for valor in fila)))
+        yield json.dumps(registro, ensure_ascii=False) + '\n'
+
+
+def exportar(request, queryset, columnas, nombre):
+    """
+    StreamingHttpResponse con el queryset exportado en el formato pedido en
+    ?formato= (csv por defecto). `columnas` es una lista de pares
+    (encabezado, lookup de values_list).
+    """
+    formato = formato_pedido(request)
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', CHUNK_SIZE_POR_DEFECTO)
+    encabezados = [encabezado for encabezado, _ in columnas]
+    filas = queryset.values_list(*(lookup for _, lookup in columnas)).iterator(chunk_size=chunk_size)
+    lineas = lineas_csv if formato == 'csv' else lineas_ndjson
+    response = StreamingHttpResponse(
+        en_bloques(lineas(encabezados, filas, timezone.get_current_timezone()), chunk_size),
+        content_type=FORMATOS[formato],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return response
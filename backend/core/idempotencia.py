@@ -0,0 +1,143 @@
+# core/idempotencia.py
+"""
+Soporte del header Idempotency-Key para endpoints de creación.
+
+La clave se reserva en ClaveIdempotencia (sin status) antes de ejecutar la
+vista y al terminar se completa con la respuesta (status < 500); un 5xx o
+una excepción la liberan. Los reintentos con la misma clave, usuario, ruta
+y método reciben la respuesta guardada con una sola búsqueda indexada, sin volver a
+escribir; si la primera petición sigue en curso reciben 409 sin ejecutar la
+vista. Reusar la clave con otro cuerpo retorna 422.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from .models import ClaveIdempotencia
+
+HEADER = 'Idempotency-Key'
+MAX_LARGO_CLAVE = 255
+# Vigencia de una reserva sin completar (p. ej. si el proceso murió a mitad)
+VIGENCIA_EN_CURSO = timedelta(minutes=1)
+
+
+def ttl():
+    return getattr(settings, 'IDEMPOTENCY_KEY_TTL', timedelta(hours=24))
+
+
+def huella(request):
+    """SHA-256 del cuerpo de la petición"""
+    return hashlib.sha256(request.body or b'').hexdigest()
+
+
+def idempotente(vista):
+    """
+    Decorador para métodos de ViewSet que crean recursos. Sin header, o con
+    un usuario anónimo, la vista se ejecuta normalmente.
+    """
+    @wraps(vista)
+    def wrapper(self, request, *args, **kwargs):
+        clave = request.headers.get(HEADER)
+        if not clave or not request.user.is_authenticated:
+            return vista(self, request, *args, **kwargs)
+        if len(clave) > MAX_LARGO_CLAVE:
+            return Response(
+                {'error': f'{HEADER} no puede superar {MAX_LARGO_CLAVE} caracteres'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        firma = huella(request)
+        guardada = vigentes(request, clave).first()
+        reservada = None
+        if guardada is None:
+            reservada, guardada = reservar(request, clave, firma)
+        if guardada is not None:
+            return reenviar(guardada, firma)
+
+        try:
+            response = vista(self, request, *args, **kwargs)
+        except APIException as exc:
+            # Los errores de validación y conflictos también se reenvían
+            response = self.handle_exception(exc)
+        except Exception:
+            reservada.delete()
+            raise
+        if response.status_code < 500:
+            completar(reservada, response)
+        else:
+            reservada.delete()
+        return response
+
+    return wrapper
+
+
+def vigentes(request, clave):
+    return ClaveIdempotencia.objects.filter(
+        usuario_id=request.user.pk, clave=clave, ruta=request.path, metodo=request.method,
+        expira__gt=timezone.now()
+    )
+
+
+def reenviar(guardada, firma):
+    """Respuesta para un reintento de una clave ya reservada"""
+    if guardada.huella != firma:
+        return Response(
+            {'error': f'{HEADER} ya usada con otro cuerpo de petición'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if guardada.status_code is None:
+        return Response(
+            {'error': f'Hay una petición en curso con este {HEADER}; reintenta en unos segundos'},
+            status=status.HTTP_409_CONFLICT
+        )
+    response = Response(guardada.respuesta, status=guardada.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def reservar(request, clave, firma):
+    """
+    Reserva la clave antes de ejecutar la vista, reemplazando solo una clave
+    vencida con el mismo nombre. Retorna (reservada, None), o (None, guardada)
+    si una petición concurrente la reservó primero.
+    """
+    try:
+        with transaction.atomic():
+            ClaveIdempotencia.objects.filter(
+                usuario_id=request.user.pk, clave=clave, ruta=request.path, metodo=request.method,
+                expira__lte=timezone.now()
+            ).delete()
+            reservada = ClaveIdempotencia.objects.create(
+                usuario_id=request.user.pk,
+                clave=clave,
+                ruta=request.path,
+                metodo=request.method,
+                huella=firma,
+                expira=timezone.now() + VIGENCIA_EN_CURSO,
+            )
+    except IntegrityError:
+        return None, ClaveIdempotencia.objects.filter(
+            usuario_id=request.user.pk, clave=clave, ruta=request.path, metodo=request.method
+        ).first()
+    return reservada, None
+
+
+def completar(reservada, response):
+    """Guarda la respuesta en la clave reservada"""
+    reservada.status_code = response.status_code
+    reservada.respuesta = json.loads(json.dumps(response.data, cls=JSONEncoder))
+    reservada.expira = timezone.now() + ttl()
+    reservada.save(update_fields=['status_code', 'respuesta', 'expira'])
+
+
+def purgar_vencidas():
+    """Elimina las claves vencidas; retorna cuántas se eliminaron"""
+    eliminadas, _ = ClaveIdempotencia.objects.filter(expira__lte=timezone.now()).delete()
+    return eliminadas
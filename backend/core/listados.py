@@ -0,0 +1,257 @@
+# core/listados.py
+"""
+Serialización rápida de listados a partir de proyecciones .values().
+
+Cada Listado arma los dicts de un listado directamente desde las filas de
+.values(), con los nombres relacionados resueltos en el mismo SELECT, sin
+instanciar modelos ni pasar por los campos de DRF. La salida reproduce la
+del ModelSerializer correspondiente (mismas claves, orden y formato), así
+que la respuesta JSON es idéntica byte a byte.
+
+Con ?fields= / ?exclude= la proyección lee solo las columnas de los campos
+pedidos (`columnas`) y la salida conserva solo esos campos.
+"""
+import decimal
+from abc import ABC, abstractmethod
+from django.db.models import OuterRef
+from django.utils import timezone
+from rest_framework.response import Response
+from .campos import CamposDinamicosViewMixin, columnas_orden
+from .medicion import serializando
+from .models import Reserva, Servicio, _subquery_count
+
+
+def fecha_iso(valor, zona):
+    """Formatea como DateTimeField de DRF con DATETIME_FORMAT ISO 8601"""
+    if not valor:
+        return None
+    valor = valor.astimezone(zona).isoformat()
+    if valor.endswith('+00:00'):
+        valor = valor[:-6] + 'Z'
+    return valor
+
+
+def decimal_texto(valor, campo):
+    """Formatea como DecimalField de DRF con COERCE_DECIMAL_TO_STRING"""
+    if valor is None:
+        return ''
+    if not isinstance(valor, decimal.Decimal):
+        valor = decimal.Decimal(str(valor).strip())
+    contexto = decimal.getcontext().copy()
+    contexto.prec = campo.max_digits
+    return f'{valor.quantize(decimal.Decimal(".1") ** campo.decimal_places, context=contexto):f}'
+
+
+class FilaParcial(dict):
+    """Fila de una proyección parcial: las columnas no leídas valen None"""
+
+    def __missing__(self, clave):
+        return None
+
+
+class Listado(ABC):
+    """
+    Base de los listados rápidos. `columnas` indica las columnas de
+    .values() que necesita cada campo de salida y `fila()` arma el dict de
+    salida de una fila.
+    """
+    columnas = {}
+
+    @property
+    def campos(self):
+        """Proyección completa"""
+        return tuple(dict.fromkeys(c for cols in self.columnas.values() for c in cols))
+
+    def campos_de(self, queryset, campos):
+        """Proyección para los campos de salida pedidos (o todos)"""
+        if campos is None:
+            return self.campos
+        pedidas = {'id'} | columnas_orden(queryset)
+        for campo in campos:
+            pedidas.update(self.columnas[campo])
+        return tuple(c for c in self.campos if c in pedidas) + tuple(pedidas - set(self.campos))
+
+    def proyectar(self, queryset, campos=None):
+        """Convierte el queryset de la vista en la proyección .values()"""
+        return queryset.prefetch_related(None).values(*self.campos_de(queryset, campos))
+
+    def contexto(self, filas, campos=None):
+        """Datos compartidos por todas las filas del lote"""
+        return {'zona': timezone.get_current_timezone()}
+
+    def formatear(self, filas, campos=None):
+        filas = list(filas)
+        contexto = self.contexto(filas, campos)
+        with serializando():
+            if campos is None:
+                return [self.fila(fila, contexto) for fila in filas]
+            resultado = []
+            for fila in filas:
+                data = self.fila(FilaParcial(fila), contexto)
+                resultado.append({campo: data[campo] for campo in campos if campo in data})
+            return resultado
+
+    @abstractmethod
+    def fila(self, fila, contexto):
+        """Dict de salida de una fila de .values()"""
+
+
+class ListadoReservas(Listado):
+    """Equivalente a ReservaSerializer"""
+    columnas = {
+        'id': ('id',),
+        'bot': ('bot_id',),
+        'bot_nombre': ('bot__nombre',),
+        'servicio': ('servicio_id',),
+        'servicio_nombre': ('servicio_id', 'servicio__nombre'),
+        'cliente_nombre': ('cliente__nombre_emprendimiento',),
+        'cliente_final_nombre': ('cliente_final_nombre',),
+        'cliente_final_telefono': ('cliente_final_telefono',),
+        'fecha_hora_inicio': ('fecha_hora_inicio',),
+        'fecha_hora_fin': ('fecha_hora_fin',),
+        'estado': ('estado',),
+        'puede_cancelar': ('fecha_hora_inicio',),
+        'notas': ('notas',),
+    }
+
+    def contexto(self, filas, campos=None):
+        contexto = super().contexto(filas, campos)
+        # Reserva.puede_cancelar: faltan más de 24 horas para el inicio
+        contexto['limite_cancelacion'] = timezone.now() + Reserva.ANTICIPACION_CANCELACION
+        return contexto
+
+    def fila(self, fila, contexto):
+        zona = contexto['zona']
+        data = {
+            'id': fila['id'],
+            'bot': fila['bot_id'],
+            'bot_nombre': fila['bot__nombre'],
+            'servicio': fila['servicio_id'],
+        }
+        # Sin servicio DRF omite el campo de origen punteado
+        if fila['servicio_id'] is not None:
+            data['servicio_nombre'] = fila['servicio__nombre']
+        data.update({
+            'cliente_nombre': fila['cliente__nombre_emprendimiento'],
+            'cliente_final_nombre': fila['cliente_final_nombre'],
+            'cliente_final_telefono': fila['cliente_final_telefono'],
+            'fecha_hora_inicio': fecha_iso(fila['fecha_hora_inicio'], zona),
+            'fecha_hora_fin': fecha_iso(fila['fecha_hora_fin'], zona),
+            'estado': fila['estado'],
+            'puede_cancelar': (
+                fila['fecha_hora_inicio'] is not None
+                and contexto['limite_cancelacion'] < fila['fecha_hora_inicio']
+            ),
+            'notas': fila['notas'],
+        })
+        return data
+
+
+class ListadoServicios(Listado):
+    """Equivalente a ServicioSerializer"""
+    columnas = {
+        'id': ('id',),
+        'nombre': ('nombre',),
+        'descripcion': ('descripcion',),
+        'precio': ('precio',),
+        'duracion_minutos': ('duracion_minutos',),
+        'bot': ('bot_id',),
+        'bot_nombre': ('bot__nombre',),
+    }
+    campo_precio = Servicio._meta.get_field('precio')
+
+    def fila(self, fila, contexto):
+        return {
+            'id': fila['id'],
+            'nombre': fila['nombre'],
+            'descripcion': fila['descripcion'],
+            'precio': decimal_texto(fila['precio'], self.campo_precio),
+            'duracion_minutos': fila['duracion_minutos'],
+            'bot': fila['bot_id'],
+            'bot_nombre': fila['bot__nombre'],
+        }
+
+
+class ListadoBots(Listado):
+    """Equivalente a BotSerializer, con los servicios en una consulta por lote"""
+    columnas = {
+        'id': ('id',),
+        'nombre': ('nombre',),
+        'descripcion': ('descripcion',),
+        'activo': ('activo',),
+        'bloqueado': ('bloqueado',),
+        'prompt_sistema': ('prompt_sistema',),
+        'whatsapp_phone_id': ('whatsapp_phone_id',),
+        'servicios': (),
+        'total_reservas': ('num_reservas',),
+        'cliente': ('cliente_id',),
+        'cliente_nombre': ('cliente__nombre_emprendimiento',),
+        'esta_operativo': ('activo', 'bloqueado', 'cliente__status'),
+        'reservas_pendientes': ('num_reservas_pendientes',),
+        'fecha_creacion': ('fecha_creacion',),
+        'fecha_modificacion': ('fecha_modificacion',),
+    }
+    servicios = ListadoServicios()
+
+    def proyectar(self, queryset, campos=None):
+        proyeccion = self.campos_de(queryset, campos)
+        reservas = Reserva.objects.filter(bot=OuterRef('pk'))
+        anotaciones = {
+            'num_reservas': _subquery_count(reservas, 'bot'),
+            'num_reservas_pendientes': _subquery_count(reservas.filter(estado='Pendiente'), 'bot'),
+        }
+        return queryset.prefetch_related(None).annotate(**{
+            nombre: expresion for nombre, expresion in anotaciones.items() if nombre in proyeccion
+        }).values(*proyeccion)
+
+    def contexto(self, filas, campos=None):
+        contexto = super().contexto(filas, campos)
+        servicios = {}
+        if filas and (campos is None or 'servicios' in campos):
+            queryset = Servicio.objects.filter(bot_id__in=[fila['id'] for fila in filas]).order_by('id')
+            for servicio in self.servicios.formatear(queryset.values(*self.servicios.campos)):
+                servicios.setdefault(servicio['bot'], []).append(servicio)
+        contexto['servicios'] = servicios
+        return contexto
+
+    def fila(self, fila, contexto):
+        zona = contexto['zona']
+        return {
+            'id': fila['id'],
+            'nombre': fila['nombre'],
+            'descripcion': fila['descripcion'],
+            'activo': fila['activo'],
+            'bloqueado': fila['bloqueado'],
+            'prompt_sistema': fila['prompt_sistema'],
+            'whatsapp_phone_id': fila['whatsapp_phone_id'],
+            'servicios': contexto['servicios'].get(fila['id'], []),
+            'total_reservas': fila['num_reservas'],
+            'cliente': fila['cliente_id'],
+            'cliente_nombre': fila['cliente__nombre_emprendimiento'],
+            # Bot.esta_operativo
+            'esta_operativo': (
+                fila['activo'] and not fila['bloqueado'] and fila['cliente__status'] == 'activo'
+            ),
+            'reservas_pendientes': fila['num_reservas_pendientes'],
+            'fecha_creacion': fecha_iso(fila['fecha_creacion'], zona),
+            'fecha_modificacion': fecha_iso(fila['fecha_modificacion'], zona),
+        }
+
+
+class ListadoRapidoMixin(CamposDinamicosViewMixin):
+    """
+    Mixin de ViewSet: el `list` usa `listado_rapido` (un Listado) en lugar
+    del serializer. Con `listado_rapido = None` se usa el serializer.
+    """
+    listado_rapido = None
+
+    def list(self, request, *args, **kwargs):
+        if self.listado_rapido is None:
+            return super().list(request, *args, **kwargs)
+
+        campos = self.campos_pedidos()
+        filas = self.listado_rapido.proyectar(self.filter_queryset(self.get_queryset()), campos)
+        page = self.paginate_queryset(filas)
+        if page is not None:
+            return self.get_paginated_response(self.listado_rapido.formatear(page, campos))
+        return Response(self.listado_rapido.formatear(filas, campos))
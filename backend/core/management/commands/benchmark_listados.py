@@ -0,0 +1,91 @@
+# core/management/commands/benchmark_listados.py
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from core import listados
+from core.models import Cliente, Bot, Servicio, Reserva
+from core.serializers import BotSerializer, ReservaSerializer, ServicioSerializer
+
+
+class Rollback(Exception):
+    """Descarta los datos generados para el benchmark"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo de serializar listados con los serializers de DRF y "
+        "con los listados rápidos de core.listados sobre datos temporales"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Filas por listado")
+        parser.add_argument('--repeat', type=int, default=3, help="Repeticiones; se toma la mejor")
+
+    def handle(self, *args, **options):
+        self.rows = options['rows']
+        self.repeat = options['repeat']
+        try:
+            with transaction.atomic():
+                self.generar()
+                self.comparar('reservas', Reserva.objects.select_related('servicio', 'bot', 'cliente')
+                              .order_by('-fecha_hora_inicio', '-id'),
+                              ReservaSerializer, listados.ListadoReservas())
+                self.comparar('servicios', Servicio.objects.select_related('bot').order_by('id'),
+                              ServicioSerializer, listados.ListadoServicios())
+                self.comparar('bots', Bot.objects.select_related('cliente').prefetch_related(
+                                  Prefetch('servicios', queryset=Servicio.objects.order_by('id'))),
+                              BotSerializer, listados.ListadoBots())
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def generar(self):
+        user = User.objects.create_user(username='benchmark_listados')
+        cliente = Cliente.objects.create(user=user, nombre_emprendimiento='Benchmark')
+        bots = Bot.objects.bulk_create(
+            Bot(cliente=cliente, nombre=f'Bot {i}', prompt_sistema='Sistema',
+                whatsapp_phone_id=f'benchmark-{i}')
+            for i in range(self.rows)
+        )
+        servicios = Servicio.objects.bulk_create(
+            Servicio(bot=bots[i % len(bots)], nombre=f'Servicio {i}', precio=i % 100)
+            for i in range(self.rows)
+        )
+        inicio = timezone.now()
+        # bulk_create no pasa por Reserva.save: el cliente se asigna explícitamente
+        Reserva.objects.bulk_create(
+            Reserva(bot=bots[i % 10], cliente=cliente, servicio=servicios[i % 10],
+                    cliente_final_nombre=f'Cliente {i}', cliente_final_telefono='000',
+                    fecha_hora_inicio=inicio + timedelta(minutes=i),
+                    fecha_hora_fin=inicio + timedelta(minutes=i + 30))
+            for i in range(self.rows)
+        )
+
+    def medir(self, funcion):
+        mejor = None
+        for _ in range(self.repeat):
+            inicio = time.perf_counter()
+            contenido = funcion()
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return mejor, contenido
+
+    def comparar(self, nombre, queryset, serializer_class, listado):
+        renderer = JSONRenderer()
+        completo, bytes_completo = self.medir(
+            lambda: renderer.render(serializer_class(queryset.all(), many=True).data)
+        )
+        rapido, bytes_rapido = self.medir(
+            lambda: renderer.render(listado.formatear(listado.proyectar(queryset.all())))
+        )
+        if bytes_completo != bytes_rapido:
+            raise CommandError(f"El listado rápido de {nombre} no coincide con el serializer")
+        self.stdout.write(
+            f"{nombre}: {self.rows} filas  serializer {completo * 1000:.0f} ms  "
+            f"rápido {rapido * 1000:.0f} ms  ({completo / rapido:.1f}x)"
+        )
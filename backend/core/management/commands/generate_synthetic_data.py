@@ -0,0 +1,321 @@
+# core/management/commands/generate_synthetic_data.py
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from time import perf_counter
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from core import colecciones
+from core.models import Cliente, Bot, Servicio, Horario, Reserva, ResumenReservasDiario
+
+# Rubros de los emprendimientos: servicios (nombre, precio base, duración en minutos)
+RUBROS = {
+    'Estética': [
+        ('Limpieza Facial', 50000, 60), ('Masaje Relajante', 80000, 60), ('Manicure', 25000, 30),
+        ('Pedicure', 30000, 45), ('Depilación', 40000, 30), ('Peeling', 90000, 90),
+    ],
+    'Barbería': [
+        ('Corte de Cabello', 20000, 30), ('Arreglo de Barba', 15000, 15), ('Corte y Barba', 30000, 45),
+        ('Tinte', 45000, 60), ('Afeitado Clásico', 18000, 30),
+    ],
+    'Odontología': [
+        ('Consulta General', 60000, 30), ('Limpieza Dental', 90000, 45), ('Blanqueamiento', 350000, 90),
+        ('Control de Ortodoncia', 70000, 30), ('Extracción', 150000, 60),
+    ],
+    'Fisioterapia': [
+        ('Evaluación Inicial', 70000, 60), ('Sesión de Rehabilitación', 60000, 45),
+        ('Masaje Deportivo', 75000, 60), ('Electroterapia', 50000, 30),
+    ],
+    'Veterinaria': [
+        ('Consulta Veterinaria', 55000, 30), ('Vacunación', 40000, 15), ('Baño y Peluquería', 45000, 60),
+        ('Desparasitación', 30000, 15), ('Control Post-operatorio', 50000, 30),
+    ],
+}
+NOMBRES = [
+    'María', 'Ana', 'Laura', 'Carmen', 'Sofía', 'Valentina', 'Camila', 'Lucía', 'Isabella', 'Daniela',
+    'Juan', 'Carlos', 'Andrés', 'Santiago', 'Mateo', 'Felipe', 'Diego', 'Sebastián', 'Miguel', 'Jorge',
+]
+APELLIDOS = [
+    'González', 'Rodríguez', 'Martínez', 'Silva', 'López', 'Gómez', 'Pérez', 'Ramírez', 'Torres',
+    'Díaz', 'Vargas', 'Castro', 'Rojas', 'Moreno', 'Herrera', 'Jiménez', 'Ruiz', 'Mendoza',
+]
+NOTAS = ['Primera vez', 'Cliente frecuente', 'Confirmar por WhatsApp', 'Llega 10 minutos antes', 'Regalo']
+
+# Jornadas semanales posibles: días de la semana con sus franjas (hora, minuto)
+JORNADAS = [
+    {dia: [((9, 0), (18, 0))] for dia in range(5)},
+    {**{dia: [((9, 0), (18, 0))] for dia in range(5)}, 5: [((9, 0), (13, 0))]},
+    {dia: [((8, 0), (12, 0)), ((14, 0), (19, 0))] for dia in range(6)},
+    {dia: [((10, 0), (20, 0))] for dia in range(1, 7)},
+]
+# Probabilidad de cada estado según la reserva ya haya pasado o no
+ESTADOS_PASADAS = (('Confirmada', 0.85), ('Cancelada', 0.15))
+ESTADOS_FUTURAS = (('Confirmada', 0.6), ('Pendiente', 0.3), ('Cancelada', 0.1))
+CONTEOS = ('bots', 'servicios', 'horarios', 'reservas', 'resumen')
+
+
+def elegir(rng, opciones):
+    """Elige un valor de pares (valor, probabilidad)"""
+    valores, pesos = zip(*opciones)
+    return rng.choices(valores, pesos)[0]
+
+
+def franjas_del_bot(horarios):
+    """{día de la semana: [(minuto de inicio, minuto de fin)]} de los horarios del bot"""
+    franjas = {}
+    for horario in horarios:
+        franjas.setdefault(horario.dia_semana, []).append((
+            horario.hora_inicio.hour * 60 + horario.hora_inicio.minute,
+            horario.hora_fin.hour * 60 + horario.hora_fin.minute,
+        ))
+    return franjas
+
+
+def turnos(rng, franjas, servicios, hasta, necesarios):
+    """
+    Turnos consecutivos (día, minuto de inicio, servicio) dentro de los
+    horarios del bot, recorriendo los días hacia atrás desde `hasta` hasta
+    juntar `necesarios`. Al no solaparse, cualquier subconjunto es válido.
+    """
+    resultado = []
+    dia = hasta
+    sin_turnos = 0
+    # Si en una semana entera no entra ningún servicio, no entrará nunca
+    while len(resultado) < necesarios and sin_turnos < 7:
+        previos = len(resultado)
+        for inicio, fin in franjas.get(dia.weekday(), ()):
+            minuto = inicio
+            while True:
+                servicio = rng.choice(servicios)
+                if minuto + servicio.duracion_minutos > fin:
+                    break
+                resultado.append((dia, minuto, servicio))
+                minuto += servicio.duracion_minutos
+        sin_turnos = sin_turnos + 1 if len(resultado) == previos else 0
+        dia -= timedelta(days=1)
+    return resultado
+
+
+class Generador:
+    """Genera los datos de un emprendimiento con bulk_create en lotes"""
+
+    def __init__(self, opciones, password):
+        self.opciones = opciones
+        self.password = password
+        self.hoy = timezone.localdate()
+        self.conteos = dict.fromkeys(CONTEOS, 0)
+
+    def generar(self, indice):
+        # Cada emprendimiento tiene su propia semilla: el resultado no depende
+        # de la cantidad de procesos ni del orden en que se generan
+        rng = random.Random(f"{self.opciones['seed']}:{indice}")
+        prefijo = self.opciones['prefix']
+        rubro = rng.choice(sorted(RUBROS))
+        cantidad_bots = self.opciones['bots']
+
+        user = User.objects.create(
+            username=f'{prefijo}_{indice:06d}', email=f'{prefijo}_{indice:06d}@example.com',
+            first_name=rng.choice(NOMBRES), last_name=rng.choice(APELLIDOS), password=self.password,
+        )
+        cliente = Cliente.objects.create(
+            user=user, nombre_emprendimiento=f'{rubro} {rng.choice(APELLIDOS)} {indice}',
+            telefono=self.telefono(rng), max_bots_allowed=max(cantidad_bots, 3),
+        )
+        bots = Bot.objects.bulk_create([
+            Bot(
+                cliente=cliente, nombre=f'{rng.choice(NOMBRES)} Bot', activo=rng.random() < 0.9,
+                descripcion=f'Asistente de reservas de {cliente.nombre_emprendimiento}',
+                prompt_sistema=f'Eres el asistente virtual de {cliente.nombre_emprendimiento}. '
+                               f'Ayudas a los clientes a reservar turnos.',
+                whatsapp_phone_id=f'{prefijo}-{indice}-{j}',
+            )
+            for j in range(cantidad_bots)
+        ], batch_size=self.opciones['batch_size'])
+
+        catalogo = RUBROS[rubro]
+        servicios = Servicio.objects.bulk_create([
+            Servicio(
+                bot=bot, nombre=nombre, duracion_minutos=duracion,
+                precio=Decimal(round(precio * rng.uniform(0.8, 1.3), -2)),
+            )
+            for bot in bots
+            for nombre, precio, duracion in rng.sample(catalogo, min(self.opciones['servicios'], len(catalogo)))
+        ], batch_size=self.opciones['batch_size'])
+        horarios = Horario.objects.bulk_create([
+            Horario(bot=bot, dia_semana=dia, hora_inicio=time(*desde), hora_fin=time(*hasta))
+            for bot in bots
+            for dia, franjas in rng.choice(JORNADAS).items()
+            for desde, hasta in franjas
+        ], batch_size=self.opciones['batch_size'])
+
+        por_bot = {bot.id: ([], []) for bot in bots}
+        for servicio in servicios:
+            por_bot[servicio.bot_id][0].append(servicio)
+        for horario in horarios:
+            por_bot[horario.bot_id][1].append(horario)
+        for bot in bots:
+            self.reservas(rng, cliente, bot, *por_bot[bot.id])
+        # bulk_create no dispara las señales que invalidan los listados del cliente
+        colecciones.invalidar(cliente.id)
+
+        self.conteos['bots'] += len(bots)
+        self.conteos['servicios'] += len(servicios)
+        self.conteos['horarios'] += len(horarios)
+
+    def telefono(self, rng):
+        return f'+573{rng.randint(0, 99):02d}{rng.randint(0, 9999999):07d}'
+
+    def reservas(self, rng, cliente, bot, servicios, horarios):
+        """
+        Reservas del bot sobre turnos sin solapamiento, hasta `dias_futuro`
+        días adelante; la historia se extiende hacia atrás lo necesario para
+        que ocupen alrededor de `ocupacion` de los turnos. El resumen diario
+        se arma en memoria, ya que bulk_create no pasa por las señales.
+        """
+        cantidad = self.opciones['reservas']
+        franjas = franjas_del_bot(horarios)
+        if not cantidad or not franjas:
+            return
+        hasta = self.hoy + timedelta(days=self.opciones['dias_futuro'])
+        candidatos = turnos(rng, franjas, servicios, hasta, int(cantidad / self.opciones['ocupacion']))
+        cantidad = min(cantidad, len(candidatos))
+        elegidos = sorted(rng.sample(range(len(candidatos)), cantidad))
+
+        resumen = {}
+        lote = []
+        for posicion in elegidos:
+            dia, minuto, servicio = candidatos[posicion]
+            inicio = timezone.make_aware(datetime.combine(dia, time()) + timedelta(minutes=minuto))
+            estado = elegir(rng, ESTADOS_PASADAS if dia < self.hoy else ESTADOS_FUTURAS)
+            # bulk_create no pasa por Reserva.save: el cliente se asigna explícitamente
+            lote.append(Reserva(
+                bot=bot, cliente=cliente, servicio=servicio, estado=estado,
+                cliente_final_nombre=f'{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}',
+                cliente_final_telefono=self.telefono(rng),
+                fecha_hora_inicio=inicio,
+                fecha_hora_fin=inicio + timedelta(minutes=servicio.duracion_minutos),
+                notas=rng.choice(NOTAS) if rng.random() < 0.2 else '',
+            ))
+            fila = resumen.get(dia)
+            if fila is None:
+                fila = resumen[dia] = ResumenReservasDiario(cliente=cliente, bot=bot, fecha=dia, ingresos=Decimal('0'))
+            if estado == 'Confirmada':
+                fila.confirmadas += 1
+                fila.ingresos += servicio.precio
+            elif estado == 'Pendiente':
+                fila.pendientes += 1
+            else:
+                fila.canceladas += 1
+            if len(lote) >= self.opciones['batch_size']:
+                Reserva.objects.bulk_create(lote)
+                lote = []
+        Reserva.objects.bulk_create(lote)
+        ResumenReservasDiario.objects.bulk_create(resumen.values(), batch_size=self.opciones['batch_size'])
+        self.conteos['reservas'] += cantidad
+        self.conteos['resumen'] += len(resumen)
+
+
+_generador = None
+
+
+def inicializar_proceso(opciones, password):
+    """Cada proceso del pool abre su propia conexión a la base de datos"""
+    global _generador
+    connections.close_all()
+    _generador = Generador(opciones, password)
+
+
+def generar_en_proceso(indice):
+    """Genera un emprendimiento y retorna lo que creó"""
+    _generador.conteos = dict.fromkeys(CONTEOS, 0)
+    _generador.generar(indice)
+    return _generador.conteos
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera emprendimientos sintéticos con bots, servicios, horarios semanales "
+        "y reservas realistas para benchmarks y profiling a escala de producción"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=10, help="Emprendimientos a generar")
+        parser.add_argument('--bots', type=int, default=3, help="Bots por emprendimiento")
+        parser.add_argument('--servicios', type=int, default=4, help="Servicios por bot")
+        parser.add_argument('--reservas', type=int, default=1000, help="Reservas por bot")
+        parser.add_argument('--ocupacion', type=float, default=0.7,
+                            help="Fracción de los turnos disponibles que se reservan (0-1]")
+        parser.add_argument('--dias-futuro', type=int, default=60,
+                            help="Días hacia adelante hasta los que hay reservas")
+        parser.add_argument('--seed', type=int, default=0, help="Semilla; la misma semilla genera los mismos datos")
+        parser.add_argument('--workers', type=int, default=1, help="Procesos que generan en paralelo")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Filas por bulk_create")
+        parser.add_argument('--prefix', default='synthetic', help="Prefijo de usernames y phone ids")
+        parser.add_argument('--start', type=int, default=0,
+                            help="Índice del primer emprendimiento, para agregar datos a una generación previa")
+        parser.add_argument('--password', default='password123', help="Contraseña de los usuarios generados")
+
+    def handle(self, *args, **options):
+        if not 0 < options['ocupacion'] <= 1:
+            raise CommandError("--ocupacion debe estar entre 0 y 1")
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--workers y --batch-size deben ser positivos")
+        if options['servicios'] < 1:
+            raise CommandError("Cada bot necesita al menos un servicio")
+
+        indices = range(options['start'], options['start'] + options['clientes'])
+        usernames = [f"{options['prefix']}_{indice:06d}" for indice in indices]
+        if User.objects.filter(username__in=usernames).exists():
+            raise CommandError(
+                f"Ya existen usuarios con el prefijo '{options['prefix']}' en ese rango; "
+                "usa otro --prefix o --start"
+            )
+
+        claves = ('bots', 'servicios', 'reservas', 'ocupacion',
+                  'dias_futuro', 'seed', 'batch_size', 'prefix')
+        opciones = {clave: options[clave] for clave in claves}
+        # Un solo hash para todos: PBKDF2 por usuario dominaría el tiempo total
+        password = make_password(options['password'])
+
+        inicio = perf_counter()
+        if options['workers'] == 1:
+            generador = Generador(opciones, password)
+            for indice in indices:
+                generador.generar(indice)
+            conteos = generador.conteos
+        else:
+            conteos = self.en_paralelo(indices, opciones, password, options['workers'])
+        duracion = perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generados {len(indices)} emprendimientos, {conteos['bots']} bots, "
+            f"{conteos['servicios']} servicios, {conteos['horarios']} horarios, "
+            f"{conteos['reservas']} reservas y {conteos['resumen']} filas de resumen en {duracion:.1f} s"
+        ))
+        if usernames:
+            self.stdout.write(f"Usuarios: {usernames[0]} .. {usernames[-1]}  contraseña: {options['password']}")
+
+    def en_paralelo(self, indices, opciones, password, workers):
+        """
+        Reparte los emprendimientos entre `workers` procesos, de a uno por
+        tarea. Con SQLite las escrituras se serializan en el lock de la base;
+        lo que se paraleliza es la generación de los datos.
+        """
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError("--workers mayor a 1 requiere una plataforma con fork")
+        # Los procesos hijos no deben compartir la conexión abierta del padre
+        connections.close_all()
+        conteos = dict.fromkeys(CONTEOS, 0)
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+            initializer=inicializar_proceso, initargs=(opciones, password),
+        ) as pool:
+            for parciales in pool.map(generar_en_proceso, indices):
+                for clave, valor in parciales.items():
+                    conteos[clave] += valor
+        return conteos
@@ -0,0 +1,11 @@
+# core/management/commands/purge_idempotency_keys.py
+from django.core.management.base import BaseCommand
+from core.idempotencia import purgar_vencidas
+
+
+class Command(BaseCommand):
+    help = "Elimina las claves de idempotencia vencidas"
+
+    def handle(self, *args, **options):
+        eliminadas = purgar_vencidas()
+        self.stdout.write(self.style.SUCCESS(f"Claves vencidas eliminadas: {eliminadas}"))
@@ -0,0 +1,19 @@
+# core/management/commands/rebuild_resumen_reservas.py
+from django.core.management.base import BaseCommand
+from core.resumen import reconstruir_resumen
+
+
+class Command(BaseCommand):
+    help = "Reconstruye desde cero el resumen diario de reservas usado por los dashboards"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Cantidad de filas de resumen por bulk_create"
+        )
+
+    def handle(self, *args, **options):
+        creadas = reconstruir_resumen(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Resumen reconstruido: {creadas} filas"))
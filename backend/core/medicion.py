@@ -0,0 +1,108 @@
+# core/medicion.py
+"""
+Medición de tiempos por request: SQL, serialización y render.
+
+El middleware panel_admin.middleware.ServerTimingMiddleware crea una
+`Medicion` por request y la deja en una ContextVar; las consultas se miden
+con connection.execute_wrapper y la serialización con `SerializacionMedida`
+(en los serializers con CamposDinamicosMixin) y `serializando()` (en los
+listados rápidos). Fuera de un request medido todo esto es un no-op.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Consultas guardadas por request para el log de requests lentos
+MAX_SQL_REGISTRADAS = 100
+
+_actual = ContextVar('medicion', default=None)
+
+
+class Medicion:
+    """Tiempos acumulados (en segundos) de un request"""
+
+    def __init__(self, guardar_sql=False):
+        self.inicio = time.perf_counter()
+        self.total = 0.0
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.serializacion = 0.0
+        self.serializando_ahora = False
+        self.render = 0.0
+        self.guardar_sql = guardar_sql
+        self.sql = []
+
+    def ejecutar(self, execute, sql, params, many, context):
+        """execute_wrapper: cuenta y mide cada consulta"""
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.tiempo_sql += duracion
+            if self.guardar_sql and len(self.sql) < MAX_SQL_REGISTRADAS:
+                self.sql.append((sql, duracion))
+
+    def terminar(self):
+        self.total = time.perf_counter() - self.inicio
+
+    def server_timing(self):
+        """Valor del header Server-Timing, con duraciones en milisegundos"""
+        return ', '.join([
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.tiempo_sql * 1000:.1f};desc="{self.consultas} consultas"',
+            f'serializer;dur={self.serializacion * 1000:.1f}',
+            f'render;dur={self.render * 1000:.1f}',
+        ])
+
+
+def actual():
+    """Medición del request en curso, o None"""
+    return _actual.get()
+
+
+@contextmanager
+def medir(medicion):
+    """Deja `medicion` como la del request en curso"""
+    token = _actual.set(medicion)
+    try:
+        yield medicion
+    finally:
+        _actual.reset(token)
+
+
+@contextmanager
+def serializando():
+    """Suma el tiempo del bloque a la serialización del request"""
+    medicion = _actual.get()
+    if medicion is None or medicion.serializando_ahora:
+        yield
+        return
+    medicion.serializando_ahora = True
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.serializacion += time.perf_counter() - inicio
+        medicion.serializando_ahora = False
+
+
+class SerializacionMedida:
+    """
+    Mixin de serializer que suma su to_representation a la serialización
+    del request. Los serializers anidados no se cuentan dos veces.
+    """
+
+    def to_representation(self, instance):
+        # Sin contextmanager: se llama una vez por objeto de cada listado
+        medicion = _actual.get()
+        if medicion is None or medicion.serializando_ahora:
+            return super().to_representation(instance)
+        medicion.serializando_ahora = True
+        inicio = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            medicion.serializacion += time.perf_counter() - inicio
+            medicion.serializando_ahora = False
@@ -0,0 +1,292 @@
+# core/metricas.py
+"""
+Métricas agregadas por vista en formato de texto de Prometheus.
+
+Cada proceso acumula, por (nombre de URL, método), los requests por clase
+de status y los histogramas de latencia y de consultas SQL. Los datos los
+registra ServerTimingMiddleware (panel_admin/middleware.py). La memoria es
+fija: histogramas de buckets constantes y a lo sumo METRICS_MAX_SERIES
+series; las vistas que no entran se suman en la serie OTRAS.
+
+Con varios procesos (gunicorn) del mismo host METRICS_DIR apunta a un
+directorio compartido: cada proceso vuelca su estado cada
+METRICS_FLUSH_SECONDS a metricas-<pid>-<inicio>.json, donde <inicio>
+identifica esa ejecución del proceso, y /api/metrics/ suma los archivos de
+los demás al estado en vivo del proceso que atiende el scrape. El scrape
+elimina los archivos de procesos que ya terminaron y los de una ejecución
+previa con el mismo PID, así que un PID reusado no arrastra los contadores
+del proceso anterior.
+"""
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from django.conf import settings
+from rest_framework import renderers
+from . import cache_respuestas
+
+PREFIJO = 'panel'
+LATENCIA_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONSULTAS_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+CLASES_STATUS = ('1xx', '2xx', '3xx', '4xx', '5xx')
+METODOS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+MAX_SERIES_POR_DEFECTO = 500
+FLUSH_POR_DEFECTO = 5
+OTRAS = 'otras'
+SIN_RUTA = 'sin_ruta'
+ARCHIVO_RE = re.compile(r'^metricas-(\d+)-(\d+)\.json$')
+
+
+class Serie:
+    """Contadores de una vista y método"""
+    __slots__ = ('status', 'latencia', 'latencia_suma', 'consultas', 'consultas_suma')
+
+    def __init__(self, datos=None):
+        datos = datos or {}
+        self.status = datos.get('status', [0] * len(CLASES_STATUS))
+        self.latencia = datos.get('latencia', [0] * (len(LATENCIA_BUCKETS) + 1))
+        self.latencia_suma = datos.get('latencia_suma', 0.0)
+        self.consultas = datos.get('consultas', [0] * (len(CONSULTAS_BUCKETS) + 1))
+        self.consultas_suma = datos.get('consultas_suma', 0)
+
+    def observar(self, status_code, duracion, consultas):
+        self.status[min(max(status_code // 100, 1), 5) - 1] += 1
+        self.latencia[bisect_left(LATENCIA_BUCKETS, duracion)] += 1
+        self.latencia_suma += duracion
+        if consultas is None:
+            # Sin REQUEST_TIMING_ENABLED no se cuentan las consultas
+            return
+        self.consultas[bisect_left(CONSULTAS_BUCKETS, consultas)] += 1
+        self.consultas_suma += consultas
+
+    def sumar(self, otra):
+        for propia, ajena in ((self.status, otra.status), (self.latencia, otra.latencia),
+                              (self.consultas, otra.consultas)):
+            for i, valor in enumerate(ajena):
+                propia[i] += valor
+        self.latencia_suma += otra.latencia_suma
+        self.consultas_suma += otra.consultas_suma
+
+    def datos(self):
+        """Copia de los contadores, para volcar o sumar sin el lock"""
+        return {
+            'status': list(self.status),
+            'latencia': list(self.latencia),
+            'latencia_suma': self.latencia_suma,
+            'consultas': list(self.consultas),
+            'consultas_suma': self.consultas_suma,
+        }
+
+
+class Registro:
+    """Series de este proceso; seguro entre threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self.lock:
+            self.pid = os.getpid()
+            self.inicio = time.time_ns()
+            self.series = {}
+            self.ultimo_volcado = time.monotonic()
+
+    def verificar_fork(self):
+        if self.pid != os.getpid():
+            # Proceso hijo de un fork: no hereda los contadores del padre
+            self.reiniciar()
+
+    def observar(self, vista, metodo, status_code, duracion, consultas):
+        self.verificar_fork()
+        metodo = metodo if metodo in METODOS else 'OTRO'
+        with self.lock:
+            clave = (vista or SIN_RUTA, metodo)
+            serie = self.series.get(clave)
+            if serie is None:
+                if len(self.series) >= getattr(settings, 'METRICS_MAX_SERIES', MAX_SERIES_POR_DEFECTO):
+                    clave = (OTRAS, metodo)
+                serie = self.series.setdefault(clave, Serie())
+            serie.observar(status_code, duracion, consultas)
+            volcar = time.monotonic() - self.ultimo_volcado >= getattr(
+                settings, 'METRICS_FLUSH_SECONDS', FLUSH_POR_DEFECTO
+            )
+            if volcar:
+                self.ultimo_volcado = time.monotonic()
+        if volcar and directorio() is not None:
+            try:
+                self.volcar()
+            except OSError:
+                # Las métricas no deben romper el request; se reintenta en el próximo intervalo
+                pass
+
+    def instantanea(self):
+        """Estado del proceso serializable a JSON"""
+        with self.lock:
+            series = [[vista, metodo, serie.datos()] for (vista, metodo), serie in self.series.items()]
+        return {
+            'series': series,
+            'cache': {
+                vista: [valores['hits'], valores['misses']]
+                for vista, valores in cache_respuestas.contadores.estadisticas().items()
+            },
+        }
+
+    def volcar(self):
+        """Escribe la instantánea en el archivo de este proceso (reemplazo atómico)"""
+        carpeta = directorio()
+        carpeta.mkdir(parents=True, exist_ok=True)
+        destino = carpeta / self.archivo()
+        temporal = destino.with_suffix('.tmp')
+        temporal.write_text(json.dumps(self.instantanea()))
+        os.replace(temporal, destino)
+
+    def archivo(self):
+        return f'metricas-{self.pid}-{self.inicio}.json'
+
+
+registro = Registro()
+
+
+def directorio():
+    carpeta = getattr(settings, 'METRICS_DIR', None)
+    return Path(carpeta) if carpeta else None
+
+
+def proceso_vivo(pid):
+    """Indica si hay un proceso con ese PID en este host"""
+    if os.name != 'posix':
+        # En Windows os.kill(pid, 0) termina el proceso
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Existe, pero es de otro usuario
+        return True
+    return True
+
+
+def vigente(archivo):
+    """
+    Indica si el archivo es de otro proceso en ejecución. El de este proceso
+    se omite (se usa el estado en vivo) y los de procesos terminados o de
+    una ejecución previa con este mismo PID se eliminan.
+    """
+    coincidencia = ARCHIVO_RE.match(archivo.name)
+    if coincidencia is None:
+        return False
+    pid, inicio = int(coincidencia.group(1)), int(coincidencia.group(2))
+    if pid == registro.pid and inicio == registro.inicio:
+        return False
+    if pid != registro.pid and proceso_vivo(pid):
+        return True
+    archivo.unlink(missing_ok=True)
+    return False
+
+
+def instantaneas():
+    """La instantánea en vivo de este proceso y las volcadas por los demás"""
+    registro.verificar_fork()
+    resultado = [registro.instantanea()]
+    carpeta = directorio()
+    if carpeta is not None and carpeta.is_dir():
+        for archivo in sorted(carpeta.glob('metricas-*.json')):
+            try:
+                if vigente(archivo):
+                    resultado.append(json.loads(archivo.read_text()))
+            except (OSError, ValueError):
+                # Archivo a medio escribir o borrado entre el glob y la lectura
+                continue
+    return resultado
+
+
+def agregar(lista):
+    """Suma las series y los contadores de cache de varias instantáneas"""
+    series = {}
+    cache = {}
+    for instantanea in lista:
+        for vista, metodo, datos in instantanea['series']:
+            ajena = Serie(datos)
+            if (vista, metodo) in series:
+                series[(vista, metodo)].sumar(ajena)
+            else:
+                series[(vista, metodo)] = ajena
+        for vista, (aciertos, fallos) in instantanea.get('cache', {}).items():
+            previos = cache.get(vista, (0, 0))
+            cache[vista] = (previos[0] + aciertos, previos[1] + fallos)
+    return series, cache
+
+
+def etiqueta(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def etiquetas(**valores):
+    return '{' + ','.join(f'{nombre}="{etiqueta(valor)}"' for nombre, valor in valores.items()) + '}'
+
+
+def histograma(lineas, nombre, buckets, conteos, suma, **valores):
+    acumulado = 0
+    for limite, conteo in zip((*buckets, '+Inf'), conteos):
+        acumulado += conteo
+        lineas.append(f'{nombre}_bucket{etiquetas(**valores, le=limite)} {acumulado}')
+    lineas.append(f'{nombre}_sum{etiquetas(**valores)} {suma}')
+    lineas.append(f'{nombre}_count{etiquetas(**valores)} {acumulado}')
+
+
+def exposicion():
+    """Métricas de todos los procesos en el formato de texto 0.0.4 de Prometheus"""
+    series, cache = agregar(instantaneas())
+    ordenadas = sorted(series.items())
+    requests = f'{PREFIJO}_http_requests_total'
+    latencia = f'{PREFIJO}_http_request_duration_seconds'
+    consultas = f'{PREFIJO}_http_request_queries'
+    lineas = [
+        f'# HELP {requests} Requests por nombre de URL, método y clase de status.',
+        f'# TYPE {requests} counter',
+    ]
+    for (vista, metodo), serie in ordenadas:
+        for clase, conteo in zip(CLASES_STATUS, serie.status):
+            if conteo:
+                lineas.append(f'{requests}{etiquetas(view=vista, method=metodo, status=clase)} {conteo}')
+
+    lineas += [
+        f'# HELP {latencia} Duración de los requests en segundos.',
+        f'# TYPE {latencia} histogram',
+    ]
+    for (vista, metodo), serie in ordenadas:
+        histograma(lineas, latencia, LATENCIA_BUCKETS, serie.latencia, serie.latencia_suma, view=vista, method=metodo)
+
+    lineas += [
+        f'# HELP {consultas} Consultas SQL por request.',
+        f'# TYPE {consultas} histogram',
+    ]
+    for (vista, metodo), serie in ordenadas:
+        histograma(lineas, consultas, CONSULTAS_BUCKETS, serie.consultas, serie.consultas_suma, view=vista, method=metodo)
+
+    for sufijo, indice, ayuda in (('hits', 0, 'Aciertos'), ('misses', 1, 'Fallos')):
+        nombre = f'{PREFIJO}_response_cache_{sufijo}_total'
+        lineas += [
+            f'# HELP {nombre} {ayuda} del cache de respuestas por vista.',
+            f'# TYPE {nombre} counter',
+        ]
+        for vista, valores in sorted(cache.items()):
+            lineas.append(f'{nombre}{etiquetas(view=vista)} {valores[indice]}')
+    return '\n'.join(lineas) + '\n'
+
+
+class PrometheusRenderer(renderers.BaseRenderer):
+    """Entrega el texto tal cual; los errores (401/403) como JSON en texto"""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return json.dumps(data).encode(self.charset)
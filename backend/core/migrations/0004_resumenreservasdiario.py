@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_bot_options_alter_cliente_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenReservasDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('confirmadas', models.IntegerField(default=0)),
+                ('pendientes', models.IntegerField(default=0)),
+                ('canceladas', models.IntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, help_text='Suma de Servicio.precio de las reservas confirmadas', max_digits=12)),
+                ('bot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_reservas', to='core.bot')),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_reservas', to='core.cliente')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de reservas',
+                'verbose_name_plural': 'Resúmenes diarios de reservas',
+                'indexes': [models.Index(fields=['cliente', 'fecha'], name='core_resume_cliente_216228_idx'), models.Index(fields=['fecha'], name='core_resume_fecha_84ab0a_idx')],
+                'unique_together': {('bot', 'fecha')},
+            },
+        ),
+    ]
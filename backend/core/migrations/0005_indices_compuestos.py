@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_resumenreservasdiario'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bot',
+            index=models.Index(fields=['cliente', 'activo'], name='bot_cliente_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bot',
+            index=models.Index(fields=['cliente', '-fecha_creacion'], name='bot_cliente_creacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['bot', 'estado', 'fecha_hora_inicio'], name='reserva_bot_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['-fecha_hora_inicio', '-id'], name='reserva_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicio',
+            index=models.Index(fields=['bot', 'nombre'], name='servicio_bot_nombre_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copiar_cliente_desde_bot(apps, schema_editor):
+    Reserva = apps.get_model('core', 'Reserva')
+    Bot = apps.get_model('core', 'Bot')
+    Reserva.objects.update(
+        cliente_id=Subquery(Bot.objects.filter(pk=OuterRef('bot_id')).values('cliente_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_indices_compuestos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reserva',
+            name='cliente',
+            field=models.ForeignKey(editable=False, help_text='Emprendimiento dueño del bot, copiado del bot al guardar', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservas', to='core.cliente'),
+        ),
+        migrations.RunPython(copiar_cliente_desde_bot, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='reserva',
+            name='cliente',
+            field=models.ForeignKey(editable=False, help_text='Emprendimiento dueño del bot, copiado del bot al guardar', on_delete=django.db.models.deletion.CASCADE, related_name='reservas', to='core.cliente'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['cliente', '-fecha_hora_inicio', '-id'], name='reserva_cliente_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['cliente', 'estado', 'fecha_hora_inicio'], name='reserva_cliente_estado_idx'),
+        ),
+    ]
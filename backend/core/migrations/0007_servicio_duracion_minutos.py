@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_reserva_cliente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicio',
+            name='duracion_minutos',
+            field=models.PositiveIntegerField(default=60, help_text='Duración del servicio en minutos'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_servicio_duracion_minutos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaveIdempotencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=255)),
+                ('ruta', models.CharField(max_length=255)),
+                ('huella', models.CharField(help_text='SHA-256 del cuerpo de la petición', max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('respuesta', models.JSONField(null=True)),
+                ('expira', models.DateTimeField(db_index=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='claves_idempotencia', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Clave de idempotencia',
+                'verbose_name_plural': 'Claves de idempotencia',
+                'unique_together': {('usuario', 'clave', 'ruta')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_tokenrevocado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='claveidempotencia',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(help_text='Vacío mientras la primera petición está en curso', null=True),
+        ),
+    ]
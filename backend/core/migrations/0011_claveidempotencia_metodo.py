@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_claveidempotencia_en_curso'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='claveidempotencia',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='claveidempotencia',
+            name='metodo',
+            field=models.CharField(default='POST', help_text='Método HTTP de la petición', max_length=10),
+            preserve_default=False,
+        ),
+        migrations.AlterUniqueTogether(
+            name='claveidempotencia',
+            unique_together={('usuario', 'clave', 'ruta', 'metodo')},
+        ),
+    ]
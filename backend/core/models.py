@@ -5,8 +5,84 @@ from django.db import models
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.db.models import (
+    Count, OuterRef, Subquery, Q, F, Case, When, Value, Window, Prefetch
+)
+from django.db.models.functions import Coalesce, RowNumber
 from datetime import timedelta
 
+
+def _subquery_count(queryset, campo):
+    """Subconsulta correlacionada que cuenta filas agrupando por `campo`"""
+    conteo = queryset.order_by().values(campo).annotate(c=Count('*')).values('c')
+    return Coalesce(Subquery(conteo, output_field=models.IntegerField()), 0)
+
+
+class ClienteQuerySet(models.QuerySet):
+    def with_stats(self):
+        """
+        Anota los contadores que exponen los serializers de emprendimientos
+        (bots, bots activos, reservas, reservas del mes) para resolverlos en
+        una sola consulta en lugar de un COUNT por fila.
+        """
+        now = timezone.now()
+        inicio_mes = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        bots = Bot.objects.filter(cliente=OuterRef('pk'))
+        reservas = Reserva.objects.filter(cliente=OuterRef('pk'))
+        return self.select_related('user').annotate(
+            num_bots=_subquery_count(bots, 'cliente'),
+            num_bots_activos=_subquery_count(bots.filter(activo=True), 'cliente'),
+            num_reservas=_subquery_count(reservas, 'cliente'),
+            num_reservas_mes_actual=_subquery_count(
+                reservas.filter(fecha_hora_inicio__gte=inicio_mes), 'cliente'
+            ),
+        ).annotate(
+            puede_crear_bot_anotado=Case(
+                When(Q(num_bots__lt=F('max_bots_allowed')) & Q(status='activo'), then=Value(True)),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            )
+        )
+
+    def with_bots_detalle(self):
+        """Precarga los bots con todo lo que muestra BotDetailSerializer"""
+        return self.prefetch_related(
+            Prefetch('bots', queryset=Bot.objects.with_detalle())
+        )
+
+
+# Cantidad de reservas recientes que se muestran por bot
+RESERVAS_RECIENTES_POR_BOT = 5
+
+
+class BotQuerySet(models.QuerySet):
+    def with_detalle(self):
+        """
+        Anota los contadores de reservas y precarga servicios y las últimas
+        reservas de cada bot. Las reservas recientes se limitan por bot con
+        ROW_NUMBER() en una sola consulta, sin importar cuántos bots haya.
+        """
+        reservas = Reserva.objects.filter(bot=OuterRef('pk'))
+        recientes = (
+            Reserva.objects
+            .annotate(fila=Window(
+                RowNumber(),
+                partition_by=F('bot'),
+                order_by=[F('fecha_hora_inicio').desc(), F('id').desc()],
+            ))
+            .filter(fila__lte=RESERVAS_RECIENTES_POR_BOT)
+            .select_related('servicio', 'cliente')
+            .order_by('-fecha_hora_inicio', '-id')
+        )
+        return self.select_related('cliente').annotate(
+            num_reservas=_subquery_count(reservas, 'bot'),
+            num_reservas_pendientes=_subquery_count(reservas.filter(estado='Pendiente'), 'bot'),
+        ).prefetch_related(
+            'servicios',
+            Prefetch('reservas', queryset=recientes, to_attr='reservas_recientes_prefetch'),
+        )
+
+
 class Cliente(models.Model):
     STATUS_CHOICES = [
         ('activo', 'Activo'),
@@ -44,6 +120,8 @@ class Cliente(models.Model):
         help_text="Notas del administrador sobre este emprendimiento"
     )
     
+    objects = ClienteQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-fecha_registro']
         verbose_name = "Emprendimiento"
@@ -62,7 +140,7 @@ class Cliente(models.Model):
     @property
     def cantidad_reservas(self):
         """Retorna la cantidad total de reservas del emprendimiento"""
-        return Reserva.objects.filter(bot__cliente=self).count()
+        return Reserva.objects.filter(cliente=self).count()
     
     @property
     def cantidad_reservas_mes_actual(self):
@@ -71,7 +149,7 @@ class Cliente(models.Model):
         now = timezone.now()
         inicio_mes = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         return Reserva.objects.filter(
-            bot__cliente=self,
+            cliente=self,
             fecha_hora_inicio__gte=inicio_mes
         ).count()
     
@@ -110,11 +188,19 @@ class Bot(models.Model):
     )
     fecha_creacion = models.DateTimeField(auto_now_add=True, null=True)
     fecha_modificacion = models.DateTimeField(auto_now=True, null=True)
+
+    objects = BotQuerySet.as_manager()
     
     class Meta:
         ordering = ['-fecha_creacion']
         verbose_name = "Bot"
         verbose_name_plural = "Bots"
+        indexes = [
+            # Conteos de bots activos por emprendimiento
+            models.Index(fields=['cliente', 'activo'], name='bot_cliente_activo_idx'),
+            # Listado de bots del emprendimiento en su orden por defecto
+            models.Index(fields=['cliente', '-fecha_creacion'], name='bot_cliente_creacion_idx'),
+        ]
     
     @property
     def esta_operativo(self):
@@ -150,6 +236,16 @@ class Servicio(models.Model):
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField(blank=True)
     precio = models.DecimalField(max_digits=10, decimal_places=2)
+    duracion_minutos = models.PositiveIntegerField(
+        default=60,
+        help_text="Duración del servicio en minutos"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bot', 'nombre'], name='servicio_bot_nombre_idx'),
+        ]
+
     def __str__(self): return self.nombre
 
 class Horario(models.Model):
@@ -160,7 +256,17 @@ class Horario(models.Model):
     hora_fin = models.TimeField()
 
 class Reserva(models.Model):
+    # Anticipación mínima para poder cancelar una reserva
+    ANTICIPACION_CANCELACION = timedelta(hours=24)
+
     bot = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name="reservas")
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name="reservas",
+        editable=False,
+        help_text="Emprendimiento dueño del bot, copiado del bot al guardar"
+    )
     servicio = models.ForeignKey(Servicio, on_delete=models.SET_NULL, null=True)
     cliente_final_nombre = models.CharField(max_length=100)
     cliente_final_telefono = models.CharField(max_length=20)
@@ -179,11 +285,107 @@ class Reserva(models.Model):
 
     class Meta:
         unique_together = ('bot', 'fecha_hora_inicio')
+        indexes = [
+            # Reservas de un bot por estado (pendientes, próximas confirmadas)
+            models.Index(fields=['bot', 'estado', 'fecha_hora_inicio'], name='reserva_bot_estado_fecha_idx'),
+            # Listado global paginado por cursor (admin)
+            models.Index(fields=['-fecha_hora_inicio', '-id'], name='reserva_fecha_id_idx'),
+            # Listado paginado por cursor del emprendimiento
+            models.Index(fields=['cliente', '-fecha_hora_inicio', '-id'], name='reserva_cliente_fecha_idx'),
+            # Próximas reservas del emprendimiento por estado
+            models.Index(fields=['cliente', 'estado', 'fecha_hora_inicio'], name='reserva_cliente_estado_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # El emprendimiento se desnormaliza desde el bot para evitar el join
+        if self.bot_id:
+            self.cliente_id = self.bot.cliente_id
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'bot' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'cliente'}
+        super().save(*args, **kwargs)
 
     @property
     def puede_cancelar(self):
-        limite = self.fecha_hora_inicio - timedelta(hours=24)
+        limite = self.fecha_hora_inicio - self.ANTICIPACION_CANCELACION
         return timezone.now() < limite
 
     def __str__(self):
         return f"Reserva {self.servicio.nombre if self.servicio else 'Sin servicio'} - {self.fecha_hora_inicio}"
+
+
+class ResumenReservasDiario(models.Model):
+    """
+    Resumen diario de reservas por bot, mantenido por señales sobre Reserva.
+    Los dashboards lo leen en lugar de recorrer la tabla de reservas.
+    """
+    cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, related_name="resumenes_reservas")
+    bot = models.ForeignKey(Bot, on_delete=models.CASCADE, related_name="resumenes_reservas")
+    fecha = models.DateField()
+    confirmadas = models.IntegerField(default=0)
+    pendientes = models.IntegerField(default=0)
+    canceladas = models.IntegerField(default=0)
+    ingresos = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Suma de Servicio.precio de las reservas confirmadas"
+    )
+
+    class Meta:
+        unique_together = ('bot', 'fecha')
+        indexes = [
+            models.Index(fields=['cliente', 'fecha']),
+            models.Index(fields=['fecha']),
+        ]
+        verbose_name = "Resumen diario de reservas"
+        verbose_name_plural = "Resúmenes diarios de reservas"
+
+    @property
+    def total(self):
+        return self.confirmadas + self.pendientes + self.canceladas
+
+    def __str__(self):
+        return f"{self.bot_id} - {self.fecha}: {self.total} reservas"
+
+
+class ClaveIdempotencia(models.Model):
+    """
+    Respuesta almacenada para un header Idempotency-Key, para reenviarla
+    cuando el cliente reintenta la misma petición
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name="claves_idempotencia")
+    clave = models.CharField(max_length=255)
+    ruta = models.CharField(max_length=255)
+    metodo = models.CharField(max_length=10, help_text="Método HTTP de la petición")
+    huella = models.CharField(max_length=64, help_text="SHA-256 del cuerpo de la petición")
+    status_code = models.PositiveSmallIntegerField(
+        null=True, help_text="Vacío mientras la primera petición está en curso"
+    )
+    respuesta = models.JSONField(null=True)
+    expira = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('usuario', 'clave', 'ruta', 'metodo')
+        verbose_name = "Clave de idempotencia"
+        verbose_name_plural = "Claves de idempotencia"
+
+    def __str__(self):
+        return f"{self.clave} ({self.metodo} {self.ruta})"
+
+
+class TokenRevocado(models.Model):
+    """
+    JTI de un token JWT revocado (logout). La fila se puede eliminar cuando
+    el token vence, porque a partir de ahí ya no autentica.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expira = models.DateTimeField(db_index=True)
+    fecha_revocacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Token revocado"
+        verbose_name_plural = "Tokens revocados"
+
+    def __str__(self):
+        return self.jti
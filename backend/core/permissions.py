@@ -1,6 +1,18 @@
 # core/permissions.py
 from rest_framework import permissions
 
+
+def cliente_id_de(user):
+    """
+    Id del cliente del usuario, o None si no tiene. Con un UsuarioToken sale
+    del token sin consultar la base.
+    """
+    if hasattr(user, 'cliente_id'):
+        return user.cliente_id
+    cliente = getattr(user, 'cliente', None)
+    return cliente.id if cliente is not None else None
+
+
 class IsOwnerOrAdmin(permissions.BasePermission):
     """
     Permiso custom para permitir solo a los dueños de un objeto o a un admin
@@ -12,15 +24,16 @@ class IsOwnerOrAdmin(permissions.BasePermission):
             return True
 
         # Determina el 'dueño' basado en el modelo
-        owner = None
-        if hasattr(obj, 'cliente'): # Para el modelo Bot
-            owner = obj.cliente
-        elif hasattr(obj, 'bot'): # Para Servicio o Reserva
-            owner = obj.bot.cliente
+        owner_id = None
+        if hasattr(obj, 'cliente_id'): # Para Bot y Reserva
+            owner_id = obj.cliente_id
+        elif hasattr(obj, 'bot'): # Para Servicio
+            owner_id = obj.bot.cliente_id
 
         # El usuario logueado debe tener un 'cliente' asociado
-        if not hasattr(request.user, 'cliente'):
+        cliente_id = cliente_id_de(request.user)
+        if cliente_id is None:
             return False
 
         # Compara si el dueño del objeto es el cliente logueado
-        return owner == request.user.cliente
\ No newline at end of file
+        return owner_id == cliente_id
@@ -0,0 +1,388 @@
+# core/reservas.py
+"""
+Creación y modificación de reservas sin solapamientos.
+
+Las escrituras se serializan por bot: dentro del proceso con un lock por
+franja (bot_id % N, sin lock global) y entre procesos con `bloquear_bots`
+(``select_for_update`` sobre las filas de los bots, o el lock de escritura
+de la base en SQLite). Con el lock tomado se verifica que el intervalo no se
+solape con otra reserva activa del bot.
+
+Las escrituras por lote toman los locks de todos sus bots en orden y
+verifican cada ítem en memoria contra una `Agenda` por bot, cargada con una
+sola consulta, en lugar de una consulta de solapamiento por reserva.
+"""
+import threading
+from datetime import datetime, timedelta
+from bisect import bisect_left, insort
+from contextlib import ExitStack, contextmanager
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from . import colecciones, resumen
+from .disponibilidad import ESTADOS_OCUPADOS, MARGEN_RESERVAS, aperturas, horario_semanal
+from .models import Bot, Reserva, Servicio
+
+# Cantidad de locks en proceso; bots distintos rara vez comparten franja
+FRANJAS_LOCK = 256
+_locks = [threading.Lock() for _ in range(FRANJAS_LOCK)]
+
+# Filas por sentencia en bulk_create/bulk_update
+LOTE_ESCRITURA = 500
+
+
+class ReservaSolapada(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'El horario se solapa con otra reserva del bot.'
+    default_code = 'reserva_solapada'
+
+
+def hay_solapamiento(bot_id, inicio, fin, excluir=None):
+    """Indica si [inicio, fin) se solapa con una reserva activa del bot"""
+    queryset = Reserva.objects.filter(
+        bot_id=bot_id,
+        estado__in=ESTADOS_OCUPADOS,
+        fecha_hora_inicio__gte=inicio - MARGEN_RESERVAS,
+        fecha_hora_inicio__lt=fin,
+        fecha_hora_fin__gt=inicio,
+    )
+    if excluir is not None:
+        queryset = queryset.exclude(pk=excluir)
+    return queryset.exists()
+
+
+def bloquear_bots(bot_ids):
+    """
+    Lock entre procesos sobre los bots, dentro de la transacción abierta.
+    SQLite no tiene SELECT ... FOR UPDATE: un UPDATE sin cambios toma el lock
+    de escritura de la base antes de cualquier lectura, así la transacción
+    espera su turno (OPTIONS['timeout']) en lugar de leer y fallar después con
+    "database is locked" al escribir. Solo estas transacciones lo toman; las
+    de solo lectura siguen sin bloquear a nadie.
+    """
+    bots = Bot.objects.filter(pk__in=bot_ids)
+    if connection.vendor == 'sqlite':
+        bots.update(activo=F('activo'))
+    else:
+        list(bots.select_for_update().order_by('pk').values_list('pk'))
+
+
+@contextmanager
+def reserva_exclusiva(bot_id, inicio, fin, estado='Confirmada', excluir=None):
+    """
+    Bloquea el bot, verifica que [inicio, fin) esté libre y deja escribir la
+    reserva dentro de la misma transacción. Lanza ReservaSolapada (409) si el
+    intervalo está ocupado o si otra escritura ganó la restricción única.
+    """
+    with _locks[bot_id % FRANJAS_LOCK]:
+        try:
+            with transaction.atomic():
+                bloquear_bots([bot_id])
+                if estado in ESTADOS_OCUPADOS and hay_solapamiento(bot_id, inicio, fin, excluir):
+                    raise ReservaSolapada()
+                yield
+        except IntegrityError as e:
+            # unique_together (bot, fecha_hora_inicio) ganado por otra escritura
+            if 'unique' in str(e).lower():
+                raise ReservaSolapada()
+            raise
+
+
+@contextmanager
+def bots_exclusivos(bot_ids):
+    """
+    Como reserva_exclusiva para varios bots a la vez: toma sus locks en orden
+    de franja (sin riesgo de deadlock con otros lotes) y bloquea las filas de
+    los bots dentro de una transacción. Lanza ReservaSolapada (409) si otra
+    escritura ganó la restricción única.
+    """
+    franjas = sorted({bot_id % FRANJAS_LOCK for bot_id in bot_ids})
+    with ExitStack() as locks:
+        for franja in franjas:
+            locks.enter_context(_locks[franja])
+        try:
+            with transaction.atomic():
+                bloquear_bots(bot_ids)
+                yield
+        except IntegrityError as e:
+            if 'unique' in str(e).lower():
+                raise ReservaSolapada()
+            raise
+
+
+class Agenda:
+    """
+    Reservas de un bot entre `inicio` y `fin`, leídas con una sola consulta,
+    para verificar muchos intervalos en memoria. Los intervalos aceptados se
+    registran con `ocupar` para que los siguientes ítems del lote los vean.
+    Con `semana` (ver disponibilidad.horario_semanal) verifica además que el
+    intervalo caiga dentro de una apertura del bot.
+    """
+
+    def __init__(self, bot_id, inicio, fin, semana=None):
+        filas = Reserva.objects.filter(
+            bot_id=bot_id,
+            fecha_hora_inicio__gte=inicio - MARGEN_RESERVAS,
+            fecha_hora_inicio__lt=fin,
+        ).values_list('pk', 'fecha_hora_inicio', 'fecha_hora_fin', 'estado')
+        # unique_together (bot, fecha_hora_inicio) vale para todos los estados
+        self.inicios = {}
+        self.ocupados = []
+        for pk, reserva_inicio, reserva_fin, estado in filas:
+            self.inicios[reserva_inicio] = pk
+            if estado in ESTADOS_OCUPADOS:
+                self.ocupados.append((reserva_inicio, reserva_fin, pk))
+        self.ocupados.sort(key=self.orden)
+        self.abiertos = None
+        if semana is not None:
+            self.abiertos = aperturas(
+                semana, timezone.localdate(inicio) - MARGEN_RESERVAS, timezone.localdate(fin)
+            )
+
+    @staticmethod
+    def orden(ocupado):
+        return ocupado[0], ocupado[1], ocupado[2] or 0
+
+    def error(self, inicio, fin, estado, pk=None):
+        """Motivo por el que [inicio, fin) no se puede usar, o None"""
+        if inicio in self.inicios and (pk is None or self.inicios[inicio] != pk):
+            return 'Ya existe una reserva del bot con ese inicio.'
+        if self.abiertos is not None:
+            i = bisect_left(self.abiertos, (inicio, fin))
+            candidatos = self.abiertos[max(i - 1, 0):i + 1]
+            if not any(abre <= inicio and fin <= cierra for abre, cierra in candidatos):
+                return 'El horario está fuera de la atención del bot.'
+        if estado in ESTADOS_OCUPADOS:
+            # Las reservas que terminan después de `inicio` empiezan a lo sumo
+            # MARGEN_RESERVAS antes, igual que en hay_solapamiento
+            k = bisect_left(self.ocupados, (fin,), key=lambda ocupado: (ocupado[0],))
+            while k > 0 and self.ocupados[k - 1][0] >= inicio - MARGEN_RESERVAS:
+                k -= 1
+                ocupado_inicio, ocupado_fin, ocupado_pk = self.ocupados[k]
+                if ocupado_fin > inicio and (pk is None or ocupado_pk != pk):
+                    return ReservaSolapada.default_detail
+        return None
+
+    def ocupar(self, inicio, fin, estado, pk=None, previo=None):
+        """
+        Registra el intervalo aceptado. `previo` es el (inicio, fin, estado)
+        anterior de una reserva modificada, que deja de ocupar su lugar.
+        """
+        if previo is not None:
+            previo_inicio, previo_fin, previo_estado = previo
+            if self.inicios.get(previo_inicio) == pk:
+                del self.inicios[previo_inicio]
+            if previo_estado in ESTADOS_OCUPADOS:
+                entrada = (previo_inicio, previo_fin, pk)
+                if entrada in self.ocupados:
+                    self.ocupados.remove(entrada)
+        self.inicios[inicio] = pk
+        if estado in ESTADOS_OCUPADOS:
+            insort(self.ocupados, (inicio, fin, pk), key=self.orden)
+
+
+def agendas(intervalos_por_bot, verificar_horario=False):
+    """Una Agenda por bot que cubre todos sus intervalos del lote"""
+    resultado = {}
+    for bot_id, intervalos in intervalos_por_bot.items():
+        inicio = min(inicio for inicio, _ in intervalos)
+        fin = max(fin for _, fin in intervalos)
+        semana = horario_semanal(bot_id) if verificar_horario else None
+        resultado[bot_id] = Agenda(bot_id, inicio, fin, semana)
+    return resultado
+
+
+def servicios_de(servicio_ids):
+    """{id: (bot_id, duracion_minutos, precio)} con una consulta"""
+    return {
+        pk: (bot_id, duracion, precio)
+        for pk, bot_id, duracion, precio in Servicio.objects.filter(pk__in=servicio_ids)
+        .values_list('pk', 'bot_id', 'duracion_minutos', 'precio')
+    }
+
+
+def registrar(altas=(), bajas=()):
+    """
+    Aplica al resumen diario y a las versiones de colecciones lo que las
+    señales harían por cada reserva (bulk_create/bulk_update no las disparan)
+    """
+    resumen.aplicar_lote(altas, bajas)
+    for cliente_id in {clave[0] for clave in (*altas, *bajas)}:
+        colecciones.invalidar(cliente_id)
+
+
+def crear_lote(items, bots, verificar_horario=False, todo_o_nada=False):
+    """
+    Crea las reservas de `items` (pares (índice, datos validados por
+    ReservaLoteSerializer)) con bulk_create. `bots` es el queryset de bots
+    permitidos. Retorna {índice: {'id': ...} o {'errores': {...}}}; con
+    `todo_o_nada` no se crea nada si algún ítem tiene errores.
+    """
+    bot_clientes = dict(bots.filter(pk__in={datos['bot'] for _, datos in items}).values_list('pk', 'cliente_id'))
+    servicios = servicios_de({datos['servicio'] for _, datos in items if datos.get('servicio') is not None})
+
+    resultados = {}
+    validos = []
+    for indice, datos in items:
+        bot_id = datos['bot']
+        servicio = servicios.get(datos.get('servicio'))
+        if bot_id not in bot_clientes:
+            resultados[indice] = {'errores': {'bot': 'Bot inexistente para este emprendimiento.'}}
+            continue
+        if datos.get('servicio') is not None and (servicio is None or servicio[0] != bot_id):
+            resultados[indice] = {'errores': {'servicio': 'El servicio no pertenece al bot.'}}
+            continue
+        if 'fecha' in datos:
+            inicio = timezone.make_aware(datetime.combine(datos['fecha'], datos['hora']))
+            fin = inicio + timedelta(minutes=servicio[1])
+        else:
+            inicio, fin = datos['fecha_hora_inicio'], datos['fecha_hora_fin']
+        if fin <= inicio:
+            resultados[indice] = {'errores': {'fecha_hora_fin': 'Debe ser posterior a fecha_hora_inicio.'}}
+            continue
+        validos.append((indice, datos, inicio, fin, servicio))
+
+    intervalos = {}
+    for _, datos, inicio, fin, _ in validos:
+        intervalos.setdefault(datos['bot'], []).append((inicio, fin))
+
+    with bots_exclusivos(sorted(intervalos)):
+        agendas_bot = agendas(intervalos, verificar_horario)
+        nuevas = []
+        for indice, datos, inicio, fin, servicio in validos:
+            agenda = agendas_bot[datos['bot']]
+            motivo = agenda.error(inicio, fin, datos['estado'])
+            if motivo:
+                resultados[indice] = {'errores': {'fecha_hora_inicio': motivo}}
+                continue
+            agenda.ocupar(inicio, fin, datos['estado'])
+            reserva = Reserva(
+                bot_id=datos['bot'],
+                # bulk_create no pasa por Reserva.save, que lo copia del bot
+                cliente_id=bot_clientes[datos['bot']],
+                servicio_id=datos.get('servicio'),
+                cliente_final_nombre=datos.get('cliente_final_nombre') or "Cliente Web",
+                cliente_final_telefono=datos.get('cliente_final_telefono') or "000000000",
+                fecha_hora_inicio=inicio,
+                fecha_hora_fin=fin,
+                estado=datos['estado'],
+                notas=datos.get('notas', ''),
+            )
+            nuevas.append((indice, reserva, servicio[2] if servicio else None))
+
+        if todo_o_nada and resultados:
+            return resultados
+
+        Reserva.objects.bulk_create([reserva for _, reserva, _ in nuevas], batch_size=LOTE_ESCRITURA)
+        registrar(altas=[
+            (reserva.cliente_id, reserva.bot_id, timezone.localdate(reserva.fecha_hora_inicio), reserva.estado, precio)
+            for _, reserva, precio in nuevas
+        ])
+    for indice, reserva, _ in nuevas:
+        resultados[indice] = {'id': reserva.pk}
+    return resultados
+
+
+def modificar_lote(items, reservas, todo_o_nada=False):
+    """
+    Modifica con bulk_update las reservas de `items` (pares (índice, datos
+    validados por ReservaCambioLoteSerializer)). `reservas` es el queryset
+    de reservas permitidas. Cada reserva deja libre su intervalo anterior
+    recién cuando se acepta su cambio, así que intercambiar horarios entre
+    reservas del lote se rechaza. Retorna lo mismo que crear_lote.
+    """
+    ids = [datos['id'] for _, datos in items]
+    existentes = reservas.filter(pk__in=ids).select_related('servicio').in_bulk()
+    servicios = servicios_de({datos['servicio'] for _, datos in items if datos.get('servicio') is not None})
+
+    resultados = {}
+    validos = []
+    vistos = set()
+    for indice, datos in items:
+        reserva = existentes.get(datos['id'])
+        if reserva is None:
+            resultados[indice] = {'errores': {'id': 'Reserva inexistente.'}}
+            continue
+        if reserva.pk in vistos:
+            resultados[indice] = {'errores': {'id': 'Reserva repetida en el lote.'}}
+            continue
+        vistos.add(reserva.pk)
+        servicio = servicios.get(datos.get('servicio'))
+        if datos.get('servicio') is not None and (servicio is None or servicio[0] != reserva.bot_id):
+            resultados[indice] = {'errores': {'servicio': 'El servicio no pertenece al bot.'}}
+            continue
+        inicio = datos.get('fecha_hora_inicio', reserva.fecha_hora_inicio)
+        fin = datos.get('fecha_hora_fin', reserva.fecha_hora_fin)
+        if fin <= inicio:
+            resultados[indice] = {'errores': {'fecha_hora_fin': 'Debe ser posterior a fecha_hora_inicio.'}}
+            continue
+        validos.append((indice, datos, reserva, inicio, fin, servicio))
+
+    intervalos = {}
+    for _, _, reserva, inicio, fin, _ in validos:
+        intervalos.setdefault(reserva.bot_id, []).append((inicio, fin))
+
+    with bots_exclusivos(sorted(intervalos)):
+        agendas_bot = agendas(intervalos)
+        modificadas = []
+        bajas, altas = [], []
+        campos = set()
+        for indice, datos, reserva, inicio, fin, servicio in validos:
+            agenda = agendas_bot[reserva.bot_id]
+            estado = datos.get('estado', reserva.estado)
+            motivo = agenda.error(inicio, fin, estado, pk=reserva.pk)
+            if motivo:
+                resultados[indice] = {'errores': {'fecha_hora_inicio': motivo}}
+                continue
+            agenda.ocupar(
+                inicio, fin, estado, pk=reserva.pk,
+                previo=(reserva.fecha_hora_inicio, reserva.fecha_hora_fin, reserva.estado)
+            )
+            previa = resumen.clave_reserva(reserva)
+            bajas.append(previa)
+            for campo, valor in datos.items():
+                if campo == 'id':
+                    continue
+                setattr(reserva, 'servicio_id' if campo == 'servicio' else campo, valor)
+                campos.add(campo)
+            precio = servicio[2] if servicio is not None else previa[4]
+            altas.append((
+                reserva.cliente_id, reserva.bot_id, timezone.localdate(reserva.fecha_hora_inicio),
+                reserva.estado, precio if reserva.servicio_id else None
+            ))
+            modificadas.append((indice, reserva))
+
+        if todo_o_nada and resultados:
+            return resultados
+
+        if campos:
+            Reserva.objects.bulk_update(
+                [reserva for _, reserva in modificadas], sorted(campos), batch_size=LOTE_ESCRITURA
+            )
+            registrar(altas=altas, bajas=bajas)
+    for indice, reserva in modificadas:
+        resultados[indice] = {'id': reserva.pk}
+    return resultados
+
+
+def cancelar_lote(reservas):
+    """
+    Cancela las reservas activas del queryset `reservas` con un solo UPDATE.
+    Retorna la lista de ids cancelados.
+    """
+    activas = reservas.filter(estado__in=ESTADOS_OCUPADOS)
+    bot_ids = sorted(set(activas.values_list('bot_id', flat=True)))
+    with bots_exclusivos(bot_ids):
+        filas = list(activas.values_list(
+            'pk', 'cliente_id', 'bot_id', 'fecha_hora_inicio', 'estado', 'servicio__precio'
+        ))
+        ids = [fila[0] for fila in filas]
+        Reserva.objects.filter(pk__in=ids).update(estado='Cancelada')
+        bajas = [
+            (cliente_id, bot_id, timezone.localdate(inicio), estado, precio)
+            for _, cliente_id, bot_id, inicio, estado, precio in filas
+        ]
+        registrar(altas=[clave[:3] + ('Cancelada', clave[4]) for clave in bajas], bajas=bajas)
+    return ids
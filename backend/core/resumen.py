@@ -0,0 +1,180 @@
+# core/resumen.py
+"""
+Mantenimiento del resumen diario de reservas (ResumenReservasDiario).
+
+Las señales de Reserva aplican deltas incrementales; `reconstruir_resumen`
+recalcula la tabla completa desde las reservas (comando
+``rebuild_resumen_reservas``). Las actualizaciones masivas con
+``QuerySet.update()`` no disparan señales y requieren reconstruir, salvo que
+apliquen sus deltas con `aplicar_lote`. Los cambios de precio y las bajas de
+un Servicio corrigen los ingresos con `ajustar_ingresos`. Al borrar un Bot,
+Cliente o User sus filas del resumen se borran en cascada y las señales no
+descuentan sus reservas una por una.
+"""
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from .models import Reserva, ResumenReservasDiario
+
+CAMPO_POR_ESTADO = {
+    'Confirmada': 'confirmadas',
+    'Pendiente': 'pendientes',
+    'Cancelada': 'canceladas',
+}
+
+
+def clave_reserva(reserva):
+    """
+    Retorna la tupla (cliente_id, bot_id, fecha, estado, precio) con la que
+    una reserva contribuye al resumen
+    """
+    precio = reserva.servicio.precio if reserva.servicio_id else None
+    return (
+        reserva.cliente_id,
+        reserva.bot_id,
+        timezone.localdate(reserva.fecha_hora_inicio),
+        reserva.estado,
+        precio,
+    )
+
+
+def clave_guardada(pk):
+    """Retorna la clave de la reserva tal como está guardada en la base de datos"""
+    fila = Reserva.objects.filter(pk=pk).values(
+        'cliente_id', 'bot_id', 'fecha_hora_inicio', 'estado', 'servicio__precio'
+    ).first()
+    if fila is None:
+        return None
+    return (
+        fila['cliente_id'],
+        fila['bot_id'],
+        timezone.localdate(fila['fecha_hora_inicio']),
+        fila['estado'],
+        fila['servicio__precio'],
+    )
+
+
+def aplicar(clave, signo):
+    """Suma (signo=1) o resta (signo=-1) una reserva al resumen de su día"""
+    if clave is None:
+        return
+    cliente_id, bot_id, fecha, estado, precio = clave
+    campo = CAMPO_POR_ESTADO.get(estado)
+    if campo is None:
+        return
+
+    cambios = {campo: F(campo) + signo}
+    if estado == 'Confirmada' and precio:
+        cambios['ingresos'] = F('ingresos') + signo * precio
+
+    with transaction.atomic():
+        if signo > 0:
+            ResumenReservasDiario.objects.get_or_create(
+                bot_id=bot_id, fecha=fecha, defaults={'cliente_id': cliente_id}
+            )
+        filas = ResumenReservasDiario.objects.filter(bot_id=bot_id, fecha=fecha)
+        filas.update(**cambios)
+        if signo < 0:
+            # Los días que quedan sin reservas no se conservan en el resumen
+            filas.filter(confirmadas=0, pendientes=0, canceladas=0).delete()
+
+
+def aplicar_lote(altas=(), bajas=()):
+    """
+    Suma las claves de `altas` y resta las de `bajas` agrupando por día: una
+    actualización por (bot, fecha) en lugar de una por reserva. Para las
+    escrituras masivas, que no disparan señales.
+    """
+    dias = {}
+    for claves, signo in ((altas, 1), (bajas, -1)):
+        for clave in claves:
+            if clave is None:
+                continue
+            cliente_id, bot_id, fecha, estado, precio = clave
+            campo = CAMPO_POR_ESTADO.get(estado)
+            if campo is None:
+                continue
+            dia = dias.setdefault((bot_id, fecha), {'cliente_id': cliente_id, 'ingresos': Decimal('0')})
+            dia[campo] = dia.get(campo, 0) + signo
+            if estado == 'Confirmada' and precio:
+                dia['ingresos'] += signo * precio
+
+    with transaction.atomic():
+        for (bot_id, fecha), dia in dias.items():
+            cliente_id = dia.pop('cliente_id')
+            cambios = {campo: F(campo) + delta for campo, delta in dia.items() if delta}
+            if not cambios:
+                continue
+            ResumenReservasDiario.objects.get_or_create(
+                bot_id=bot_id, fecha=fecha, defaults={'cliente_id': cliente_id}
+            )
+            filas = ResumenReservasDiario.objects.filter(bot_id=bot_id, fecha=fecha)
+            filas.update(**cambios)
+            if any(delta < 0 for delta in dia.values()):
+                filas.filter(confirmadas=0, pendientes=0, canceladas=0).delete()
+
+
+def ajustar_ingresos(servicio_id, diferencia):
+    """
+    Suma `diferencia` a los ingresos de cada día por cada reserva confirmada
+    del servicio, con un solo UPDATE. Para los cambios de precio (nuevo -
+    anterior) y para la baja del servicio (-precio): SET_NULL deja sus
+    reservas sin precio sin pasar por las señales de Reserva.
+    """
+    if not diferencia:
+        return
+    confirmadas = Reserva.objects.filter(servicio_id=servicio_id, estado='Confirmada')
+    por_dia = (
+        confirmadas
+        .filter(bot=OuterRef('bot'), fecha_hora_inicio__date=OuterRef('fecha'))
+        .order_by().values('bot').annotate(c=Count('*')).values('c')
+    )
+    (
+        ResumenReservasDiario.objects
+        .filter(bot_id__in=confirmadas.values('bot_id'))
+        .update(ingresos=F('ingresos') + diferencia * Coalesce(Subquery(por_dia), 0))
+    )
+
+
+def reconstruir_resumen(batch_size=1000):
+    """
+    Reconstruye el resumen completo desde la tabla de reservas.
+    Retorna la cantidad de filas de resumen creadas.
+    """
+    filas = (
+        Reserva.objects
+        .annotate(fecha=TruncDate('fecha_hora_inicio', tzinfo=timezone.get_current_timezone()))
+        .order_by()
+        .values('bot_id', 'cliente_id', 'fecha')
+        .annotate(
+            confirmadas=Count('pk', filter=Q(estado='Confirmada')),
+            pendientes=Count('pk', filter=Q(estado='Pendiente')),
+            canceladas=Count('pk', filter=Q(estado='Cancelada')),
+            ingresos=Sum('servicio__precio', filter=Q(estado='Confirmada')),
+        )
+    )
+
+    creadas = 0
+    with transaction.atomic():
+        ResumenReservasDiario.objects.all().delete()
+        lote = []
+        for fila in filas.iterator(chunk_size=batch_size):
+            lote.append(ResumenReservasDiario(
+                cliente_id=fila['cliente_id'],
+                bot_id=fila['bot_id'],
+                fecha=fila['fecha'],
+                confirmadas=fila['confirmadas'],
+                pendientes=fila['pendientes'],
+                canceladas=fila['canceladas'],
+                ingresos=fila['ingresos'] or Decimal('0'),
+            ))
+            if len(lote) >= batch_size:
+                ResumenReservasDiario.objects.bulk_create(lote)
+                creadas += len(lote)
+                lote = []
+        if lote:
+            ResumenReservasDiario.objects.bulk_create(lote)
+            creadas += len(lote)
+    return creadas
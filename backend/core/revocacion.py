@@ -0,0 +1,156 @@
+# core/revocacion.py
+"""
+Revocación de tokens JWT.
+
+Los JTI revocados se guardan en TokenRevocado hasta que el token vence.
+Delante de la tabla, cada proceso mantiene un filtro de Bloom con los JTI
+vigentes que se reconstruye cada JWT_REVOCATION_BLOOM_REFRESH: si el JTI no
+está en el filtro el token no fue revocado y no se consulta la base; solo
+los aciertos del filtro (revocados o falsos positivos) van a la tabla.
+
+Desactivar, degradar o eliminar un usuario revoca todos sus tokens emitidos
+hasta ese momento con una marca 'usuario:<id>' en la misma tabla: los claims
+is_staff, is_superuser y cliente_id de esos tokens ya no son confiables.
+
+Una revocación hecha en otro proceso se ve aquí al reconstruir el filtro.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from .models import TokenRevocado
+
+# Claim con el JTI del refresh token del que salió un access token
+CLAIM_REFRESH_JTI = 'rjti'
+# Prefijo de las marcas que revocan todos los tokens de un usuario
+PREFIJO_USUARIO = 'usuario:'
+
+
+class FiltroBloom:
+    """Filtro de Bloom con doble hashing sobre un digest blake2b"""
+
+    def __init__(self, bits, hashes):
+        self.bits = bits
+        self.hashes = hashes
+        self.tabla = bytearray((bits + 7) // 8)
+
+    def posiciones(self, valor):
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, valor):
+        for posicion in self.posiciones(valor):
+            self.tabla[posicion >> 3] |= 1 << (posicion & 7)
+
+    def __contains__(self, valor):
+        return all(
+            self.tabla[posicion >> 3] & (1 << (posicion & 7))
+            for posicion in self.posiciones(valor)
+        )
+
+
+_lock = threading.Lock()
+_filtro = None
+_construido_en = 0.0
+# JTI revocados en este proceso desde el inicio de la última reconstrucción
+_recientes = set()
+
+
+def intervalo_reconstruccion():
+    return getattr(settings, 'JWT_REVOCATION_BLOOM_REFRESH', timedelta(seconds=30)).total_seconds()
+
+
+def reconstruir():
+    """Arma un filtro nuevo con los JTI revocados que aún no vencieron"""
+    global _filtro, _construido_en
+    with _lock:
+        incluidos = set(_recientes)
+    filtro = FiltroBloom(
+        getattr(settings, 'JWT_REVOCATION_BLOOM_BITS', 1 << 20),
+        getattr(settings, 'JWT_REVOCATION_BLOOM_HASHES', 7),
+    )
+    jtis = TokenRevocado.objects.filter(expira__gt=timezone.now()).values_list('jti', flat=True)
+    for jti in jtis.iterator(chunk_size=2000):
+        filtro.add(jti)
+    with _lock:
+        # Los revocados durante la consulta pueden no estar en ella
+        for jti in _recientes:
+            filtro.add(jti)
+        _recientes.difference_update(incluidos)
+        _filtro = filtro
+        _construido_en = time.monotonic()
+    return filtro
+
+
+def filtro_vigente():
+    if _filtro is None or time.monotonic() - _construido_en > intervalo_reconstruccion():
+        return reconstruir()
+    return _filtro
+
+
+def clave_usuario(user_id):
+    return f'{PREFIJO_USUARIO}{user_id}'
+
+
+def jtis_de(token):
+    """JTI propio, en access tokens el del refresh del que salió, y la marca de su usuario"""
+    usuario = token.get(api_settings.USER_ID_CLAIM)
+    return [
+        jti for jti in (
+            token.get(api_settings.JTI_CLAIM),
+            token.get(CLAIM_REFRESH_JTI),
+            clave_usuario(usuario) if usuario is not None else None,
+        )
+        if jti
+    ]
+
+
+def token_revocado(token):
+    """Indica si el token (o su refresh o usuario) fue revocado; sin consultas si no hay aciertos del filtro"""
+    filtro = filtro_vigente()
+    candidatos = [jti for jti in jtis_de(token) if jti in filtro]
+    if not candidatos:
+        return False
+    propios = [jti for jti in candidatos if not jti.startswith(PREFIJO_USUARIO)]
+    condicion = Q(jti__in=propios)
+    marcas = [jti for jti in candidatos if jti.startswith(PREFIJO_USUARIO)]
+    if marcas:
+        # La marca solo alcanza a los tokens emitidos hasta la revocación; 'iat'
+        # se trunca al segundo, así que un token del mismo segundo también cae
+        emitido = datetime.fromtimestamp(token.get('iat', 0), tz=dt_timezone.utc)
+        condicion |= Q(jti__in=marcas, fecha_revocacion__gte=emitido)
+    return TokenRevocado.objects.filter(condicion, expira__gt=timezone.now()).exists()
+
+
+def revocar(token):
+    """Revoca el token hasta su vencimiento y elimina las revocaciones ya vencidas"""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if not jti:
+        return
+    expira = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    TokenRevocado.objects.filter(expira__lte=timezone.now()).delete()
+    TokenRevocado.objects.get_or_create(jti=jti, defaults={'expira': expira})
+    with _lock:
+        _recientes.add(jti)
+        if _filtro is not None:
+            _filtro.add(jti)
+
+
+def revocar_usuario(user_id):
+    """Revoca todos los tokens del usuario emitidos hasta ahora"""
+    clave = clave_usuario(user_id)
+    ahora = timezone.now()
+    vigencia = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    TokenRevocado.objects.update_or_create(
+        jti=clave, defaults={'expira': ahora + vigencia, 'fecha_revocacion': ahora}
+    )
+    with _lock:
+        _recientes.add(clave)
+        if _filtro is not None:
+            _filtro.add(clave)
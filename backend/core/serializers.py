@@ -1,20 +1,39 @@
 # core/serializers.py
+from django.conf import settings
 from rest_framework import serializers
-from .models import Bot, Servicio, Reserva, Cliente
+from .models import Bot, Servicio, Reserva, Cliente, RESERVAS_RECIENTES_POR_BOT
+from .campos import CamposDinamicosMixin
+from .medicion import SerializacionMedida
 from django.contrib.auth.models import User
 
-class UserSerializer(serializers.ModelSerializer):
+
+class AnnotatedReadOnlyField(serializers.ReadOnlyField):
+    """
+    Campo de solo lectura que usa el valor anotado en el queryset cuando existe
+    y, si no, recurre a la propiedad del modelo con el mismo nombre del campo.
+    """
+    def __init__(self, annotation, **kwargs):
+        self.annotation = annotation
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        if hasattr(instance, self.annotation):
+            return getattr(instance, self.annotation)
+        return super().get_attribute(instance)
+
+
+class UserSerializer(SerializacionMedida, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'is_staff', 'is_superuser', 'is_active'] # Campos completos para tests
 
-class ClienteSerializer(serializers.ModelSerializer):
+class ClienteSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True) # Mostrar datos del usuario anidado
-    cantidad_bots = serializers.ReadOnlyField()
-    cantidad_bots_activos = serializers.ReadOnlyField()
-    cantidad_reservas = serializers.ReadOnlyField()
-    cantidad_reservas_mes_actual = serializers.ReadOnlyField()
-    puede_crear_bot = serializers.ReadOnlyField()
+    cantidad_bots = AnnotatedReadOnlyField('num_bots')
+    cantidad_bots_activos = AnnotatedReadOnlyField('num_bots_activos')
+    cantidad_reservas = AnnotatedReadOnlyField('num_reservas')
+    cantidad_reservas_mes_actual = AnnotatedReadOnlyField('num_reservas_mes_actual')
+    puede_crear_bot = AnnotatedReadOnlyField('puede_crear_bot_anotado')
     dias_desde_registro = serializers.ReadOnlyField()
     
     class Meta:
@@ -27,15 +46,21 @@ class ClienteSerializer(serializers.ModelSerializer):
             'puede_crear_bot', 'dias_desde_registro'
         ]
         read_only_fields = ['fecha_registro', 'dias_desde_registro']
+        # Columnas que leen los campos calculados (ver core.campos)
+        columnas = {
+            'cantidad_bots': (), 'cantidad_bots_activos': (), 'cantidad_reservas': (),
+            'cantidad_reservas_mes_actual': (), 'puede_crear_bot': ('max_bots_allowed',),
+            'dias_desde_registro': ('fecha_registro',),
+        }
 
 
-class ClienteListSerializer(serializers.ModelSerializer):
+class ClienteListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer optimizado para listado de emprendimientos con paginación"""
     username = serializers.CharField(source='user.username', read_only=True)
     email = serializers.CharField(source='user.email', read_only=True)
     is_active = serializers.CharField(source='user.is_active', read_only=True)
-    cantidad_bots = serializers.ReadOnlyField()
-    cantidad_reservas = serializers.ReadOnlyField()
+    cantidad_bots = AnnotatedReadOnlyField('num_bots')
+    cantidad_reservas = AnnotatedReadOnlyField('num_reservas')
     dias_desde_registro = serializers.ReadOnlyField()
     
     class Meta:
@@ -45,17 +70,21 @@ class ClienteListSerializer(serializers.ModelSerializer):
             'status', 'max_bots_allowed', 'cantidad_bots', 'cantidad_reservas',
             'fecha_registro', 'fecha_ultimo_acceso', 'dias_desde_registro'
         ]
+        columnas = {
+            'cantidad_bots': (), 'cantidad_reservas': (),
+            'dias_desde_registro': ('fecha_registro',),
+        }
 
 
-class ClienteDetailSerializer(serializers.ModelSerializer):
+class ClienteDetailSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer detallado para el perfil de emprendimiento"""
     user = UserSerializer(read_only=True)
     bots = serializers.SerializerMethodField()
-    cantidad_bots = serializers.ReadOnlyField()
-    cantidad_bots_activos = serializers.ReadOnlyField()
-    cantidad_reservas = serializers.ReadOnlyField()
-    cantidad_reservas_mes_actual = serializers.ReadOnlyField()
-    puede_crear_bot = serializers.ReadOnlyField()
+    cantidad_bots = AnnotatedReadOnlyField('num_bots')
+    cantidad_bots_activos = AnnotatedReadOnlyField('num_bots_activos')
+    cantidad_reservas = AnnotatedReadOnlyField('num_reservas')
+    cantidad_reservas_mes_actual = AnnotatedReadOnlyField('num_reservas_mes_actual')
+    puede_crear_bot = AnnotatedReadOnlyField('puede_crear_bot_anotado')
     dias_desde_registro = serializers.ReadOnlyField()
     
     class Meta:
@@ -68,20 +97,24 @@ class ClienteDetailSerializer(serializers.ModelSerializer):
             'puede_crear_bot', 'dias_desde_registro', 'bots'
         ]
         read_only_fields = ['fecha_registro', 'dias_desde_registro', 'bots']
+        columnas = dict(ClienteSerializer.Meta.columnas, bots=())
     
     def get_bots(self, obj):
-        """Obtiene los bots del emprendimiento con información detallada"""
+        """
+        Obtiene los bots del emprendimiento con información detallada; el
+        queryset debe venir de Cliente.objects.with_bots_detalle()
+        """
         bots = obj.bots.all()
         return BotDetailSerializer(bots, many=True).data
 
-class ServicioSerializer(serializers.ModelSerializer):
+class ServicioSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     bot_nombre = serializers.CharField(source='bot.nombre', read_only=True)
     
     class Meta:
         model = Servicio
-        fields = ['id', 'nombre', 'descripcion', 'precio', 'bot', 'bot_nombre']
+        fields = ['id', 'nombre', 'descripcion', 'precio', 'duracion_minutos', 'bot', 'bot_nombre']
 
-class BotSerializer(serializers.ModelSerializer):
+class BotSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     servicios = ServicioSerializer(many=True, read_only=True)
     total_reservas = serializers.SerializerMethodField()
     cliente_nombre = serializers.CharField(source='cliente.nombre_emprendimiento', read_only=True)
@@ -97,6 +130,10 @@ class BotSerializer(serializers.ModelSerializer):
             'fecha_creacion', 'fecha_modificacion'
         ]
         read_only_fields = ['fecha_creacion', 'fecha_modificacion']
+        columnas = {
+            'total_reservas': (), 'reservas_pendientes': (),
+            'esta_operativo': ('activo', 'bloqueado', 'cliente__status'),
+        }
     
     def get_total_reservas(self, obj):
         return obj.reservas.count()
@@ -108,11 +145,11 @@ class BotSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class BotDetailSerializer(serializers.ModelSerializer):
+class BotDetailSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer detallado para bots en el perfil de emprendimiento"""
     servicios = ServicioSerializer(many=True, read_only=True)
-    total_reservas = serializers.ReadOnlyField()
-    reservas_pendientes = serializers.ReadOnlyField()
+    total_reservas = AnnotatedReadOnlyField('num_reservas')
+    reservas_pendientes = AnnotatedReadOnlyField('num_reservas_pendientes')
     esta_operativo = serializers.ReadOnlyField()
     reservas_recientes = serializers.SerializerMethodField()
     
@@ -124,14 +161,17 @@ class BotDetailSerializer(serializers.ModelSerializer):
             'esta_operativo', 'fecha_creacion', 'fecha_modificacion', 'reservas_recientes'
         ]
         read_only_fields = ['fecha_creacion', 'fecha_modificacion']
+        columnas = dict(BotSerializer.Meta.columnas, reservas_recientes=())
     
     def get_reservas_recientes(self, obj):
         """Obtiene las 5 reservas más recientes del bot"""
-        reservas = obj.reservas.order_by('-fecha_hora_inicio')[:5]
+        reservas = getattr(obj, 'reservas_recientes_prefetch', None)
+        if reservas is None:
+            reservas = obj.reservas.order_by('-fecha_hora_inicio')[:RESERVAS_RECIENTES_POR_BOT]
         return ReservaSerializer(reservas, many=True).data
 
 
-class BotManagementSerializer(serializers.ModelSerializer):
+class BotManagementSerializer(SerializacionMedida, serializers.ModelSerializer):
     """Serializer para gestión de bots desde superusuario"""
     cliente_nombre = serializers.CharField(source='cliente.nombre_emprendimiento', read_only=True)
     total_reservas = serializers.ReadOnlyField()
@@ -147,10 +187,10 @@ class BotManagementSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['fecha_creacion', 'fecha_modificacion', 'cliente']
 
-class ReservaSerializer(serializers.ModelSerializer):
+class ReservaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     servicio_nombre = serializers.CharField(source='servicio.nombre', read_only=True)
     bot_nombre = serializers.CharField(source='bot.nombre', read_only=True)
-    cliente_nombre = serializers.CharField(source='bot.cliente.nombre_emprendimiento', read_only=True)
+    cliente_nombre = serializers.CharField(source='cliente.nombre_emprendimiento', read_only=True)
     
     class Meta:
         model = Reserva
@@ -158,4 +198,72 @@ class ReservaSerializer(serializers.ModelSerializer):
                   'cliente_nombre', 'cliente_final_nombre', 'cliente_final_telefono', 
                   'fecha_hora_inicio', 'fecha_hora_fin', 'estado', 'puede_cancelar',
                   'notas']
-        read_only_fields = ['puede_cancelar', 'bot_nombre', 'servicio_nombre', 'cliente_nombre']
\ No newline at end of file
+        read_only_fields = ['puede_cancelar', 'bot_nombre', 'servicio_nombre', 'cliente_nombre']
+        columnas = {'puede_cancelar': ('fecha_hora_inicio',)}
+        # Los horarios se completan en la vista y el solapamiento (que incluye
+        # el unique_together de bot y fecha_hora_inicio) se valida con el bot bloqueado
+        extra_kwargs = {
+            'fecha_hora_inicio': {'required': False},
+            'fecha_hora_fin': {'required': False},
+            'cliente_final_nombre': {'required': False},
+            'cliente_final_telefono': {'required': False},
+        }
+        validators = []
+
+class ReservaLoteSerializer(serializers.Serializer):
+    """
+    Ítem de la creación de reservas por lote. Bot y servicio llegan como ids
+    y se resuelven en la vista con una consulta por lote.
+    """
+    bot = serializers.IntegerField()
+    servicio = serializers.IntegerField(required=False, allow_null=True)
+    cliente_final_nombre = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    cliente_final_telefono = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    fecha_hora_inicio = serializers.DateTimeField(required=False)
+    fecha_hora_fin = serializers.DateTimeField(required=False)
+    fecha = serializers.DateField(required=False)
+    hora = serializers.TimeField(required=False, input_formats=['%H:%M'])
+    estado = serializers.ChoiceField(choices=Reserva._meta.get_field('estado').choices, default='Confirmada')
+    notas = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if 'fecha' in attrs or 'hora' in attrs:
+            if 'fecha' not in attrs or 'hora' not in attrs:
+                raise serializers.ValidationError({'hora': 'Indique fecha y hora juntas.'})
+            if attrs.get('servicio') is None:
+                raise serializers.ValidationError({'servicio': 'Este campo es requerido.'})
+        elif 'fecha_hora_inicio' not in attrs or 'fecha_hora_fin' not in attrs:
+            raise serializers.ValidationError(
+                {'fecha_hora_inicio': 'Indique fecha y hora o fecha_hora_inicio y fecha_hora_fin.'}
+            )
+        return attrs
+
+
+class ReservaCambioLoteSerializer(serializers.Serializer):
+    """Ítem de la modificación de reservas por lote; solo `id` es obligatorio"""
+    id = serializers.IntegerField()
+    servicio = serializers.IntegerField(required=False, allow_null=True)
+    cliente_final_nombre = serializers.CharField(max_length=100, required=False)
+    cliente_final_telefono = serializers.CharField(max_length=20, required=False)
+    fecha_hora_inicio = serializers.DateTimeField(required=False)
+    fecha_hora_fin = serializers.DateTimeField(required=False)
+    estado = serializers.ChoiceField(choices=Reserva._meta.get_field('estado').choices, required=False)
+    notas = serializers.CharField(required=False, allow_blank=True)
+
+
+class ReservaCancelacionLoteSerializer(serializers.Serializer):
+    """Cancelación por lote: `ids`, o `bot` y `fecha` para todas las activas de ese día"""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    bot = serializers.IntegerField(required=False)
+    fecha = serializers.DateField(required=False)
+
+    def validate_ids(self, ids):
+        maximo = getattr(settings, 'RESERVAS_LOTE_MAXIMO', 5000)
+        if len(ids) > maximo:
+            raise serializers.ValidationError(f'El lote no puede superar {maximo} reservas.')
+        return ids
+
+    def validate(self, attrs):
+        if 'ids' not in attrs and ('bot' not in attrs or 'fecha' not in attrs):
+            raise serializers.ValidationError({'ids': 'Envíe ids o bot y fecha (YYYY-MM-DD).'})
+        return attrs
@@ -0,0 +1,177 @@
+# core/signals.py
+from decimal import Decimal
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.contrib.auth.models import User
+from django.dispatch import receiver
+from .models import Bot, Cliente, Horario, Reserva, ResumenReservasDiario, Servicio
+from . import colecciones, contexto_bot, resumen, revocacion
+
+
+@receiver(pre_save, sender=Reserva)
+def reserva_pre_save(sender, instance, raw=False, **kwargs):
+    """Guarda la clave previa de la reserva para descontarla del resumen"""
+    if raw:
+        return
+    instance._clave_resumen_previa = resumen.clave_guardada(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Reserva)
+def reserva_post_save(sender, instance, created, raw=False, **kwargs):
+    """Actualiza el resumen diario de reservas"""
+    if raw:
+        return
+    previa = getattr(instance, '_clave_resumen_previa', None)
+    nueva = resumen.clave_reserva(instance)
+    if previa == nueva:
+        return
+    resumen.aplicar(nueva, 1)
+    resumen.aplicar(previa, -1)
+
+
+def borrado_propio(origin, modelo):
+    """
+    Indica si el borrado empezó en `modelo` (instancia o queryset). Si empezó
+    en un Bot, Cliente o User, sus filas del resumen se borran en la misma
+    cascada y no hay nada que descontar.
+    """
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, modelo)
+    return isinstance(origin, modelo)
+
+
+@receiver(pre_delete, sender=Reserva)
+def reserva_pre_delete(sender, instance, origin=None, **kwargs):
+    """
+    Guarda la clave de la reserva antes de borrarla. En la cascada de un
+    Bot, Cliente o User no se guarda: el servicio puede borrarse antes que
+    la reserva y el resumen del bot se borra igual.
+    """
+    instance._clave_resumen_previa = (
+        resumen.clave_reserva(instance) if borrado_propio(origin, Reserva) else None
+    )
+
+
+@receiver(post_delete, sender=Reserva)
+def reserva_post_delete(sender, instance, **kwargs):
+    """Descuenta la reserva eliminada del resumen diario"""
+    resumen.aplicar(getattr(instance, '_clave_resumen_previa', None), -1)
+
+
+@receiver([post_save, post_delete], sender=Reserva)
+def reserva_cambiada(sender, instance, **kwargs):
+    """Invalida los listados del cliente de la reserva y, si cambió, los del anterior"""
+    colecciones.invalidar(instance.cliente_id)
+    previa = getattr(instance, '_clave_resumen_previa', None)
+    if previa is not None and previa[0] != instance.cliente_id:
+        colecciones.invalidar(previa[0])
+
+
+@receiver(pre_save, sender=Bot)
+def bot_pre_save(sender, instance, raw=False, **kwargs):
+    """Guarda el cliente previo del bot para mover sus datos si el bot cambia de cliente"""
+    if raw or not instance.pk:
+        instance._cliente_previo = None
+        return
+    instance._cliente_previo = Bot.objects.filter(pk=instance.pk).values_list('cliente_id', flat=True).first()
+
+
+@receiver(post_save, sender=Bot)
+def bot_post_save(sender, instance, raw=False, **kwargs):
+    """
+    Mueve las reservas y el resumen diario del bot al nuevo cliente si el bot
+    cambió de cliente, e invalida los listados del cliente anterior
+    """
+    previo = getattr(instance, '_cliente_previo', None)
+    if raw or previo is None or previo == instance.cliente_id:
+        return
+    Reserva.objects.filter(bot_id=instance.pk).update(cliente_id=instance.cliente_id)
+    ResumenReservasDiario.objects.filter(bot_id=instance.pk).update(cliente_id=instance.cliente_id)
+    colecciones.invalidar(previo)
+
+
+@receiver([post_save, post_delete], sender=Bot)
+def bot_cambiado(sender, instance, **kwargs):
+    """Invalida el contexto compilado del bot y los listados de su cliente"""
+    contexto_bot.invalidar_bot(instance.pk)
+    colecciones.invalidar(instance.cliente_id)
+
+
+@receiver(pre_save, sender=Servicio)
+def servicio_pre_save(sender, instance, raw=False, **kwargs):
+    """Guarda el precio previo del servicio para corregir los ingresos del resumen"""
+    if raw or not instance.pk:
+        instance._precio_previo = None
+        return
+    instance._precio_previo = Servicio.objects.filter(pk=instance.pk).values_list('precio', flat=True).first()
+
+
+@receiver(post_save, sender=Servicio)
+def servicio_post_save(sender, instance, raw=False, **kwargs):
+    """Aplica el cambio de precio a los ingresos de sus reservas confirmadas"""
+    previo = getattr(instance, '_precio_previo', None)
+    if raw or previo is None:
+        return
+    resumen.ajustar_ingresos(instance.pk, Decimal(str(instance.precio)) - previo)
+
+
+@receiver(pre_delete, sender=Servicio)
+def servicio_pre_delete(sender, instance, origin=None, **kwargs):
+    """Descuenta los ingresos de sus reservas confirmadas, que quedan sin servicio"""
+    if not borrado_propio(origin, Servicio):
+        return
+    resumen.ajustar_ingresos(instance.pk, -Decimal(str(instance.precio)))
+
+
+@receiver([post_save, post_delete], sender=Servicio)
+@receiver([post_save, post_delete], sender=Horario)
+def servicio_u_horario_cambiado(sender, instance, **kwargs):
+    """Invalida el contexto compilado del bot del servicio u horario y los listados de su cliente"""
+    contexto_bot.invalidar_bot(instance.bot_id)
+    colecciones.invalidar_bot(instance.bot_id)
+
+
+@receiver(post_save, sender=Cliente)
+def cliente_cambiado(sender, instance, update_fields=None, **kwargs):
+    """Invalida los contextos y listados de los bots del cliente salvo al registrar accesos"""
+    if update_fields is not None and set(update_fields) <= {'fecha_ultimo_acceso'}:
+        return
+    contexto_bot.invalidar_cliente(instance.pk)
+    colecciones.invalidar(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def usuario_cambiado(sender, instance, update_fields=None, **kwargs):
+    """Invalida las respuestas cacheadas de su cliente salvo al registrar el login"""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    colecciones.invalidar(Cliente.objects.filter(user_id=instance.pk).values_list('id', flat=True).first())
+
+
+# Permisos que los tokens JWT llevan como claims
+PERMISOS_TOKEN = ('is_active', 'is_staff', 'is_superuser')
+
+
+@receiver(pre_save, sender=User)
+def usuario_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda los permisos previos del usuario para revocar sus tokens si cambian"""
+    instance._permisos_previos = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not set(update_fields) & set(PERMISOS_TOKEN):
+        return
+    instance._permisos_previos = User.objects.filter(pk=instance.pk).values_list(*PERMISOS_TOKEN).first()
+
+
+@receiver(post_save, sender=User)
+def usuario_permisos_cambiados(sender, instance, **kwargs):
+    """Revoca los tokens emitidos con permisos que el usuario ya no tiene"""
+    previos = getattr(instance, '_permisos_previos', None)
+    if previos is not None and previos != tuple(getattr(instance, campo) for campo in PERMISOS_TOKEN):
+        revocacion.revocar_usuario(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def usuario_eliminado(sender, instance, **kwargs):
+    """Revoca los tokens del usuario eliminado"""
+    revocacion.revocar_usuario(instance.pk)
@@ -0,0 +1,168 @@
+# core/stats.py
+"""
+Bloques de estadísticas compartidos por los endpoints de dashboard.
+
+Cada bloque se resuelve con una única consulta por tabla usando agregados
+condicionales (``Count(filter=Q(...))``) en lugar de un ``.count()`` por cifra.
+Los totales de reservas de los dashboards se leen del resumen diario
+(ResumenReservasDiario) para no recorrer la tabla de reservas.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+from django.utils import timezone
+from .models import Cliente, Bot, Reserva, ResumenReservasDiario
+
+
+def conteos(queryset, **condiciones):
+    """
+    Cuenta las filas del queryset y, en la misma consulta, las que cumplen
+    cada condición. Retorna un dict con 'total' y una clave por condición.
+    """
+    agregados = {nombre: Count('pk', filter=q) for nombre, q in condiciones.items()}
+    return queryset.order_by().aggregate(total=Count('pk'), **agregados)
+
+
+def usuarios_stats(desde=None):
+    """Totales de usuarios y altas desde `desde`"""
+    condiciones = {
+        'active': Q(is_active=True),
+        'superusers': Q(is_superuser=True),
+        'staff': Q(is_staff=True),
+    }
+    if desde is not None:
+        condiciones['nuevos'] = Q(date_joined__gte=desde)
+    return conteos(User.objects.all(), **condiciones)
+
+
+def clientes_stats(desde=None):
+    """Totales de emprendimientos por status, con bots y altas desde `desde`"""
+    condiciones = {
+        'with_bots': Q(Exists(Bot.objects.filter(cliente=OuterRef('pk')))),
+        'activo': Q(status='activo'),
+        'suspendido': Q(status='suspendido'),
+        'inactivo': Q(status='inactivo'),
+    }
+    if desde is not None:
+        condiciones['nuevos'] = Q(fecha_registro__gte=desde)
+    return conteos(Cliente.objects.all(), **condiciones)
+
+
+def bots_stats(queryset=None):
+    """Totales de bots activos e inactivos"""
+    if queryset is None:
+        queryset = Bot.objects.all()
+    return conteos(queryset, active=Q(activo=True), inactive=Q(activo=False))
+
+
+def reservas_stats(queryset=None, **rangos):
+    """
+    Totales de reservas por estado. Cada argumento extra es un Q adicional
+    (por ejemplo un rango de fechas) que se cuenta en la misma consulta.
+    """
+    if queryset is None:
+        queryset = Reserva.objects.all()
+    return conteos(
+        queryset,
+        confirmed=Q(estado='Confirmada'),
+        pending=Q(estado='Pendiente'),
+        cancelled=Q(estado='Cancelada'),
+        **rangos
+    )
+
+
+def resumen_stats(queryset=None, **rangos):
+    """
+    Totales de reservas por estado leídos del resumen diario. Cada argumento
+    extra es un Q sobre las filas del resumen (por ejemplo un rango de `fecha`)
+    cuyo total se calcula en la misma consulta.
+    """
+    if queryset is None:
+        queryset = ResumenReservasDiario.objects.all()
+    total_dia = F('confirmadas') + F('pendientes') + F('canceladas')
+    agregados = {nombre: Sum(total_dia, filter=q) for nombre, q in rangos.items()}
+    datos = queryset.order_by().aggregate(
+        confirmed=Sum('confirmadas'),
+        pending=Sum('pendientes'),
+        cancelled=Sum('canceladas'),
+        revenue=Sum('ingresos'),
+        **agregados
+    )
+    datos = {clave: valor or 0 for clave, valor in datos.items()}
+    datos['revenue'] = datos['revenue'] or Decimal('0')
+    datos['total'] = datos['confirmed'] + datos['pending'] + datos['cancelled']
+    return datos
+
+
+def admin_stats(now=None):
+    """Bloques de estadísticas del dashboard de administrador"""
+    now = now or timezone.now()
+    last_30_days = now - timedelta(days=30)
+
+    usuarios = usuarios_stats(desde=last_30_days)
+    clientes = clientes_stats()
+    bots = bots_stats()
+    reservas = resumen_stats(recientes=Q(fecha__gte=timezone.localdate(last_30_days)))
+
+    return {
+        'users': {
+            'total': usuarios['total'],
+            'active': usuarios['active'],
+            'superusers': usuarios['superusers'],
+            'staff': usuarios['staff'],
+        },
+        'clientes': {
+            'total': clientes['total'],
+            'with_bots': clientes['with_bots'],
+        },
+        'bots': {
+            'total': bots['total'],
+            'active': bots['active'],
+            'inactive': bots['inactive'],
+        },
+        'reservations': {
+            'total': reservas['total'],
+            'confirmed': reservas['confirmed'],
+            'pending': reservas['pending'],
+            'cancelled': reservas['cancelled'],
+        },
+        'recent_activity': {
+            'new_users_30d': usuarios['nuevos'],
+            'new_reservations_30d': reservas['recientes'],
+        },
+    }
+
+
+def emprendimiento_stats(cliente, now=None):
+    """
+    Bloques de bots y reservas del dashboard de un emprendimiento; `cliente`
+    puede ser la instancia o su id
+    """
+    now = now or timezone.now()
+    this_month = timezone.localdate(now).replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+
+    bots = bots_stats(Bot.objects.filter(cliente=cliente))
+    reservas = resumen_stats(
+        ResumenReservasDiario.objects.filter(cliente=cliente),
+        this_month=Q(fecha__gte=this_month),
+        last_month=Q(fecha__gte=last_month, fecha__lt=this_month),
+    )
+
+    return {
+        'bots': {
+            'total': bots['total'],
+            'active': bots['active'],
+            'inactive': bots['inactive'],
+        },
+        'reservations': {
+            'total': reservas['total'],
+            'confirmed': reservas['confirmed'],
+            'pending': reservas['pending'],
+            'cancelled': reservas['cancelled'],
+            'this_month': reservas['this_month'],
+            'last_month': reservas['last_month'],
+            'revenue': reservas['revenue'],
+        },
+    }
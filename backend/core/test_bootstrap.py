@@ -0,0 +1,116 @@
+# core/test_bootstrap.py
+import json
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Reserva
+
+
+class DashboardBootstrapTestCase(APITestCase):
+    """
+    Tests del endpoint de datos iniciales del dashboard
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        otro = Cliente.objects.create(
+            user=User.objects.create_user(username='otro', password='otro123'),
+            nombre_emprendimiento='Otro Negocio'
+        )
+        bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema', whatsapp_phone_id='111'
+        )
+        Bot.objects.create(cliente=otro, nombre='Bot Ajeno', prompt_sistema='Sistema', whatsapp_phone_id='222')
+        servicio = Servicio.objects.create(bot=bot, nombre='Corte', precio=10)
+        inicio = timezone.now() + timedelta(days=1)
+        for i in range(3):
+            Reserva.objects.create(
+                bot=bot, servicio=servicio, cliente_final_nombre=f'Cliente {i}',
+                cliente_final_telefono='000', fecha_hora_inicio=inicio + timedelta(hours=i),
+                fecha_hora_fin=inicio + timedelta(hours=i, minutes=30)
+            )
+
+        self.client = APIClient()
+        access = self.client.post(
+            '/api/token/', {'username': 'cliente_test', 'password': 'test123'}
+        ).data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def json(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_bootstrap_matches_individual_endpoints(self):
+        """
+        Test: Cada sección coincide con la respuesta del endpoint que reemplaza
+        """
+        data = self.json('/api/dashboard/bootstrap/?page_size=2')
+
+        self.assertEqual(data['me'], self.json('/api/me/'))
+        self.assertEqual(data['config'], self.json('/api/dashboard/config/'))
+        self.assertEqual(data['bots'], self.json('/api/bots/'))
+        self.assertEqual(data['servicios'], self.json('/api/servicios/'))
+        reservas = self.json('/api/reservas/?page_size=2')
+        self.assertEqual(data['reservas']['results'], reservas['results'])
+        self.assertEqual(len(data['bots']), 1)
+
+        # La página siguiente se pide a reservas/
+        self.assertIn('/api/reservas/?', data['reservas']['next'])
+        siguiente = self.json(data['reservas']['next'])
+        self.assertEqual(siguiente['results'], self.json(reservas['next'])['results'])
+        self.assertIsNone(siguiente['next'])
+
+    def test_bootstrap_query_count(self):
+        """
+        Test: La respuesta completa se arma con un número fijo de consultas
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            self.json('/api/dashboard/bootstrap/')
+        for i in range(5):
+            Reserva.objects.create(
+                bot=Bot.objects.get(nombre='Bot Test'), cliente_final_nombre=f'Extra {i}',
+                cliente_final_telefono='000',
+                fecha_hora_inicio=timezone.now() + timedelta(days=5, hours=i),
+                fecha_hora_fin=timezone.now() + timedelta(days=5, hours=i, minutes=30)
+            )
+        with CaptureQueriesContext(connection) as ctx_mas:
+            self.json('/api/dashboard/bootstrap/')
+        self.assertEqual(len(ctx.captured_queries), len(ctx_mas.captured_queries))
+        self.assertLessEqual(len(ctx.captured_queries), 8)
+
+    def test_sections_and_date_filters(self):
+        """
+        Test: ?secciones= limita la respuesta y los filtros de fecha aplican a las reservas
+        """
+        data = self.json('/api/dashboard/bootstrap/?secciones=config')
+        self.assertEqual(list(data), ['config'])
+        self.assertEqual(data['config']['dashboard_type'], 'emprendimiento_dashboard')
+
+        hasta = (timezone.now() - timedelta(days=1)).date().isoformat()
+        data = self.json(f'/api/dashboard/bootstrap/?secciones=reservas&hasta={hasta}')
+        self.assertEqual(data['reservas'], {'next': None, 'results': []})
+
+        response = self.client.get('/api/dashboard/bootstrap/?secciones=config,otra')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_without_cliente(self):
+        """
+        Test: Un admin sin perfil de cliente recibe todos los bots y cliente None
+        """
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        self.client.credentials()
+        self.client.force_authenticate(user=admin)
+        data = self.json('/api/dashboard/bootstrap/')
+        self.assertIsNone(data['me']['cliente'])
+        self.assertEqual(data['config']['dashboard_type'], 'admin_dashboard')
+        self.assertEqual(len(data['bots']), 2)
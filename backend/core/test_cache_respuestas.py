@@ -0,0 +1,131 @@
+# core/test_cache_respuestas.py
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio
+from . import cache_respuestas
+
+
+class CacheRespuestasTestCase(APITestCase):
+    """
+    Tests del cache de respuestas de dashboard por rol y cliente
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        caches['respuestas'].clear()
+        cache_respuestas.contadores.reiniciar()
+
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(user=self.user, nombre_emprendimiento='Negocio Test')
+        self.otro_user = User.objects.create_user(username='otro', password='otro123')
+        self.otro = Cliente.objects.create(user=self.otro_user, nombre_emprendimiento='Otro Negocio')
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema', whatsapp_phone_id='111'
+        )
+        self.bot_ajeno = Bot.objects.create(
+            cliente=self.otro, nombre='Bot Ajeno', prompt_sistema='Sistema', whatsapp_phone_id='222'
+        )
+        self.admin = User.objects.create_superuser(username='admin', password='admin123')
+
+        self.client = self.cliente_con_token('cliente_test', 'test123')
+        self.otro_client = self.cliente_con_token('otro', 'otro123')
+        self.admin_client = self.cliente_con_token('admin', 'admin123')
+
+    def cliente_con_token(self, username, password):
+        client = APIClient()
+        access = client.post('/api/token/', {'username': username, 'password': password}).data['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, len(ctx.captured_queries)
+
+    def test_hit_skips_queries(self):
+        """
+        Test: La segunda llamada se responde desde el cache sin consultas SQL
+        """
+        for url in ('/api/dashboard/config/', '/api/dashboard/emprendimiento/stats/'):
+            primera, consultas = self.get(self.client, url)
+            self.assertGreater(consultas, 0)
+            segunda, consultas = self.get(self.client, url)
+            self.assertEqual(segunda, primera)
+            self.assertEqual(consultas, 0)
+
+        primera, _ = self.get(self.admin_client, '/api/admin/emprendimientos/stats/')
+        segunda, consultas = self.get(self.admin_client, '/api/admin/emprendimientos/stats/')
+        self.assertEqual(segunda, primera)
+        self.assertEqual(consultas, 0)
+
+    def test_write_evicts_only_its_tenant(self):
+        """
+        Test: Una escritura invalida las entradas de su cliente y de los admins, no las de otros
+        """
+        self.get(self.client, '/api/dashboard/emprendimiento/stats/')
+        self.get(self.otro_client, '/api/dashboard/emprendimiento/stats/')
+        self.get(self.admin_client, '/api/admin/emprendimientos/stats/')
+
+        Bot.objects.create(
+            cliente=self.cliente, nombre='Nuevo', prompt_sistema='Sistema', whatsapp_phone_id='333'
+        )
+
+        data, consultas = self.get(self.client, '/api/dashboard/emprendimiento/stats/')
+        self.assertGreater(consultas, 0)
+        self.assertEqual(data['bots']['total'], 2)
+        _, consultas = self.get(self.otro_client, '/api/dashboard/emprendimiento/stats/')
+        self.assertEqual(consultas, 0)
+        _, consultas = self.get(self.admin_client, '/api/admin/emprendimientos/stats/')
+        self.assertGreater(consultas, 0)
+
+        Servicio.objects.create(bot=self.bot_ajeno, nombre='Corte', precio=10)
+        _, consultas = self.get(self.client, '/api/dashboard/emprendimiento/stats/')
+        self.assertEqual(consultas, 0)
+
+    def test_config_is_per_user(self):
+        """
+        Test: La configuración cacheada lleva los datos de cada usuario
+        """
+        data, _ = self.get(self.client, '/api/dashboard/config/')
+        self.assertEqual(data['user_info']['username'], 'cliente_test')
+        data, _ = self.get(self.otro_client, '/api/dashboard/config/')
+        self.assertEqual(data['user_info']['username'], 'otro')
+        data, _ = self.get(self.admin_client, '/api/dashboard/config/')
+        self.assertEqual(data['dashboard_type'], 'admin_dashboard')
+
+        self.user.email = 'nuevo@test.com'
+        self.user.save()
+        data, _ = self.get(self.client, '/api/dashboard/config/')
+        self.assertEqual(data['user_info']['email'], 'nuevo@test.com')
+
+    def test_counters_exposed_to_admins(self):
+        """
+        Test: Los aciertos y fallos se exponen solo a los admins
+        """
+        self.get(self.client, '/api/dashboard/emprendimiento/stats/')
+        self.get(self.client, '/api/dashboard/emprendimiento/stats/')
+        self.get(self.client, '/api/dashboard/emprendimiento/stats/')
+
+        response = self.client.get('/api/dashboard/admin/cache/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        data, _ = self.get(self.admin_client, '/api/dashboard/admin/cache/')
+        self.assertEqual(data['views']['emprendimiento_dashboard_stats'], {
+            'hits': 2, 'misses': 1, 'hit_ratio': 0.667,
+        })
+
+    @override_settings(RESPONSE_CACHE_TTLS={'emprendimiento_dashboard_stats': 0})
+    def test_ttl_from_settings(self):
+        """
+        Test: El TTL de cada vista se lee de RESPONSE_CACHE_TTLS
+        """
+        self.get(self.client, '/api/dashboard/emprendimiento/stats/')
+        _, consultas = self.get(self.client, '/api/dashboard/emprendimiento/stats/')
+        self.assertGreater(consultas, 0)
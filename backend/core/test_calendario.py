@@ -0,0 +1,122 @@
+# core/test_calendario.py
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Reserva
+
+
+class CalendarioTestCase(APITestCase):
+    """
+    Tests del resumen mensual de reservas por día para el calendario
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(user=self.user, nombre_emprendimiento='Negocio Test')
+        otro = Cliente.objects.create(
+            user=User.objects.create_user(username='otro', password='otro123'),
+            nombre_emprendimiento='Otro Negocio'
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema', whatsapp_phone_id='111'
+        )
+        self.otro_bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Dos', prompt_sistema='Sistema', whatsapp_phone_id='333'
+        )
+        self.bot_ajeno = Bot.objects.create(
+            cliente=otro, nombre='Bot Ajeno', prompt_sistema='Sistema', whatsapp_phone_id='222'
+        )
+        self.reservar(self.bot, date(2030, 3, 5), 9)
+        self.reservar(self.bot, date(2030, 3, 5), 10, estado='Pendiente')
+        self.reservar(self.otro_bot, date(2030, 3, 5), 9, estado='Cancelada')
+        self.reservar(self.bot, date(2030, 3, 31), 18)
+        self.reservar(self.bot, date(2030, 4, 1), 9)
+        self.reservar(self.bot_ajeno, date(2030, 3, 5), 9)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def reservar(self, bot, dia, hora, estado='Confirmada'):
+        inicio = timezone.make_aware(datetime.combine(dia, time(hora)))
+        return Reserva.objects.create(
+            bot=bot, cliente_final_nombre='Ana', cliente_final_telefono='000', estado=estado,
+            fecha_hora_inicio=inicio, fecha_hora_fin=inicio + timedelta(minutes=30)
+        )
+
+    def test_counts_per_day(self):
+        """
+        Test: El calendario agrupa las reservas del mes por día y estado
+        """
+        response = self.client.get('/api/reservas/calendario/?mes=2030-03')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['mes'], '2030-03')
+        self.assertEqual(response.data['dias'], [
+            {'fecha': date(2030, 3, 5), 'confirmadas': 1, 'pendientes': 1, 'canceladas': 1, 'total': 3},
+            {'fecha': date(2030, 3, 31), 'confirmadas': 1, 'pendientes': 0, 'canceladas': 0, 'total': 1},
+        ])
+
+        response = self.client.get(f'/api/reservas/calendario/?mes=2030-03&bot={self.otro_bot.id}')
+        self.assertEqual([dia['canceladas'] for dia in response.data['dias']], [1])
+
+    def test_single_query_regardless_of_history(self):
+        """
+        Test: El calendario usa una consulta sin importar cuántas reservas haya
+        """
+        def consultas():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/reservas/calendario/?mes=2030-03')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        antes = consultas()
+        for hora in range(8, 20):
+            self.reservar(self.bot, date(2030, 3, 12), hora)
+        self.assertEqual(consultas(), antes)
+
+    def test_admin_sees_all_and_etag(self):
+        """
+        Test: Los admins ven todos los clientes y el calendario responde 304 sin cambios
+        """
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        self.client.force_authenticate(user=admin)
+        response = self.client.get('/api/reservas/calendario/?mes=2030-03')
+        self.assertEqual(response.data['dias'][0]['total'], 4)
+
+        etag = response['ETag']
+        response = self.client.get('/api/reservas/calendario/?mes=2030-03', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.reservar(self.bot, date(2030, 3, 20), 9)
+        response = self.client.get('/api/reservas/calendario/?mes=2030-03', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_default_month_etag_changes_with_month(self):
+        """
+        Test: Sin ?mes el ETag cambia al pasar de mes y no se responde 304 con el mes anterior
+        """
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2030, 3, 31)):
+            response = self.client.get('/api/reservas/calendario/')
+        self.assertEqual(response.data['mes'], '2030-03')
+        etag = response['ETag']
+
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2030, 4, 1)):
+            response = self.client.get('/api/reservas/calendario/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['mes'], '2030-04')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_invalid_month(self):
+        """
+        Test: Un mes con formato inválido retorna 400
+        """
+        for mes in ('2030-13', 'marzo', '9999-12'):
+            response = self.client.get(f'/api/reservas/calendario/?mes={mes}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
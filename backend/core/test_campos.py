@@ -0,0 +1,148 @@
+# core/test_campos.py
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Reserva
+
+
+class CamposDinamicosTestCase(APITestCase):
+    """
+    Tests de ?fields= y ?exclude= en los endpoints de bots, servicios,
+    reservas y emprendimientos
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Prompt muy largo',
+            whatsapp_phone_id='111', descripcion='Descripción'
+        )
+        self.servicio = Servicio.objects.create(bot=self.bot, nombre='Corte', precio=10)
+        inicio = timezone.now() + timedelta(days=3)
+        for i in range(3):
+            Reserva.objects.create(
+                bot=self.bot, servicio=self.servicio, cliente_final_nombre=f'Cliente {i}',
+                cliente_final_telefono='000', fecha_hora_inicio=inicio + timedelta(hours=i),
+                fecha_hora_fin=inicio + timedelta(hours=i, minutes=30), notas='Nota larga'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get_con_sql(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return response, ' '.join(query['sql'] for query in ctx.captured_queries)
+
+    def test_bot_list_fields_skips_columns(self):
+        """
+        Test: ?fields= en el listado de bots no lee ni devuelve las columnas no pedidas
+        """
+        response, sql = self.get_con_sql('/api/bots/?fields=id,nombre')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'id': self.bot.id, 'nombre': 'Bot Test'}])
+        self.assertNotIn('prompt_sistema', sql)
+        self.assertNotIn('core_servicio', sql)
+        self.assertNotIn('core_reserva', sql)
+
+    def test_bot_list_exclude(self):
+        """
+        Test: ?exclude= quita los campos indicados y conserva el resto en orden
+        """
+        response, sql = self.get_con_sql('/api/bots/?exclude=prompt_sistema,descripcion')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('prompt_sistema', sql)
+        self.assertEqual(list(response.data[0]), [
+            'id', 'nombre', 'activo', 'bloqueado', 'whatsapp_phone_id', 'servicios',
+            'total_reservas', 'cliente', 'cliente_nombre', 'esta_operativo',
+            'reservas_pendientes', 'fecha_creacion', 'fecha_modificacion',
+        ])
+        self.assertEqual(response.data[0]['total_reservas'], 3)
+        self.assertTrue(response.data[0]['esta_operativo'])
+
+    def test_bot_retrieve_fields_uses_only(self):
+        """
+        Test: El detalle de un bot con ?fields= restringe el SELECT
+        """
+        response, sql = self.get_con_sql(
+            f'/api/bots/{self.bot.id}/?fields=id,esta_operativo,reservas_pendientes'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'id': self.bot.id, 'esta_operativo': True, 'reservas_pendientes': 0,
+        })
+        self.assertNotIn('prompt_sistema', sql)
+        self.assertNotIn('core_servicio', sql)
+
+    def test_reservas_cursor_pagination_with_fields(self):
+        """
+        Test: Las reservas paginadas por cursor siguen funcionando con ?fields=
+        """
+        response, sql = self.get_con_sql('/api/reservas/?fields=id,puede_cancelar&page_size=2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('notas', sql)
+        self.assertEqual(response.data['results'][0], {
+            'id': response.data['results'][0]['id'], 'puede_cancelar': True,
+        })
+        siguiente = self.client.get(response.data['next'])
+        self.assertEqual(siguiente.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(siguiente.data['results']), 1)
+        self.assertEqual(list(siguiente.data['results'][0]), ['id', 'puede_cancelar'])
+
+    def test_servicios_fields(self):
+        """
+        Test: ?fields= en servicios incluye los campos relacionados pedidos
+        """
+        response, sql = self.get_con_sql('/api/servicios/?fields=nombre,bot_nombre')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'nombre': 'Corte', 'bot_nombre': 'Bot Test'}])
+        self.assertNotIn('descripcion', sql)
+
+    def test_emprendimientos_fields(self):
+        """
+        Test: Los listados y el detalle de emprendimientos respetan ?fields=
+        """
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        self.client.force_authenticate(user=admin)
+
+        response, sql = self.get_con_sql('/api/admin/emprendimientos/?fields=id,username,cantidad_bots')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'id': self.cliente.id, 'username': 'cliente_test', 'cantidad_bots': 1},
+        ])
+        self.assertNotIn('notas_admin', sql)
+
+        response, sql = self.get_con_sql(
+            f'/api/admin/emprendimientos/{self.cliente.id}/?exclude=bots,notas_admin'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('bots', response.data)
+        self.assertEqual(response.data['user']['username'], 'cliente_test')
+        self.assertNotIn('prompt_sistema', sql)
+
+    def test_unknown_field_is_rejected(self):
+        """
+        Test: Un campo desconocido en ?fields= retorna 400
+        """
+        response = self.client.get('/api/bots/?fields=id,inexistente')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+    def test_writes_ignore_fields(self):
+        """
+        Test: Las escrituras devuelven la representación completa
+        """
+        response = self.client.patch(
+            f'/api/bots/{self.bot.id}/?fields=id', {'nombre': 'Nuevo'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['nombre'], 'Nuevo')
+        self.assertIn('prompt_sistema', response.data)
@@ -0,0 +1,179 @@
+# core/test_colecciones.py
+from datetime import time, timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Horario, Reserva, ResumenReservasDiario
+
+
+class ETagListadoTestCase(APITestCase):
+    """
+    Tests de ETags y GET condicional en los listados de bots, servicios y reservas
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        self.otro = Cliente.objects.create(
+            user=User.objects.create_user(username='otro', password='otro123'),
+            nombre_emprendimiento='Otro Negocio'
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema', whatsapp_phone_id='111'
+        )
+        self.bot_ajeno = Bot.objects.create(
+            cliente=self.otro, nombre='Bot Ajeno', prompt_sistema='Sistema', whatsapp_phone_id='222'
+        )
+
+        self.client = APIClient()
+        access = self.client.post(
+            '/api/token/', {'username': 'cliente_test', 'password': 'test123'}
+        ).data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def etag(self, url='/api/bots/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response['ETag']
+
+    def assertNoModificado(self, etag, url='/api/bots/'):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def assertModificado(self, etag, url='/api/bots/'):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_not_modified_without_queries(self):
+        """
+        Test: Un If-None-Match vigente se responde con 304 sin consultas SQL
+        """
+        for url in ('/api/bots/', '/api/servicios/', '/api/reservas/'):
+            etag = self.etag(url)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response['ETag'], etag)
+            self.assertIn('no-cache', response['Cache-Control'])
+            self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertNoModificado(f'W/{self.etag()}')
+
+    def test_changes_invalidate_etag(self):
+        """
+        Test: Crear o modificar bots, servicios, horarios y reservas cambia el ETag
+        """
+        inicio = timezone.now() + timedelta(days=2)
+        cambios = [
+            lambda: Servicio.objects.create(bot=self.bot, nombre='Corte', precio=10),
+            lambda: Horario.objects.create(bot=self.bot, dia_semana=0, hora_inicio=time(9), hora_fin=time(18)),
+            lambda: Reserva.objects.create(
+                bot=self.bot, cliente_final_nombre='Ana', cliente_final_telefono='000',
+                fecha_hora_inicio=inicio, fecha_hora_fin=inicio + timedelta(hours=1)
+            ),
+            lambda: Bot.objects.filter(pk=self.bot.pk).first().save(),
+            lambda: Servicio.objects.filter(bot=self.bot).delete(),
+        ]
+        for cambio in cambios:
+            etag = self.etag()
+            cambio()
+            self.assertModificado(etag)
+
+    def test_other_cliente_changes_keep_etag(self):
+        """
+        Test: Los cambios de otro cliente no invalidan el ETag, pero sí el de los admins
+        """
+        etag = self.etag()
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        admin_client = APIClient()
+        admin_client.force_authenticate(user=admin)
+        etag_admin = admin_client.get('/api/bots/')['ETag']
+        self.assertNotEqual(etag, etag_admin)
+
+        Servicio.objects.create(bot=self.bot_ajeno, nombre='Ajeno', precio=5)
+        self.assertNoModificado(etag)
+        response = admin_client.get('/api/bots/', HTTP_IF_NONE_MATCH=etag_admin)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_moving_to_other_cliente_moves_data_and_invalidates_both(self):
+        """
+        Test: Mover una reserva o un bot a otro cliente mueve sus datos e invalida el ETag de ambos clientes
+        """
+        otro_client = APIClient()
+        otro_client.force_authenticate(user=self.otro.user)
+        inicio = timezone.now() + timedelta(days=2)
+        movida, del_bot = [
+            Reserva.objects.create(
+                bot=self.bot, cliente_final_nombre=nombre, cliente_final_telefono='000',
+                fecha_hora_inicio=inicio + timedelta(hours=i), fecha_hora_fin=inicio + timedelta(hours=i + 1)
+            )
+            for i, nombre in enumerate(('Ana', 'Beto'))
+        ]
+
+        def mover_reserva():
+            movida.bot = self.bot_ajeno
+            movida.save()
+
+        def mover_bot():
+            self.bot.cliente = self.otro
+            self.bot.save()
+
+        for mover, reserva in ((mover_reserva, movida), (mover_bot, del_bot)):
+            with self.subTest(mover=mover.__name__):
+                etags = {url: (self.etag(url), otro_client.get(url)['ETag']) for url in ('/api/reservas/', '/api/bots/')}
+                mover()
+                for url, (etag, etag_otro) in etags.items():
+                    self.assertModificado(etag, url)
+                    response = otro_client.get(url, HTTP_IF_NONE_MATCH=etag_otro)
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+                ids = [r['id'] for r in self.client.get('/api/reservas/').data['results']]
+                ids_otro = [r['id'] for r in otro_client.get('/api/reservas/').data['results']]
+                self.assertNotIn(reserva.id, ids)
+                self.assertIn(reserva.id, ids_otro)
+                self.assertEqual(Reserva.objects.get(pk=reserva.pk).cliente_id, self.otro.id)
+
+        self.assertFalse(Reserva.objects.filter(cliente=self.cliente).exists())
+        self.assertFalse(ResumenReservasDiario.objects.filter(cliente=self.cliente).exists())
+        self.assertEqual(ResumenReservasDiario.objects.filter(cliente=self.otro, bot=self.bot).count(), 1)
+
+    def test_etag_depends_on_query(self):
+        """
+        Test: El ETag depende de los parámetros del listado
+        """
+        self.assertNotEqual(self.etag('/api/bots/'), self.etag('/api/bots/?fields=id'))
+        self.assertNoModificado(self.etag('/api/bots/?fields=id'), '/api/bots/?fields=id')
+
+    def test_status_change_with_update_invalidates(self):
+        """
+        Test: Suspender el emprendimiento invalida el ETag y desactiva los bots
+        """
+        etag = self.etag()
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        admin_client = APIClient()
+        admin_client.force_authenticate(user=admin)
+        response = admin_client.post(
+            f'/api/admin/emprendimientos/{self.cliente.id}/change_status/', {'status': 'suspendido'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get('/api/bots/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data[0]['activo'])
+
+    def test_reservas_etag_expires(self):
+        """
+        Test: El ETag de reservas vence con el tiempo por puede_cancelar
+        """
+        etag = self.etag('/api/reservas/')
+        self.assertNoModificado(etag, '/api/reservas/')
+        with mock.patch('core.colecciones.time.time', return_value=timezone.now().timestamp() + 120):
+            self.assertModificado(etag, '/api/reservas/')
@@ -0,0 +1,111 @@
+# core/test_contexto_bot.py
+import json
+from datetime import time
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Horario
+from . import contexto_bot
+
+
+class ContextoBotTestCase(APITestCase):
+    """
+    Tests del contexto compilado de bots por whatsapp_phone_id
+    """
+
+    def setUp(self):
+        cache.clear()
+        contexto_bot.contextos.clear()
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema',
+            whatsapp_phone_id='111', activo=True
+        )
+        self.servicio = Servicio.objects.create(bot=self.bot, nombre='Corte', precio=10)
+        Horario.objects.create(bot=self.bot, dia_semana=0, hora_inicio=time(9), hora_fin=time(18))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def contexto(self, phone_id='111'):
+        entrada = contexto_bot.obtener_contexto(phone_id)
+        return json.loads(entrada[3]) if entrada else None
+
+    def test_repeated_lookup_is_cache_hit_without_queries(self):
+        """
+        Test: Con el contexto vigente la búsqueda no consulta la base
+        """
+        primero = self.contexto()
+        self.assertEqual(primero['bot']['prompt_sistema'], 'Sistema')
+        self.assertEqual(primero['servicios'][0]['nombre'], 'Corte')
+        self.assertEqual(primero['horarios'][0]['hora_inicio'], '09:00:00')
+        self.assertEqual(primero['cliente']['status'], 'activo')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.contexto(), primero)
+        self.assertEqual(contexto_bot.contextos.hits, 1)
+
+    def test_related_saves_invalidate(self):
+        """
+        Test: Guardar servicios, horarios, el bot o el cliente recompila el contexto
+        """
+        self.contexto()
+
+        self.servicio.precio = 15
+        self.servicio.save()
+        self.assertEqual(self.contexto()['servicios'][0]['precio'], '15.00')
+
+        Horario.objects.create(bot=self.bot, dia_semana=1, hora_inicio=time(9), hora_fin=time(12))
+        self.assertEqual(len(self.contexto()['horarios']), 2)
+
+        self.bot.prompt_sistema = 'Nuevo prompt'
+        self.bot.save()
+        self.assertEqual(self.contexto()['bot']['prompt_sistema'], 'Nuevo prompt')
+
+        self.cliente.status = 'suspendido'
+        self.cliente.save()
+        self.assertFalse(self.contexto()['bot']['esta_operativo'])
+
+    def test_last_access_does_not_invalidate(self):
+        """
+        Test: Registrar el último acceso del cliente no invalida el contexto
+        """
+        self.contexto()
+        self.cliente.actualizar_ultimo_acceso()
+        with self.assertNumQueries(0):
+            self.contexto()
+
+    def test_changed_phone_id_not_found(self):
+        """
+        Test: Al cambiar el phone id el anterior deja de resolver
+        """
+        self.contexto()
+        self.bot.whatsapp_phone_id = '999'
+        self.bot.save()
+        self.assertIsNone(self.contexto('111'))
+        self.assertEqual(self.contexto('999')['bot']['id'], self.bot.id)
+
+    def test_endpoint_etag_and_tenant(self):
+        """
+        Test: El endpoint devuelve el contexto con ETag, 304 y 404 para otro tenant
+        """
+        url = '/api/bots/contexto/111/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['bot']['id'], self.bot.id)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        otro_user = User.objects.create_user(username='otro', password='test123')
+        Cliente.objects.create(user=otro_user, nombre_emprendimiento='Otro')
+        self.client.force_authenticate(user=otro_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            self.client.get('/api/bots/contexto/000/').status_code, status.HTTP_404_NOT_FOUND
+        )
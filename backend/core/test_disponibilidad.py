@@ -0,0 +1,123 @@
+# core/test_disponibilidad.py
+from datetime import datetime, time, timedelta
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Horario, Reserva
+from .disponibilidad import restar_intervalos, turnos_libres
+
+
+def aware(dia, hora, minuto=0):
+    return timezone.make_aware(datetime.combine(dia, time(hora, minuto)))
+
+
+class RestarIntervalosTestCase(SimpleTestCase):
+    """
+    Tests del barrido que resta intervalos ocupados de las aperturas
+    """
+
+    def test_subtracts_overlapping_and_spanning_intervals(self):
+        """
+        Test: Ocupados parciales, contiguos y que cruzan aperturas se restan bien
+        """
+        abiertos = [(9, 13), (14, 18)]
+        ocupados = [(8, 10), (11, 12), (12, 12.5), (17, 20)]
+        self.assertEqual(
+            restar_intervalos(abiertos, ocupados),
+            [(10, 11), (12.5, 13), (14, 17)]
+        )
+
+    def test_no_ocupados(self):
+        """
+        Test: Sin reservas las aperturas quedan libres completas
+        """
+        self.assertEqual(restar_intervalos([(9, 10)], []), [(9, 10)])
+
+
+class DisponibilidadTestCase(APITestCase):
+    """
+    Tests del endpoint de disponibilidad de turnos de un bot
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema',
+            whatsapp_phone_id='111', activo=True
+        )
+        self.servicio = Servicio.objects.create(
+            bot=self.bot, nombre='Corte', precio=10, duracion_minutos=30
+        )
+        # Un lunes futuro con horario 09:00-12:00
+        hoy = timezone.localdate()
+        self.lunes = hoy + timedelta(days=7 - hoy.weekday())
+        Horario.objects.create(bot=self.bot, dia_semana=0, hora_inicio=time(9), hora_fin=time(12))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def reservar(self, hora, minuto=0, duracion=60, estado='Confirmada'):
+        inicio = aware(self.lunes, hora, minuto)
+        return Reserva.objects.create(
+            bot=self.bot, servicio=self.servicio,
+            cliente_final_nombre='Cliente', cliente_final_telefono='000',
+            fecha_hora_inicio=inicio, fecha_hora_fin=inicio + timedelta(minutes=duracion),
+            estado=estado
+        )
+
+    def test_turnos_exclude_booked_intervals(self):
+        """
+        Test: Las reservas activas ocupan sus turnos y las canceladas no
+        """
+        self.reservar(10, duracion=60)
+        self.reservar(9, estado='Cancelada')
+
+        turnos = turnos_libres(self.bot, self.lunes, self.lunes, timedelta(minutes=30))
+        self.assertEqual(
+            [inicio.time() for inicio, _ in turnos],
+            [time(9), time(9, 30), time(11), time(11, 30)]
+        )
+
+    def test_endpoint_uses_servicio_duration(self):
+        """
+        Test: El endpoint usa la duración del servicio y filtra por rango
+        """
+        self.reservar(9, 30, duracion=30)
+        response = self.client.get(
+            f'/api/bots/{self.bot.id}/disponibilidad/',
+            {'desde': self.lunes.isoformat(), 'hasta': self.lunes.isoformat(),
+             'servicio': self.servicio.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['duracion_minutos'], 30)
+        self.assertEqual(len(response.data['turnos']), 5)
+
+    def test_query_count_independent_of_history(self):
+        """
+        Test: La cantidad de consultas no depende de las reservas fuera del rango
+        """
+        for semanas in range(1, 20):
+            inicio = aware(self.lunes - timedelta(weeks=semanas), 9)
+            Reserva.objects.create(
+                bot=self.bot, servicio=self.servicio,
+                cliente_final_nombre='Cliente', cliente_final_telefono='000',
+                fecha_hora_inicio=inicio, fecha_hora_fin=inicio + timedelta(hours=1)
+            )
+        with self.assertNumQueries(2):
+            turnos_libres(self.bot, self.lunes, self.lunes, timedelta(hours=1))
+
+    def test_invalid_range(self):
+        """
+        Test: Un rango invertido o demasiado largo retorna 400
+        """
+        url = f'/api/bots/{self.bot.id}/disponibilidad/'
+        response = self.client.get(url, {'desde': '2030-01-10', 'hasta': '2030-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'desde': '2030-01-01', 'hasta': '2030-03-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
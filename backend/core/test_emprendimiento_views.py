@@ -0,0 +1,156 @@
+# core/test_emprendimiento_views.py
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Reserva
+from .serializers import ClienteListSerializer
+
+
+class EmprendimientoListQueriesTestCase(APITestCase):
+    """
+    Tests para validar que el listado de emprendimientos resuelve sus
+    contadores en SQL y no con una consulta por fila
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.superuser = User.objects.create_superuser(
+            username='admin_test',
+            email='admin@test.com',
+            password='admin123'
+        )
+        self.client.force_authenticate(user=self.superuser)
+
+    def crear_emprendimiento(self, indice, cantidad_bots=2, reservas_por_bot=2):
+        user = User.objects.create_user(
+            username=f'emprendimiento_{indice}',
+            email=f'emp{indice}@test.com',
+            password='test123'
+        )
+        cliente = Cliente.objects.create(
+            user=user,
+            nombre_emprendimiento=f'Negocio {indice}',
+            max_bots_allowed=5
+        )
+        inicio = timezone.now() + timedelta(days=1)
+        for b in range(cantidad_bots):
+            bot = Bot.objects.create(
+                cliente=cliente,
+                nombre=f'Bot {indice}-{b}',
+                prompt_sistema='Sistema',
+                whatsapp_phone_id=f'phone-{indice}-{b}',
+                activo=(b == 0)
+            )
+            servicio = Servicio.objects.create(bot=bot, nombre='Corte', precio=10)
+            for r in range(reservas_por_bot):
+                Reserva.objects.create(
+                    bot=bot,
+                    servicio=servicio,
+                    cliente_final_nombre='Cliente',
+                    cliente_final_telefono='000',
+                    fecha_hora_inicio=inicio + timedelta(hours=r),
+                    fecha_hora_fin=inicio + timedelta(hours=r + 1)
+                )
+        return cliente
+
+    def contar_consultas_listado(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/admin/emprendimientos/?page_size=50')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_list_query_count_is_constant(self):
+        """
+        Test: La cantidad de consultas del listado no crece con los emprendimientos
+        """
+        self.crear_emprendimiento(1)
+        consultas_pocos, _ = self.contar_consultas_listado()
+
+        for i in range(2, 12):
+            self.crear_emprendimiento(i)
+        consultas_muchos, response = self.contar_consultas_listado()
+
+        self.assertEqual(response.data['count'], 11)
+        self.assertEqual(consultas_pocos, consultas_muchos)
+
+    def test_list_annotated_values_match_properties(self):
+        """
+        Test: Los valores anotados coinciden con las propiedades del modelo
+        """
+        cliente = self.crear_emprendimiento(1, cantidad_bots=3, reservas_por_bot=4)
+        _, response = self.contar_consultas_listado()
+
+        fila = response.data['results'][0]
+        self.assertEqual(fila['cantidad_bots'], cliente.cantidad_bots)
+        self.assertEqual(fila['cantidad_reservas'], cliente.cantidad_reservas)
+        self.assertEqual(fila['cantidad_bots'], 3)
+        self.assertEqual(fila['cantidad_reservas'], 12)
+        self.assertEqual(fila['username'], 'emprendimiento_1')
+
+    def test_retrieve_uses_annotated_counters(self):
+        """
+        Test: El detalle expone los mismos contadores que las propiedades
+        """
+        cliente = self.crear_emprendimiento(1, cantidad_bots=2, reservas_por_bot=3)
+        response = self.client.get(f'/api/admin/emprendimientos/{cliente.id}/profile/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['cantidad_bots'], 2)
+        self.assertEqual(response.data['cantidad_bots_activos'], 1)
+        self.assertEqual(response.data['cantidad_reservas'], 6)
+        self.assertEqual(response.data['cantidad_reservas_mes_actual'],
+                         cliente.cantidad_reservas_mes_actual)
+        self.assertEqual(response.data['puede_crear_bot'], cliente.puede_crear_bot)
+
+    def test_serializer_falls_back_to_properties(self):
+        """
+        Test: Sin anotaciones el serializer recurre a las propiedades del modelo
+        """
+        cliente = self.crear_emprendimiento(1, cantidad_bots=1, reservas_por_bot=2)
+        data = ClienteListSerializer(Cliente.objects.get(pk=cliente.pk)).data
+        self.assertEqual(data['cantidad_bots'], 1)
+        self.assertEqual(data['cantidad_reservas'], 2)
+
+    def contar_consultas_perfil(self, cliente):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/admin/emprendimientos/{cliente.id}/profile/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_profile_query_count_independent_of_bots(self):
+        """
+        Test: El perfil con bots, servicios y reservas recientes no agrega
+        consultas por bot
+        """
+        pocos = self.crear_emprendimiento(1, cantidad_bots=1, reservas_por_bot=2)
+        consultas_pocos, _ = self.contar_consultas_perfil(pocos)
+
+        muchos = self.crear_emprendimiento(2, cantidad_bots=5, reservas_por_bot=8)
+        consultas_muchos, response = self.contar_consultas_perfil(muchos)
+
+        self.assertEqual(consultas_pocos, consultas_muchos)
+        self.assertEqual(len(response.data['bots']), 5)
+
+    def test_profile_recent_reservas_match_per_bot_queries(self):
+        """
+        Test: Las reservas recientes y contadores precargados coinciden con
+        las consultas por bot
+        """
+        cliente = self.crear_emprendimiento(1, cantidad_bots=2, reservas_por_bot=7)
+        bot = cliente.bots.first()
+        bot.reservas.filter(pk=bot.reservas.order_by('id').first().pk).update(estado='Pendiente')
+        _, response = self.contar_consultas_perfil(cliente)
+
+        for data in response.data['bots']:
+            bot = Bot.objects.get(pk=data['id'])
+            esperadas = list(
+                bot.reservas.order_by('-fecha_hora_inicio').values_list('id', flat=True)[:5]
+            )
+            self.assertEqual([r['id'] for r in data['reservas_recientes']], esperadas)
+            self.assertEqual(data['total_reservas'], bot.total_reservas)
+            self.assertEqual(data['reservas_pendientes'], bot.reservas_pendientes)
+            self.assertEqual(data['reservas_recientes'][0]['cliente_nombre'], 'Negocio 1')
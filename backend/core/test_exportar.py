@@ -0,0 +1,140 @@
+# core/test_exportar.py
+import csv
+import io
+import json
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Reserva
+
+
+class ExportarTestCase(APITestCase):
+    """
+    Tests de la exportación en streaming de reservas y emprendimientos
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(user=self.user, nombre_emprendimiento='Negocio, "Ñandú"')
+        otro = Cliente.objects.create(
+            user=User.objects.create_user(username='otro', password='otro123'),
+            nombre_emprendimiento='Otro Negocio'
+        )
+        bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema', whatsapp_phone_id='111'
+        )
+        bot_ajeno = Bot.objects.create(
+            cliente=otro, nombre='Bot Ajeno', prompt_sistema='Sistema', whatsapp_phone_id='222'
+        )
+        servicio = Servicio.objects.create(bot=bot, nombre='Corte', precio=10)
+        self.inicio = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        for i in range(5):
+            Reserva.objects.create(
+                bot=bot, servicio=servicio if i % 2 else None, cliente_final_nombre=f'Cliente {i}',
+                cliente_final_telefono='000', fecha_hora_inicio=self.inicio + timedelta(hours=i),
+                fecha_hora_fin=self.inicio + timedelta(hours=i, minutes=30),
+                notas='Línea 1\nLínea 2' if i == 0 else ''
+            )
+        Reserva.objects.create(
+            bot=bot_ajeno, cliente_final_nombre='Ajena', cliente_final_telefono='000',
+            fecha_hora_inicio=self.inicio, fecha_hora_fin=self.inicio + timedelta(minutes=30)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def contenido(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return response, b''.join(response.streaming_content).decode()
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_reservas_csv(self):
+        """
+        Test: El CSV de reservas trae todas las del cliente en orden cronológico
+        """
+        response, texto = self.contenido('/api/reservas/exportar/')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('reservas.csv', response['Content-Disposition'])
+
+        filas = list(csv.DictReader(io.StringIO(texto)))
+        self.assertEqual([fila['cliente_final_nombre'] for fila in filas], [f'Cliente {i}' for i in range(5)])
+        self.assertEqual(filas[0]['notas'], 'Línea 1\nLínea 2')
+        self.assertEqual(filas[0]['cliente_nombre'], 'Negocio, "Ñandú"')
+        self.assertEqual(filas[0]['servicio'], '')
+        self.assertEqual(filas[1]['servicio_nombre'], 'Corte')
+        self.assertEqual(filas[0]['fecha_hora_inicio'], self.inicio.isoformat().replace('+00:00', 'Z'))
+
+    def test_csv_neutralizes_formulas(self):
+        """
+        Test: Las celdas de texto que empiezan como fórmula salen con ' en el CSV y sin cambios en NDJSON
+        """
+        formulas = ['=HYPERLINK("http://x")', '+1+1', '-2+3', '@SUM(A1)']
+        for i, formula in enumerate(formulas):
+            Reserva.objects.filter(cliente_final_nombre=f'Cliente {i}').update(notas=formula)
+
+        _, texto = self.contenido('/api/reservas/exportar/')
+        filas = list(csv.DictReader(io.StringIO(texto)))
+        self.assertEqual([fila['notas'] for fila in filas[:4]], [f"'{formula}" for formula in formulas])
+
+        _, texto = self.contenido('/api/reservas/exportar/?formato=ndjson')
+        registros = [json.loads(linea) for linea in texto.splitlines()]
+        self.assertEqual([r['notas'] for r in registros[:4]], formulas)
+
+    def test_reservas_ndjson_with_date_filter(self):
+        """
+        Test: El NDJSON respeta los filtros de fecha
+        """
+        desde = (self.inicio + timedelta(hours=3)).isoformat().replace('+00:00', 'Z')
+        response, texto = self.contenido(f'/api/reservas/exportar/?formato=ndjson&desde={desde}')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        registros = [json.loads(linea) for linea in texto.splitlines()]
+        self.assertEqual([r['cliente_final_nombre'] for r in registros], ['Cliente 3', 'Cliente 4'])
+        self.assertEqual(registros[0]['estado'], 'Confirmada')
+
+    def test_single_query_and_lazy_start(self):
+        """
+        Test: La exportación usa una sola consulta y el encabezado sale antes de ejecutarla
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/reservas/exportar/')
+            antes = len(ctx.captured_queries)
+            contenido = iter(response.streaming_content)
+            encabezado = next(contenido)
+            self.assertEqual(len(ctx.captured_queries), antes)
+            self.assertTrue(encabezado.startswith(b'id,bot,bot_nombre'))
+            list(contenido)
+        self.assertEqual(len(ctx.captured_queries), antes + 1)
+
+    def test_emprendimientos_export_admin_only(self):
+        """
+        Test: Solo los admins exportan emprendimientos, con sus contadores
+        """
+        response = self.client.get('/api/admin/emprendimientos/exportar/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        self.client.force_authenticate(user=admin)
+        _, texto = self.contenido('/api/admin/emprendimientos/exportar/?formato=ndjson&ordering=id')
+        registros = [json.loads(linea) for linea in texto.splitlines()]
+        self.assertEqual([r['username'] for r in registros], ['cliente_test', 'otro'])
+        self.assertEqual(registros[0]['cantidad_bots'], 1)
+        self.assertEqual(registros[0]['cantidad_reservas'], 5)
+
+        _, texto = self.contenido('/api/reservas/exportar/')
+        self.assertEqual(len(list(csv.DictReader(io.StringIO(texto)))), 6)
+
+    def test_invalid_format(self):
+        """
+        Test: Un formato desconocido retorna 400
+        """
+        response = self.client.get('/api/reservas/exportar/?formato=xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
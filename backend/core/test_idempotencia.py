@@ -0,0 +1,201 @@
+# core/test_idempotencia.py
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Reserva, ClaveIdempotencia
+
+
+class IdempotenciaTestCase(APITestCase):
+    """
+    Tests del header Idempotency-Key en los endpoints de creación
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema',
+            whatsapp_phone_id='111', activo=True
+        )
+        self.servicio = Servicio.objects.create(bot=self.bot, nombre='Corte', precio=10)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.manana = (timezone.localdate() + timedelta(days=1)).isoformat()
+
+    def reservar(self, clave, hora='10:00'):
+        return self.client.post(
+            '/api/reservas/',
+            {'bot': self.bot.id, 'servicio': self.servicio.id, 'fecha': self.manana, 'hora': hora},
+            HTTP_IDEMPOTENCY_KEY=clave
+        )
+
+    def test_retry_replays_first_response(self):
+        """
+        Test: Reintentar con la misma clave reenvía la respuesta sin crear otra reserva
+        """
+        primera = self.reservar('clave-1')
+        self.assertEqual(primera.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(1):
+            segunda = self.reservar('clave-1')
+        self.assertEqual(segunda.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(segunda.data, primera.data)
+        self.assertEqual(segunda['Idempotent-Replayed'], 'true')
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_reused_key_with_other_body_returns_422(self):
+        """
+        Test: Reusar la clave con otro cuerpo retorna 422
+        """
+        self.reservar('clave-1')
+        response = self.reservar('clave-1', hora='12:00')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_conflict_is_replayed(self):
+        """
+        Test: Un 409 también queda guardado y se reenvía
+        """
+        self.reservar('clave-1')
+        self.assertEqual(self.reservar('clave-2').status_code, status.HTTP_409_CONFLICT)
+        response = self.reservar('clave-2')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+
+    def test_retry_while_in_progress_does_not_run_view(self):
+        """
+        Test: Un reintento mientras la primera petición sigue en curso recibe 409 sin
+        ejecutar la vista ni pisar la respuesta que guardará la primera
+        """
+        primera = self.reservar('clave-1')
+        clave = ClaveIdempotencia.objects.get()
+        respuesta = clave.respuesta
+        ClaveIdempotencia.objects.update(status_code=None, respuesta=None)
+
+        response = self.reservar('clave-1')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn('en curso', response.data['error'])
+        self.assertEqual(Reserva.objects.count(), 1)
+
+        # La primera termina: los reintentos siguientes reciben su 201
+        ClaveIdempotencia.objects.update(status_code=primera.status_code, respuesta=respuesta)
+        self.assertEqual(self.reservar('clave-1').status_code, status.HTTP_201_CREATED)
+
+    def test_server_error_releases_key(self):
+        """
+        Test: Si la vista falla con una excepción la clave se libera para reintentar
+        """
+        with mock.patch('core.views.ReservaViewSet.perform_create', side_effect=RuntimeError('caída')):
+            with self.assertRaises(RuntimeError):
+                self.reservar('clave-1')
+        self.assertFalse(ClaveIdempotencia.objects.exists())
+        self.assertEqual(self.reservar('clave-1').status_code, status.HTTP_201_CREATED)
+
+    def test_without_header_is_not_stored(self):
+        """
+        Test: Sin header la creación funciona como siempre y no guarda nada
+        """
+        response = self.client.post('/api/bots/', {
+            'nombre': 'Bot Nuevo', 'prompt_sistema': 'Sistema',
+            'whatsapp_phone_id': '222', 'cliente': self.cliente.id
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(ClaveIdempotencia.objects.exists())
+
+    def test_create_bot_action_is_idempotent(self):
+        """
+        Test: La acción create_bot del admin reenvía el bot ya creado
+        """
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        self.client.force_authenticate(user=admin)
+        url = f'/api/admin/emprendimientos/{self.cliente.id}/create_bot/'
+        datos = {'nombre': 'Bot Admin', 'prompt_sistema': 'Sistema', 'whatsapp_phone_id': '333'}
+
+        primera = self.client.post(url, datos, HTTP_IDEMPOTENCY_KEY='bot-1')
+        segunda = self.client.post(url, datos, HTTP_IDEMPOTENCY_KEY='bot-1')
+        self.assertEqual(primera.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(segunda.data['id'], primera.data['id'])
+        self.assertEqual(Bot.objects.filter(nombre='Bot Admin').count(), 1)
+
+    def test_jwt_user_can_use_idempotency_key(self):
+        """
+        Test: Con un access token (usuario armado desde los claims) las claves se
+        guardan y se reenvían en reservas y en el lote
+        """
+        access = self.client.post(
+            '/api/token/', {'username': 'cliente_test', 'password': 'test123'}
+        ).data['access']
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        primera = self.reservar('jwt-1')
+        segunda = self.reservar('jwt-1')
+        self.assertEqual(primera.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(segunda.data, primera.data)
+        self.assertEqual(segunda['Idempotent-Replayed'], 'true')
+
+        inicio = timezone.now().replace(microsecond=0) + timedelta(days=2)
+        item = {
+            'bot': self.bot.id, 'servicio': self.servicio.id,
+            'fecha_hora_inicio': inicio.isoformat(),
+            'fecha_hora_fin': (inicio + timedelta(hours=1)).isoformat(),
+        }
+        for metodo, cuerpo in (
+            ('post', {'reservas': [item]}),
+            ('patch', {'reservas': [{'id': primera.data['id'], 'notas': 'Lote'}]}),
+        ):
+            with self.subTest(metodo=metodo):
+                enviar = getattr(self.client, metodo)
+                primera_lote = enviar('/api/reservas/lote/', cuerpo, format='json', HTTP_IDEMPOTENCY_KEY=f'lote-{metodo}')
+                segunda_lote = enviar('/api/reservas/lote/', cuerpo, format='json', HTTP_IDEMPOTENCY_KEY=f'lote-{metodo}')
+                self.assertLess(primera_lote.status_code, 300)
+                self.assertEqual(segunda_lote.data, primera_lote.data)
+                self.assertEqual(segunda_lote['Idempotent-Replayed'], 'true')
+
+        self.assertEqual(Reserva.objects.count(), 2)
+        self.assertEqual(ClaveIdempotencia.objects.filter(usuario=self.user).count(), 3)
+
+    def test_same_key_on_other_method_is_not_replayed(self):
+        """
+        Test: Reusar en un PATCH la clave de un POST a la misma ruta, con el mismo cuerpo, aplica el cambio
+        """
+        reserva = self.reservar('previa').data
+        cuerpo = {'reservas': [{'id': reserva['id'], 'notas': 'Lote'}]}
+        primera = self.client.post('/api/reservas/lote/', cuerpo, format='json', HTTP_IDEMPOTENCY_KEY='lote-1')
+        # Los ítems de modificación no son válidos para crear: 400, que queda guardado
+        self.assertEqual(primera.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reserva.objects.get(pk=reserva['id']).notas, '')
+
+        response = self.client.patch('/api/reservas/lote/', cuerpo, format='json', HTTP_IDEMPOTENCY_KEY='lote-1')
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(response.data['modificadas'], 1)
+        self.assertEqual(Reserva.objects.get(pk=reserva['id']).notas, 'Lote')
+
+        response = self.client.patch('/api/reservas/lote/', cuerpo, format='json', HTTP_IDEMPOTENCY_KEY='lote-1')
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(ClaveIdempotencia.objects.filter(clave='lote-1').count(), 2)
+
+    def test_expired_key_runs_again_and_purge(self):
+        """
+        Test: Una clave vencida no se reenvía y el comando de purga la elimina
+        """
+        self.reservar('clave-1')
+        ClaveIdempotencia.objects.update(expira=timezone.now() - timedelta(seconds=1))
+
+        response = self.reservar('clave-1')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(ClaveIdempotencia.objects.count(), 1)
+
+        ClaveIdempotencia.objects.update(expira=timezone.now() - timedelta(seconds=1))
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertFalse(ClaveIdempotencia.objects.exists())
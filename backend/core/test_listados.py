@@ -0,0 +1,92 @@
+# core/test_listados.py
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from .models import Cliente, Bot, Servicio, Reserva
+from .views import BotViewSet, ReservaViewSet, ServicioViewSet
+
+
+class ListadoRapidoTestCase(APITestCase):
+    """
+    Tests para validar que los listados rápidos responden lo mismo que los serializers
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Ñandú', max_bots_allowed=5
+        )
+        bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema',
+            whatsapp_phone_id='111', descripcion='Atiende "todo"'
+        )
+        Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Bloqueado', prompt_sistema='Sistema',
+            whatsapp_phone_id='222', bloqueado=True
+        )
+        servicios = [
+            Servicio.objects.create(bot=bot, nombre='Corte', precio='12.5', duracion_minutos=30),
+            Servicio.objects.create(bot=bot, nombre='Barba', precio=7),
+        ]
+        ahora = timezone.now()
+        inicios = [
+            ahora + timedelta(days=3, microseconds=123),
+            ahora + timedelta(hours=2),
+            ahora - timedelta(days=5),
+        ]
+        for i, inicio in enumerate(inicios):
+            Reserva.objects.create(
+                bot=bot, servicio=servicios[i % 2], cliente_final_nombre=f'Cliente {i}',
+                cliente_final_telefono='000', fecha_hora_inicio=inicio,
+                fecha_hora_fin=inicio + timedelta(hours=1),
+                estado=['Confirmada', 'Pendiente', 'Cancelada'][i], notas='Nota' if i else ''
+            )
+        sin_servicio = Reserva.objects.create(
+            bot=bot, servicio=servicios[0], cliente_final_nombre='Sin servicio',
+            cliente_final_telefono='000', fecha_hora_inicio=ahora + timedelta(days=9),
+            fecha_hora_fin=ahora + timedelta(days=9, hours=1)
+        )
+        servicios[0].delete()
+        self.assertIsNone(Reserva.objects.get(pk=sin_servicio.pk).servicio_id)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def assertMismaRespuesta(self, viewset, url):
+        rapida = self.client.get(url)
+        with mock.patch.object(viewset, 'listado_rapido', None):
+            completa = self.client.get(url)
+        self.assertEqual(rapida.status_code, 200)
+        self.assertEqual(rapida.content, completa.content)
+        return rapida
+
+    def test_reservas_byte_identical(self):
+        """
+        Test: El listado rápido de reservas es idéntico byte a byte
+        """
+        response = self.assertMismaRespuesta(ReservaViewSet, '/api/reservas/')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertMismaRespuesta(ReservaViewSet, '/api/reservas/?page_size=2')
+
+    def test_bots_and_servicios_byte_identical(self):
+        """
+        Test: Los listados rápidos de bots y servicios son idénticos byte a byte
+        """
+        self.cliente.status = 'suspendido'
+        self.cliente.save()
+        response = self.assertMismaRespuesta(BotViewSet, '/api/bots/')
+        self.assertEqual(len(response.data), 2)
+        self.assertMismaRespuesta(ServicioViewSet, '/api/servicios/')
+
+    def test_admin_sees_all(self):
+        """
+        Test: Con un admin el listado rápido también coincide
+        """
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        self.client.force_authenticate(user=admin)
+        self.assertMismaRespuesta(ReservaViewSet, '/api/reservas/')
+        self.assertMismaRespuesta(BotViewSet, '/api/bots/')
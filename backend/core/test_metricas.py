@@ -0,0 +1,165 @@
+# core/test_metricas.py
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente
+from . import cache_respuestas, metricas
+
+
+class MetricasTestCase(APITestCase):
+    """
+    Tests del endpoint de métricas en formato Prometheus
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        caches['respuestas'].clear()
+        cache_respuestas.contadores.reiniciar()
+        metricas.registro.reiniciar()
+
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        Cliente.objects.create(user=self.user, nombre_emprendimiento='Negocio Test')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(
+            user=User.objects.create_superuser(username='admin', password='admin123')
+        )
+
+    def texto(self, **extra):
+        response = self.admin_client.get('/api/metrics/', **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def valor(self, texto, linea):
+        coincidencia = re.search(rf'^{re.escape(linea)} (\S+)$', texto, re.MULTILINE)
+        self.assertIsNotNone(coincidencia, linea)
+        return float(coincidencia.group(1))
+
+    def test_admin_only(self):
+        """
+        Test: Solo los admins pueden leer las métricas
+        """
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_ACCEPT='text/plain').status_code, 403)
+        self.texto(HTTP_ACCEPT='text/plain')
+
+    def test_requests_and_histograms_per_view(self):
+        """
+        Test: Se cuentan requests por vista, método y status con sus histogramas
+        """
+        self.client.get('/api/bots/')
+        self.client.get('/api/bots/')
+        self.client.post('/api/bots/', {}, format='json')
+        self.client.get('/api/dashboard/emprendimiento/stats/')
+        self.client.get('/api/dashboard/emprendimiento/stats/')
+        texto = self.texto()
+
+        self.assertEqual(self.valor(texto, 'panel_http_requests_total{view="bot-list",method="GET",status="2xx"}'), 2)
+        self.assertEqual(self.valor(texto, 'panel_http_requests_total{view="bot-list",method="POST",status="4xx"}'), 1)
+        etiquetas = 'view="bot-list",method="GET"'
+        self.assertEqual(self.valor(texto, f'panel_http_request_duration_seconds_bucket{{{etiquetas},le="+Inf"}}'), 2)
+        self.assertEqual(self.valor(texto, f'panel_http_request_duration_seconds_count{{{etiquetas}}}'), 2)
+        self.assertGreater(self.valor(texto, f'panel_http_request_queries_sum{{{etiquetas}}}'), 0)
+        self.assertEqual(self.valor(
+            texto, 'panel_response_cache_hits_total{view="emprendimiento_dashboard_stats"}'
+        ), 1)
+
+        # Los buckets son acumulativos
+        buckets = [
+            float(valor) for valor in re.findall(
+                rf'^panel_http_request_duration_seconds_bucket{{{etiquetas},le="[^"]+"}} (\S+)$', texto, re.MULTILINE
+            )
+        ]
+        self.assertEqual(buckets, sorted(buckets))
+
+    @override_settings(METRICS_MAX_SERIES=1)
+    def test_series_limit(self):
+        """
+        Test: Pasado METRICS_MAX_SERIES las vistas nuevas se suman en una serie común
+        """
+        self.client.get('/api/bots/')
+        self.client.get('/api/servicios/')
+        self.client.get('/api/reservas/')
+        texto = self.texto()
+        self.assertNotIn('view="servicio-list"', texto)
+        self.assertEqual(self.valor(texto, 'panel_http_requests_total{view="otras",method="GET",status="2xx"}'), 2)
+
+    def test_aggregates_other_processes(self):
+        """
+        Test: Con METRICS_DIR se suman los archivos volcados por los demás procesos
+        """
+        with tempfile.TemporaryDirectory() as carpeta, override_settings(
+            METRICS_DIR=carpeta, METRICS_FLUSH_SECONDS=0
+        ):
+            self.client.get('/api/bots/')
+            propio = json.loads(Path(carpeta, metricas.registro.archivo()).read_text())
+            # El proceso padre del test runner sigue vivo
+            Path(carpeta, f'metricas-{os.getppid()}-1.json').write_text(json.dumps(propio))
+            Path(carpeta, f'metricas-{os.getppid()}-2.json').write_text('{incompleto')
+
+            texto = self.texto()
+            self.assertEqual(
+                self.valor(texto, 'panel_http_requests_total{view="bot-list",method="GET",status="2xx"}'), 2
+            )
+
+    def test_prunes_files_of_finished_processes(self):
+        """
+        Test: Los archivos de procesos terminados y de una ejecución previa con el mismo PID no se suman y se eliminan
+        """
+        terminado = subprocess.Popen([sys.executable, '-c', ''])
+        terminado.wait()
+        with tempfile.TemporaryDirectory() as carpeta, override_settings(
+            METRICS_DIR=carpeta, METRICS_FLUSH_SECONDS=0
+        ):
+            self.client.get('/api/bots/')
+            propio = json.loads(Path(carpeta, metricas.registro.archivo()).read_text())
+            muertos = [
+                Path(carpeta, f'metricas-{terminado.pid}-1.json'),
+                Path(carpeta, f'metricas-{os.getpid()}-{metricas.registro.inicio - 1}.json'),
+            ]
+            for archivo in muertos:
+                archivo.write_text(json.dumps(propio))
+
+            texto = self.texto()
+            self.assertEqual(
+                self.valor(texto, 'panel_http_requests_total{view="bot-list",method="GET",status="2xx"}'), 1
+            )
+            self.assertFalse(any(archivo.exists() for archivo in muertos))
+            self.assertTrue(Path(carpeta, metricas.registro.archivo()).exists())
+
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_recorded_without_request_timing(self):
+        """
+        Test: Sin REQUEST_TIMING_ENABLED se registran requests y latencia, pero no consultas
+        """
+        self.client.get('/api/bots/')
+        texto = self.texto()
+        self.assertEqual(
+            self.valor(texto, 'panel_http_requests_total{view="bot-list",method="GET",status="2xx"}'), 1
+        )
+        self.assertEqual(
+            self.valor(texto, 'panel_http_request_duration_seconds_count{view="bot-list",method="GET"}'), 1
+        )
+        self.assertEqual(
+            self.valor(texto, 'panel_http_request_queries_count{view="bot-list",method="GET"}'), 0
+        )
+
+    def test_label_escaping(self):
+        """
+        Test: Los valores de las etiquetas se escapan
+        """
+        self.assertEqual(metricas.etiquetas(view='a"b\\c\nd'), '{view="a\\"b\\\\c\\nd"}')
@@ -0,0 +1,208 @@
+# core/test_query_budget.py
+from datetime import datetime, time, timedelta
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from . import urls as core_urls
+from . import revocacion
+from .models import Cliente, Bot, Servicio, Horario, Reserva
+from .resumen import reconstruir_resumen
+
+# Tenants que se agregan de a uno: (bots, reservas)
+TAMAÑOS = [(1, 10), (10, 1000), (100, 10000)]
+
+# Rutas de core/urls.py que no se miden, con el motivo
+EXCLUIDAS = {}
+
+# Headers de las variantes con Idempotency-Key (primer envío: reserva y completa la clave)
+IDEMPOTENTE = {'HTTP_IDEMPOTENCY_KEY': 'presupuesto'}
+
+
+def rutas(patrones):
+    """Nombres de todas las rutas de `patrones`, incluidas las del router"""
+    for patron in patrones:
+        if isinstance(patron, URLResolver):
+            yield from rutas(patron.url_patterns)
+        elif patron.name and 'format' not in patron.pattern.regex.groupindex:
+            yield patron.name
+
+
+def presupuesto(t):
+    """
+    Peticiones medidas para el tenant `t`: (ruta, método, rol, kwargs, datos,
+    headers). El rol 'cliente' usa el dueño del tenant autenticado con su
+    access token, como en producción, y 'admin' un superusuario.
+    """
+    proximo = timezone.make_aware(datetime(2035, 1, 1, 10))
+    reserva_nueva = {
+        'bot': t['bot'], 'servicio': t['servicio'],
+        'fecha_hora_inicio': proximo.isoformat(), 'fecha_hora_fin': (proximo + timedelta(hours=1)).isoformat(),
+    }
+    cliente = {'cliente_id': t['cliente']}
+    medidas = [
+        ('get_me', 'get', 'cliente', {}, None),
+        ('dashboard_config', 'get', 'cliente', {}, None),
+        ('dashboard_bootstrap', 'get', 'cliente', {}, None),
+        ('emprendimiento_dashboard_stats', 'get', 'cliente', {}, None),
+        ('cliente-list', 'get', 'admin', {}, None),
+        ('cliente-detail', 'get', 'admin', {'pk': t['cliente']}, None),
+        ('bot-list', 'get', 'cliente', {}, None),
+        ('bot-list', 'post', 'cliente', {}, {'cliente': t['cliente'], 'nombre': 'Nuevo', 'prompt_sistema': 'Sistema', 'whatsapp_phone_id': f"nuevo-{t['cliente']}"}),
+        ('bot-detail', 'get', 'cliente', {'pk': t['bot']}, None),
+        ('bot-detail', 'patch', 'cliente', {'pk': t['bot']}, {'nombre': 'Renombrado'}),
+        ('bot-disponibilidad', 'get', 'cliente', {'pk': t['bot']}, {'servicio': t['servicio']}),
+        ('bot-contexto', 'get', 'cliente', {'phone_id': t['phone_id']}, None),
+        ('servicio-list', 'get', 'cliente', {}, None),
+        ('servicio-list', 'post', 'cliente', {}, {'bot': t['bot'], 'nombre': 'Nuevo', 'precio': 5}),
+        ('servicio-detail', 'get', 'cliente', {'pk': t['servicio']}, None),
+        ('reserva-list', 'get', 'cliente', {}, None),
+        ('reserva-list', 'post', 'cliente', {}, reserva_nueva),
+        ('reserva-detail', 'get', 'cliente', {'pk': t['reserva']}, None),
+        ('reserva-detail', 'patch', 'cliente', {'pk': t['reserva']}, {'estado': 'Cancelada'}),
+        ('reserva-calendario', 'get', 'cliente', {}, None),
+        ('reserva-exportar', 'get', 'cliente', {}, None),
+        ('reserva-lote', 'post', 'cliente', {}, {'reservas': [reserva_nueva]}),
+        ('reserva-lote', 'patch', 'cliente', {}, {'reservas': [{'id': t['reserva'], 'notas': 'Lote'}]}),
+        ('reserva-cancelar-lote', 'post', 'cliente', {}, {'ids': [t['reserva']]}),
+        ('token_obtain_pair', 'post', 'anonimo', {}, {'username': t['username'], 'password': 'test123'}),
+        ('token_refresh', 'post', 'anonimo', {}, {'refresh': t['refresh']}),
+        ('dashboard_login', 'post', 'anonimo', {}, {'username': t['username'], 'password': 'test123'}),
+        ('dashboard_logout', 'post', 'cliente', {}, {'refresh': t['refresh']}),
+        ('admin_dashboard_stats', 'get', 'admin', {}, None),
+        ('response_cache_stats', 'get', 'admin', {}, None),
+        ('metrics', 'get', 'admin', {}, None),
+        ('emprendimientos_stats', 'get', 'admin', {}, None),
+        ('reserva-list', 'get', 'admin', {}, None),
+        ('emprendimiento-list', 'get', 'admin', {}, None),
+        ('emprendimiento-exportar', 'get', 'admin', {}, None),
+        ('emprendimiento-detail', 'get', 'admin', {'pk': t['cliente']}, None),
+        ('emprendimiento-bots', 'get', 'admin', {'pk': t['cliente']}, None),
+        ('emprendimiento-profile', 'get', 'admin', {'pk': t['cliente']}, None),
+        ('emprendimiento-change-status', 'post', 'admin', {'pk': t['cliente']}, {'status': 'suspendido'}),
+        ('emprendimiento-update-bot-limit', 'post', 'admin', {'pk': t['cliente']}, {'max_bots_allowed': 500}),
+        ('emprendimiento-create-bot', 'post', 'admin', {'pk': t['cliente']},
+         {'nombre': 'Admin', 'prompt_sistema': 'Sistema', 'whatsapp_phone_id': f"admin-{t['cliente']}"}),
+        ('bot_management', 'get', 'admin', cliente, None),
+        ('bot_management_detail', 'get', 'admin', {**cliente, 'bot_id': t['bot']}, None),
+        ('bot_management_detail', 'put', 'admin', {**cliente, 'bot_id': t['bot']}, {'nombre': 'Admin'}),
+        ('toggle_bot_block', 'post', 'admin', {**cliente, 'bot_id': t['bot']}, None),
+        ('emprendimiento_activity_log', 'get', 'admin', cliente, None),
+        ('api-root', 'get', 'cliente', {}, None),
+    ]
+    idempotentes = [
+        ('reserva-list', 'post', 'cliente', {}, reserva_nueva),
+        ('reserva-lote', 'post', 'cliente', {}, {'reservas': [reserva_nueva]}),
+        ('reserva-lote', 'patch', 'cliente', {}, {'reservas': [{'id': t['reserva'], 'notas': 'Lote'}]}),
+    ]
+    return [(*medida, {}) for medida in medidas] + [(*medida, IDEMPOTENTE) for medida in idempotentes]
+
+
+@override_settings(JWT_REVOCATION_BLOOM_REFRESH=timedelta(days=1))
+class QueryBudgetTestCase(APITestCase):
+    """
+    Tests que recorren todas las rutas de la API con tenants de 1, 10 y 100
+    bots (10 a 10.000 reservas) y fallan si la cantidad de consultas de
+    alguna crece con el tamaño de los datos
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='admin123')
+
+    def sembrar(self, indice, bots, reservas):
+        """Crea un tenant con `bots` bots, dos servicios y horarios por bot y `reservas` reservas"""
+        user = User.objects.create_user(username=f'tenant{indice}', password='test123')
+        cliente = Cliente.objects.create(
+            user=user, nombre_emprendimiento=f'Tenant {indice}', max_bots_allowed=bots + 5
+        )
+        creados = Bot.objects.bulk_create([
+            Bot(cliente=cliente, nombre=f'Bot {i}', prompt_sistema='Sistema', whatsapp_phone_id=f'{indice}-{i}')
+            for i in range(bots)
+        ])
+        servicios = Servicio.objects.bulk_create([
+            Servicio(bot=bot, nombre=f'Servicio {j}', precio=10 + j, duracion_minutos=30)
+            for bot in creados for j in range(2)
+        ])
+        Horario.objects.bulk_create([
+            Horario(bot=bot, dia_semana=dia, hora_inicio=time(9), hora_fin=time(18))
+            for bot in creados for dia in range(5)
+        ])
+
+        base = timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=30), time(9)))
+        estados = ['Confirmada', 'Confirmada', 'Pendiente', 'Cancelada']
+        Reserva.objects.bulk_create([
+            Reserva(
+                bot=creados[i % bots], cliente=cliente, servicio=servicios[(i % bots) * 2],
+                cliente_final_nombre=f'Cliente {i}', cliente_final_telefono='000', estado=estados[i % 4],
+                fecha_hora_inicio=base + timedelta(minutes=30 * (i // bots)),
+                fecha_hora_fin=base + timedelta(minutes=30 * (i // bots) + 30),
+            )
+            for i in range(reservas)
+        ], batch_size=1000)
+        reconstruir_resumen()
+
+        refresh = APIClient().post('/api/token/', {'username': user.username, 'password': 'test123'}).data
+        return {
+            'username': user.username, 'cliente': cliente.id,
+            'bot': creados[0].id, 'phone_id': creados[0].whatsapp_phone_id, 'servicio': servicios[0].id,
+            'reserva': Reserva.objects.filter(bot=creados[0]).order_by('id').values_list('id', flat=True).first(),
+            'refresh': refresh['refresh'], 'access': refresh['access'],
+        }
+
+    def cliente_http(self, rol, t):
+        client = APIClient()
+        if rol == 'cliente':
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {t['access']}")
+        elif rol == 'admin':
+            client.force_authenticate(user=self.admin)
+        return client
+
+    def consultas(self, t, ruta, metodo, rol, kwargs, datos, headers):
+        """Consultas de una petición con los caches vacíos; sus escrituras se descartan"""
+        for alias in ('default', 'respuestas'):
+            caches[alias].clear()
+        revocacion.reconstruir()
+        client = self.cliente_http(rol, t)
+        url = reverse(ruta, kwargs=kwargs)
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                if metodo == 'get':
+                    response = client.get(url, datos, **headers)
+                else:
+                    response = getattr(client, metodo)(url, datos, format='json', **headers)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+        self.assertLess(response.status_code, 400, f'{metodo.upper()} {url}: {response.status_code} {getattr(response, "data", "")}')
+        return len(ctx.captured_queries)
+
+    def test_every_route_is_budgeted(self):
+        """
+        Test: Cada ruta de la API está medida o excluida con un motivo
+        """
+        medidas = {ruta for ruta, *_ in presupuesto({clave: 1 for clave in (
+            'cliente', 'bot', 'servicio', 'reserva', 'phone_id', 'username', 'refresh'
+        )})}
+        self.assertEqual(set(rutas(core_urls.urlpatterns)) - medidas - set(EXCLUIDAS), set())
+
+    def test_query_counts_do_not_grow_with_data(self):
+        """
+        Test: La cantidad de consultas de cada ruta no depende del tamaño del tenant ni del total de datos
+        """
+        mediciones = {}
+        for indice, (bots, reservas) in enumerate(TAMAÑOS):
+            t = self.sembrar(indice, bots, reservas)
+            for ruta, metodo, rol, kwargs, datos, headers in presupuesto(t):
+                clave = (ruta, metodo, rol, bool(headers))
+                mediciones.setdefault(clave, []).append(self.consultas(t, ruta, metodo, rol, kwargs, datos, headers))
+
+        for (ruta, metodo, rol, idempotente), cantidades in mediciones.items():
+            with self.subTest(ruta=ruta, metodo=metodo, rol=rol, idempotente=idempotente):
+                self.assertEqual(
+                    len(set(cantidades)), 1,
+                    f'{metodo.upper()} {ruta} ({rol}, idempotente={idempotente}): {cantidades} consultas para {TAMAÑOS}'
+                )
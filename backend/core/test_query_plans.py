@@ -0,0 +1,127 @@
+# core/test_query_plans.py
+import re
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Reserva
+
+# Tablas sobre las que ninguna consulta de tenant debe hacer un full scan
+TABLAS_VIGILADAS = {
+    'core_cliente', 'core_bot', 'core_servicio', 'core_reserva',
+    'core_resumenreservasdiario',
+}
+
+# 'SCAN tabla' (o su alias) sin 'USING [COVERING] INDEX' es un recorrido completo
+SCAN_RE = re.compile(r'\bSCAN (\S+)(?:\s|$)')
+INDICE_RE = re.compile(r'\bUSING (?:COVERING )?INDEX\b')
+# Alias de las subconsultas y joins de Django: "core_reserva" U0, "core_bot" T3
+ALIAS_RE = re.compile(r'"(\w+)" (?:AS )?"?([UT]\d+)"?')
+
+
+class QueryPlanTestCase(APITestCase):
+    """
+    Tests que ejecutan EXPLAIN QUERY PLAN sobre las consultas de los endpoints
+    de tenant y fallan si alguna recorre completa una tabla vigilada
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema',
+            whatsapp_phone_id='111', activo=True
+        )
+        self.servicio = Servicio.objects.create(bot=self.bot, nombre='Corte', precio=10)
+        inicio = timezone.now() + timedelta(days=1)
+        Reserva.objects.create(
+            bot=self.bot, servicio=self.servicio,
+            cliente_final_nombre='Cliente', cliente_final_telefono='000',
+            fecha_hora_inicio=inicio, fecha_hora_fin=inicio + timedelta(hours=1),
+            estado='Pendiente'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def full_scans(self, sql):
+        """Retorna las tablas vigiladas que el plan de `sql` recorre completas"""
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            detalles = [fila[-1] for fila in cursor.fetchall()]
+        alias = {nombre: tabla for tabla, nombre in ALIAS_RE.findall(sql)}
+        tablas = set()
+        for detalle in detalles:
+            coincidencia = SCAN_RE.search(detalle)
+            if coincidencia is None or INDICE_RE.search(detalle, coincidencia.end()):
+                continue
+            tabla = alias.get(coincidencia.group(1), coincidencia.group(1))
+            if tabla in TABLAS_VIGILADAS:
+                tablas.add(tabla)
+        return tablas
+
+    def assertNoFullScans(self, url, permitidas=()):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            scans = self.full_scans(sql) - set(permitidas)
+            self.assertFalse(scans, f'{url}: full scan de {scans} en\n{sql}')
+
+    def test_reservas_list_plans(self):
+        """
+        Test: Listado de reservas con y sin rango de fechas usa índices
+        """
+        self.assertNoFullScans('/api/reservas/')
+        self.assertNoFullScans('/api/reservas/?desde=2025-01-01&hasta=2025-12-31')
+        self.assertNoFullScans('/api/reservas/?fecha=2025-03-01')
+
+    def test_bots_and_servicios_list_plans(self):
+        """
+        Test: Listados de bots y servicios del tenant usan índices
+        """
+        self.assertNoFullScans('/api/bots/')
+        self.assertNoFullScans('/api/servicios/')
+
+    def test_dashboard_plans(self):
+        """
+        Test: Configuración y estadísticas del dashboard de emprendimiento usan índices
+        """
+        self.assertNoFullScans('/api/dashboard/config/')
+        self.assertNoFullScans('/api/dashboard/emprendimiento/stats/')
+
+    def test_admin_reservas_list_uses_ordering_index(self):
+        """
+        Test: El listado global de reservas se sirve desde el índice de ordenamiento
+        """
+        self.user.is_staff = True
+        self.user.save()
+        self.assertNoFullScans('/api/reservas/')
+
+    def test_admin_emprendimiento_plans(self):
+        """
+        Test: Los endpoints de admin de un emprendimiento usan índices y los
+        globales solo recorren clientes y el resumen, nunca bots ni reservas
+        """
+        self.user.is_staff = True
+        self.user.is_superuser = True
+        self.user.save()
+        base = f'/api/admin/emprendimientos/{self.cliente.id}'
+        for sufijo in ('/', '/bots/', '/profile/', '/bots/manage/', '/activity_log/'):
+            self.assertNoFullScans(base + sufijo)
+
+        # Agregados y listados de todos los emprendimientos: O(clientes) por definición
+        globales = {'core_cliente', 'core_resumenreservasdiario'}
+        for url in ('/api/dashboard/admin/stats/', '/api/admin/emprendimientos/stats/',
+                    '/api/admin/emprendimientos/', '/api/clientes/'):
+            self.assertNoFullScans(url, permitidas=globales)
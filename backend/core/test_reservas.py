@@ -0,0 +1,271 @@
+# core/test_reservas.py
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Reserva
+from .reservas import ReservaSolapada, reserva_exclusiva
+
+
+class ReservaTestMixin:
+    """Datos comunes para los tests de reservas"""
+
+    def crear_datos(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema',
+            whatsapp_phone_id='111', activo=True
+        )
+        self.servicio = Servicio.objects.create(bot=self.bot, nombre='Corte', precio=10)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def crear_reserva(self, inicio, bot=None, estado='Confirmada', duracion=timedelta(hours=1)):
+        return Reserva.objects.create(
+            bot=bot or self.bot, servicio=self.servicio,
+            cliente_final_nombre='Cliente', cliente_final_telefono='000',
+            fecha_hora_inicio=inicio, fecha_hora_fin=inicio + duracion,
+            estado=estado
+        )
+
+
+class ReservaPaginationTestCase(ReservaTestMixin, APITestCase):
+    """
+    Tests para validar la paginación por cursor y los filtros de fechas de reservas
+    """
+
+    def setUp(self):
+        self.crear_datos()
+        self.base = timezone.make_aware(datetime(2025, 3, 1, 9, 0))
+        for i in range(25):
+            self.crear_reserva(self.base + timedelta(days=i))
+
+    def test_cursor_walk_returns_every_reserva_once(self):
+        """
+        Test: Recorrer el cursor devuelve todas las reservas una vez y en orden
+        """
+        ids = []
+        fechas = []
+        url = '/api/reservas/?page_size=10'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(r['id'] for r in response.data['results'])
+            fechas.extend(r['fecha_hora_inicio'] for r in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+        self.assertEqual(fechas, sorted(fechas, reverse=True))
+
+    def test_desde_hasta_date_range(self):
+        """
+        Test: 'desde' y 'hasta' con fecha incluyen ambos días completos
+        """
+        response = self.client.get('/api/reservas/?desde=2025-03-05&hasta=2025-03-07')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_fecha_filter_is_sargable(self):
+        """
+        Test: El filtro por fecha se compila como rango y no como cast a fecha
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/reservas/?fecha=2025-03-10')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries if 'core_reserva' in q['sql'])
+        self.assertNotIn('django_datetime_cast_date', sql)
+
+    def test_invalid_date_returns_400(self):
+        """
+        Test: Un parámetro de fecha inválido retorna 400
+        """
+        response = self.client.get('/api/reservas/?desde=ayer')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('desde', response.data)
+
+
+class ReservaClienteDenormalizadoTestCase(ReservaTestMixin, APITestCase):
+    """
+    Tests para validar el emprendimiento desnormalizado en Reserva
+    """
+
+    def setUp(self):
+        self.crear_datos()
+
+    def test_cliente_copied_from_bot(self):
+        """
+        Test: La reserva toma el emprendimiento de su bot al guardarse
+        """
+        otro_user = User.objects.create_user(username='otro', password='test123')
+        otro_cliente = Cliente.objects.create(user=otro_user, nombre_emprendimiento='Otro')
+        otro_bot = Bot.objects.create(
+            cliente=otro_cliente, nombre='Bot Otro', prompt_sistema='Sistema',
+            whatsapp_phone_id='222'
+        )
+
+        reserva = self.crear_reserva(timezone.now() + timedelta(days=1))
+        self.assertEqual(reserva.cliente_id, self.cliente.id)
+
+        reserva.bot = otro_bot
+        reserva.save(update_fields=['bot'])
+        reserva.refresh_from_db()
+        self.assertEqual(reserva.cliente_id, otro_cliente.id)
+
+    def test_tenant_filter_uses_reserva_cliente(self):
+        """
+        Test: El listado del tenant filtra por la columna cliente de Reserva
+        """
+        self.crear_reserva(timezone.now() + timedelta(days=1))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/reservas/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['cliente_nombre'], 'Negocio Test')
+
+        sql = next(q['sql'] for q in ctx.captured_queries if 'FROM "core_reserva"' in q['sql'])
+        self.assertIn('"core_reserva"."cliente_id" =', sql)
+        self.assertNotIn('"core_bot"."cliente_id" =', sql)
+
+
+    def test_bot_owner_change_moves_reservas(self):
+        """
+        Test: Si un admin pasa el bot a otro cliente, sus reservas pasan al nuevo dueño
+        """
+        reserva = self.crear_reserva(timezone.now() + timedelta(days=1))
+        otro_user = User.objects.create_user(username='otro', password='otro123')
+        otro_cliente = Cliente.objects.create(user=otro_user, nombre_emprendimiento='Otro Negocio')
+        admin = APIClient()
+        admin.force_authenticate(user=User.objects.create_superuser(username='admin', password='admin123'))
+
+        response = admin.patch(f'/api/bots/{self.bot.id}/', {'cliente': otro_cliente.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        reserva.refresh_from_db()
+        self.assertEqual(reserva.cliente_id, otro_cliente.id)
+
+        self.assertEqual(self.client.get('/api/reservas/').data['results'], [])
+        self.assertEqual(self.client.get(f'/api/reservas/{reserva.id}/').status_code, status.HTTP_404_NOT_FOUND)
+        nuevo = APIClient()
+        nuevo.force_authenticate(user=otro_user)
+        self.assertEqual(nuevo.get(f'/api/reservas/{reserva.id}/').status_code, status.HTTP_200_OK)
+
+
+class ReservaSolapamientoTestCase(ReservaTestMixin, APITestCase):
+    """
+    Tests para validar que la creación de reservas rechaza solapamientos
+    """
+
+    def setUp(self):
+        self.crear_datos()
+        self.manana = (timezone.localdate() + timedelta(days=1)).isoformat()
+
+    def reservar(self, hora, **extra):
+        datos = {'bot': self.bot.id, 'servicio': self.servicio.id,
+                 'fecha': self.manana, 'hora': hora}
+        datos.update(extra)
+        return self.client.post('/api/reservas/', datos)
+
+    def test_overlapping_reserva_returns_409(self):
+        """
+        Test: Una reserva de 10:30 choca con otra de 10:00 de una hora
+        """
+        self.assertEqual(self.reservar('10:00').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.reservar('10:30').status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.reservar('10:00').status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.reservar('11:00').status_code, status.HTTP_201_CREATED)
+
+    def test_cancelled_reserva_frees_interval(self):
+        """
+        Test: Cancelar una reserva libera su intervalo y reactivarla vuelve a chocar
+        """
+        primera = self.reservar('10:00').data['id']
+        response = self.client.patch(f'/api/reservas/{primera}/', {'estado': 'Cancelada'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.reservar('10:30').status_code, status.HTTP_201_CREATED)
+
+        response = self.client.patch(f'/api/reservas/{primera}/', {'estado': 'Confirmada'})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_other_tenant_bot_rejected(self):
+        """
+        Test: No se puede reservar sobre el bot de otro emprendimiento
+        """
+        otro_user = User.objects.create_user(username='otro', password='test123')
+        otro_cliente = Cliente.objects.create(user=otro_user, nombre_emprendimiento='Otro')
+        otro_bot = Bot.objects.create(
+            cliente=otro_cliente, nombre='Bot Otro', prompt_sistema='Sistema',
+            whatsapp_phone_id='222'
+        )
+        response = self.reservar('10:00', bot=otro_bot.id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReservaConcurrenciaTestCase(TransactionTestCase):
+    """
+    Test de estrés: reservas concurrentes desde un pool de hilos
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(username='cliente_test', password='test123')
+        cliente = Cliente.objects.create(
+            user=user, nombre_emprendimiento='Negocio Test', max_bots_allowed=10
+        )
+        self.bots = [
+            Bot.objects.create(
+                cliente=cliente, nombre=f'Bot {i}', prompt_sistema='Sistema',
+                whatsapp_phone_id=f'phone-{i}'
+            )
+            for i in range(4)
+        ]
+        self.base = timezone.now().replace(microsecond=0) + timedelta(days=1)
+
+    def reservar(self, bot, minutos):
+        """Intenta reservar una hora desde base + minutos; retorna True si la creó"""
+        inicio = self.base + timedelta(minutes=minutos)
+        fin = inicio + timedelta(hours=1)
+        try:
+            with reserva_exclusiva(bot.id, inicio, fin):
+                Reserva.objects.create(
+                    bot=bot, cliente_final_nombre='Cliente', cliente_final_telefono='000',
+                    fecha_hora_inicio=inicio, fecha_hora_fin=fin
+                )
+            return True
+        except ReservaSolapada:
+            return False
+        finally:
+            connection.close()
+
+    def test_concurrent_bookings_never_overlap(self):
+        """
+        Test: Con muchas reservas concurrentes ningún bot queda con solapamientos
+        """
+        # Cada bot recibe intentos cada 15 minutos durante 4 horas, dos veces
+        intentos = [
+            (bot, minutos)
+            for bot in self.bots
+            for minutos in range(0, 240, 15)
+            for _ in range(2)
+        ]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            resultados = list(pool.map(lambda args: self.reservar(*args), intentos))
+
+        self.assertEqual(sum(resultados), Reserva.objects.count())
+        for bot in self.bots:
+            intervalos = list(
+                Reserva.objects.filter(bot=bot).order_by('fecha_hora_inicio')
+                .values_list('fecha_hora_inicio', 'fecha_hora_fin')
+            )
+            self.assertGreater(len(intervalos), 0)
+            for (_, fin_anterior), (inicio, _) in zip(intervalos, intervalos[1:]):
+                self.assertLessEqual(fin_anterior, inicio)
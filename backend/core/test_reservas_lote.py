@@ -0,0 +1,231 @@
+# core/test_reservas_lote.py
+from datetime import datetime, time, timedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Horario, Reserva, ResumenReservasDiario
+from .resumen import reconstruir_resumen
+
+
+class ReservasLoteTestCase(APITestCase):
+    """
+    Tests de la creación, modificación y cancelación de reservas por lote
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(user=self.user, nombre_emprendimiento='Negocio Test')
+        otro = Cliente.objects.create(
+            user=User.objects.create_user(username='otro', password='otro123'),
+            nombre_emprendimiento='Otro Negocio'
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema', whatsapp_phone_id='111'
+        )
+        self.bot_ajeno = Bot.objects.create(
+            cliente=otro, nombre='Bot Ajeno', prompt_sistema='Sistema', whatsapp_phone_id='222'
+        )
+        self.servicio = Servicio.objects.create(bot=self.bot, nombre='Corte', precio=10, duracion_minutos=30)
+        self.dia = timezone.localdate() + timedelta(days=7)
+        self.inicio = timezone.make_aware(datetime.combine(self.dia, time(9)))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def item(self, minutos, duracion=30, **extra):
+        inicio = self.inicio + timedelta(minutes=minutos)
+        return {
+            'bot': self.bot.id, 'servicio': self.servicio.id,
+            'fecha_hora_inicio': inicio.isoformat(),
+            'fecha_hora_fin': (inicio + timedelta(minutes=duracion)).isoformat(),
+            **extra,
+        }
+
+    def resumen(self):
+        return list(ResumenReservasDiario.objects.order_by('bot_id', 'fecha').values_list(
+            'bot_id', 'fecha', 'confirmadas', 'pendientes', 'canceladas', 'ingresos'
+        ))
+
+    def assertResumenConsistente(self):
+        actual = self.resumen()
+        reconstruir_resumen()
+        self.assertEqual(actual, self.resumen())
+
+    def test_bulk_create_constant_queries(self):
+        """
+        Test: Crear un lote grande usa una cantidad de consultas que no depende de su tamaño
+        """
+        def crear(desde, cantidad):
+            items = [self.item(desde + 5 * i, duracion=5) for i in range(cantidad)]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/reservas/lote/', {'reservas': items}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data['creadas'], cantidad)
+            return len(ctx.captured_queries)
+
+        crear(0, 5)
+        consultas = crear(60, 5)
+        self.assertEqual(crear(120, 90), consultas)
+        self.assertEqual(Reserva.objects.filter(cliente=self.cliente).count(), 100)
+        self.assertResumenConsistente()
+
+    def test_per_item_results(self):
+        """
+        Test: Cada ítem informa su id o sus errores y los válidos se crean
+        """
+        Reserva.objects.create(
+            bot=self.bot, cliente_final_nombre='Ana', cliente_final_telefono='000',
+            fecha_hora_inicio=self.inicio, fecha_hora_fin=self.inicio + timedelta(minutes=30)
+        )
+        items = [
+            self.item(0),                         # solapa con la existente
+            self.item(60),
+            self.item(75),                        # solapa con el ítem anterior
+            self.item(120, estado='Cancelada'),
+            self.item(120),                       # mismo inicio que la cancelada
+            {**self.item(180), 'bot': self.bot_ajeno.id},
+            {'bot': self.bot.id, 'servicio': self.servicio.id, 'fecha': str(self.dia), 'hora': '15:00'},
+            {'bot': self.bot.id},
+        ]
+        response = self.client.post('/api/reservas/lote/', {'reservas': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['creadas'], response.data['errores']), (3, 5))
+        resultados = response.data['resultados']
+        self.assertEqual([r['indice'] for r in resultados], list(range(len(items))))
+        self.assertEqual([('id' in r) for r in resultados], [False, True, False, True, False, False, True, False])
+        self.assertIn('fecha_hora_inicio', resultados[0]['errores'])
+        self.assertIn('bot', resultados[5]['errores'])
+
+        creada = Reserva.objects.get(pk=resultados[6]['id'])
+        self.assertEqual(creada.fecha_hora_fin - creada.fecha_hora_inicio, timedelta(minutes=30))
+        self.assertEqual(creada.cliente_id, self.cliente.id)
+        self.assertEqual(creada.cliente_final_nombre, 'Cliente Web')
+        self.assertResumenConsistente()
+
+    def test_all_or_nothing(self):
+        """
+        Test: Con todo_o_nada un error impide crear el resto del lote
+        """
+        items = [self.item(0), self.item(15)]
+        response = self.client.post(
+            '/api/reservas/lote/', {'reservas': items, 'todo_o_nada': True}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['creadas'], 0)
+        self.assertEqual([r['indice'] for r in response.data['resultados']], [1])
+        self.assertFalse(Reserva.objects.exists())
+
+    def test_opening_hours_opt_in(self):
+        """
+        Test: Con verificar_horario se rechazan las reservas fuera del horario del bot
+        """
+        Horario.objects.create(bot=self.bot, dia_semana=self.dia.weekday(), hora_inicio=time(9), hora_fin=time(12))
+        items = [self.item(0), self.item(170), self.item(240)]
+        response = self.client.post(
+            '/api/reservas/lote/', {'reservas': items, 'verificar_horario': True}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([('id' in r) for r in response.data['resultados']], [True, False, False])
+
+    @override_settings(RESERVAS_LOTE_MAXIMO=2)
+    def test_limits_and_envelope(self):
+        """
+        Test: El lote debe ser una lista no vacía de hasta RESERVAS_LOTE_MAXIMO ítems
+        """
+        for cuerpo in ({}, {'reservas': []}, {'reservas': [self.item(0)] * 3}):
+            response = self.client.post('/api/reservas/lote/', cuerpo, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        """
+        Test: El PATCH por lote mueve reservas validando solapamientos y mantiene el resumen
+        """
+        ids = self.client.post(
+            '/api/reservas/lote/', {'reservas': [self.item(60 * i) for i in range(4)]}, format='json'
+        ).data['resultados']
+        a, b, c, d = (r['id'] for r in ids)
+        nuevo = self.inicio + timedelta(days=1)
+        cambios = [
+            {'id': a, 'fecha_hora_inicio': nuevo.isoformat(), 'fecha_hora_fin': (nuevo + timedelta(minutes=30)).isoformat()},
+            {'id': b, 'fecha_hora_inicio': self.inicio.isoformat()},     # ocupa el lugar que dejó a
+            {'id': c, 'fecha_hora_inicio': (self.inicio + timedelta(minutes=15)).isoformat()},  # solapa con b
+            {'id': b, 'notas': 'repetida'},
+            {'id': 999999},
+            {'id': d, 'estado': 'Pendiente', 'servicio': None},
+        ]
+        cambios[1]['fecha_hora_fin'] = (self.inicio + timedelta(minutes=30)).isoformat()
+        response = self.client.patch('/api/reservas/lote/', {'reservas': cambios}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['modificadas'], 3)
+        self.assertEqual([('id' in r) for r in response.data['resultados']], [True, True, False, False, False, True])
+
+        self.assertEqual(Reserva.objects.get(pk=a).fecha_hora_inicio, nuevo)
+        self.assertEqual(Reserva.objects.get(pk=b).fecha_hora_inicio, self.inicio)
+        reserva_d = Reserva.objects.get(pk=d)
+        self.assertEqual((reserva_d.estado, reserva_d.servicio_id), ('Pendiente', None))
+        self.assertResumenConsistente()
+
+    def test_bulk_cancel(self):
+        """
+        Test: Se cancelan por ids o todas las de un bot en un día
+        """
+        resultados = self.client.post(
+            '/api/reservas/lote/', {'reservas': [self.item(60 * i) for i in range(4)]}, format='json'
+        ).data['resultados']
+        ids = [r['id'] for r in resultados]
+        ajena = Reserva.objects.create(
+            bot=self.bot_ajeno, cliente_final_nombre='Ajena', cliente_final_telefono='000',
+            fecha_hora_inicio=self.inicio, fecha_hora_fin=self.inicio + timedelta(minutes=30)
+        )
+
+        response = self.client.post(
+            '/api/reservas/lote/cancelar/', {'ids': [ids[0], ajena.id, ids[0]]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['canceladas'], 1)
+        self.assertEqual(Reserva.objects.get(pk=ajena.pk).estado, 'Confirmada')
+
+        response = self.client.post(
+            '/api/reservas/lote/cancelar/', {'bot': self.bot.id, 'fecha': str(self.dia)}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['ids']), ids[1:])
+        self.assertFalse(Reserva.objects.filter(bot=self.bot).exclude(estado='Cancelada').exists())
+        self.assertResumenConsistente()
+
+        response = self.client.post('/api/reservas/lote/cancelar/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_cancel_rejects_malformed_body(self):
+        """
+        Test: Cuerpos mal formados en la cancelación por lote retornan 400, no 500
+        """
+        for cuerpo in (
+            [1, 2],
+            {'ids': [True]},
+            {'ids': 'abc'},
+            {'ids': []},
+            {'bot': 'abc', 'fecha': str(self.dia)},
+            {'bot': self.bot.id, 'fecha': 'mañana'},
+            {'bot': self.bot.id},
+        ):
+            with self.subTest(cuerpo=cuerpo):
+                response = self.client.post('/api/reservas/lote/cancelar/', cuerpo, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalidates_collection_etag(self):
+        """
+        Test: Las escrituras por lote cambian el ETag del listado de reservas
+        """
+        etag = self.client.get('/api/reservas/')['ETag']
+        self.client.post('/api/reservas/lote/', {'reservas': [self.item(0)]}, format='json')
+        response = self.client.get('/api/reservas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
@@ -0,0 +1,123 @@
+# core/test_revocacion.py
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, TokenRevocado
+from . import revocacion
+
+
+class FiltroBloomTestCase(SimpleTestCase):
+    """
+    Tests del filtro de Bloom de JTI revocados
+    """
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        """
+        Test: Todo lo agregado está en el filtro y casi nada de lo demás
+        """
+        filtro = revocacion.FiltroBloom(1 << 16, 7)
+        agregados = [f'jti-{i}' for i in range(1000)]
+        for jti in agregados:
+            filtro.add(jti)
+
+        self.assertTrue(all(jti in filtro for jti in agregados))
+        falsos = sum(f'otro-{i}' in filtro for i in range(10000))
+        self.assertLess(falsos, 50)
+
+
+class RevocacionTestCase(APITestCase):
+    """
+    Tests de revocación de tokens en el logout y al cambiar los permisos del usuario
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        Cliente.objects.create(user=self.user, nombre_emprendimiento='Negocio Test')
+        self.client = APIClient()
+        tokens = self.client.post(
+            '/api/token/', {'username': 'cliente_test', 'password': 'test123'}
+        ).data
+        self.access = tokens['access']
+        self.refresh = tokens['refresh']
+        revocacion.reconstruir()
+
+    def get_con(self, access, url='/api/bots/'):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return self.client.get(url)
+
+    def test_logout_revokes_access_refresh_and_derived_tokens(self):
+        """
+        Test: Tras el logout no sirven el access, el refresh ni los access emitidos por él
+        """
+        derivado = self.client.post('/api/token/refresh/', {'refresh': self.refresh}).data['access']
+        self.assertEqual(self.get_con(derivado).status_code, status.HTTP_200_OK)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        response = self.client.post('/api/dashboard/logout/', {'refresh': self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.get_con(self.access).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get_con(derivado).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post('/api/token/refresh/', {'refresh': self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_valid_tokens_skip_revocation_table(self):
+        """
+        Test: Un token no revocado se verifica en memoria sin consultar la tabla
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.get_con(self.access).status_code, status.HTTP_200_OK)
+        for query in ctx.captured_queries:
+            self.assertNotIn('core_tokenrevocado', query['sql'])
+
+    def test_revocation_from_other_process_seen_after_rebuild(self):
+        """
+        Test: Una revocación guardada por otro proceso se aplica al reconstruir el filtro
+        """
+        from rest_framework_simplejwt.tokens import AccessToken
+        token = AccessToken(self.access)
+        TokenRevocado.objects.create(jti=token['jti'], expira=timezone.now() + timedelta(hours=1))
+
+        revocacion.reconstruir()
+        self.assertEqual(self.get_con(self.access).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_expired_revocations_are_purged(self):
+        """
+        Test: Al revocar se eliminan las revocaciones de tokens ya vencidos
+        """
+        TokenRevocado.objects.create(jti='vencido', expira=timezone.now() - timedelta(seconds=1))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self.client.post('/api/dashboard/logout/')
+        self.assertFalse(TokenRevocado.objects.filter(jti='vencido').exists())
+        self.assertEqual(TokenRevocado.objects.count(), 1)
+
+    def test_deactivating_or_demoting_user_revokes_tokens(self):
+        """
+        Test: Desactivar o degradar al usuario invalida sus access y refresh emitidos
+        """
+        for campo, valor in (('is_active', False), ('is_staff', True)):
+            with self.subTest(campo=campo):
+                setattr(self.user, campo, valor)
+                self.user.save()
+                self.assertEqual(self.get_con(self.access).status_code, status.HTTP_401_UNAUTHORIZED)
+                self.client.credentials()
+                response = self.client.post('/api/token/refresh/', {'refresh': self.refresh})
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unrelated_user_changes_keep_tokens(self):
+        """
+        Test: Cambios del usuario que no tocan sus permisos no revocan sus tokens
+        """
+        self.user.email = 'otro@test.com'
+        self.user.save()
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.get_con(self.access).status_code, status.HTTP_200_OK)
+        self.assertFalse(TokenRevocado.objects.exists())
@@ -0,0 +1,96 @@
+# core/test_server_timing.py
+import json
+import re
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio
+from . import medicion
+
+
+class ServerTimingTestCase(APITestCase):
+    """
+    Tests del middleware de instrumentación con Server-Timing
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        cliente = Cliente.objects.create(user=self.user, nombre_emprendimiento='Negocio Test')
+        bot = Bot.objects.create(
+            cliente=cliente, nombre='Bot Test', prompt_sistema='Sistema', whatsapp_phone_id='111'
+        )
+        Servicio.objects.create(bot=bot, nombre='Corte', precio=10)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def metricas(self, response):
+        return {
+            nombre: (float(duracion), desc)
+            for nombre, duracion, desc in re.findall(
+                r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', response['Server-Timing']
+            )
+        }
+
+    def test_header_counts_queries(self):
+        """
+        Test: El header Server-Timing informa total, SQL, serialización y render
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/bots/?fields=id,nombre,servicios')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metricas = self.metricas(response)
+        self.assertEqual(set(metricas), {'total', 'db', 'serializer', 'render'})
+        self.assertEqual(metricas['db'][1], f'{len(ctx.captured_queries)} consultas')
+        self.assertGreaterEqual(metricas['total'][0], metricas['db'][0])
+
+    def test_structured_log_line(self):
+        """
+        Test: Cada request escribe una línea JSON en el logger a nivel INFO
+        """
+        with self.assertLogs('panel_admin.requests', 'INFO') as logs:
+            self.client.get('/api/servicios/')
+        registro = json.loads(logs.records[0].getMessage())
+        self.assertEqual(registro['view'], 'servicio-list')
+        self.assertEqual(registro['status'], 200)
+        self.assertGreater(registro['queries'], 0)
+        self.assertNotIn('sql', registro)
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request_dumps_sql(self):
+        """
+        Test: Un request que supera SLOW_REQUEST_MS se registra como WARNING con su SQL
+        """
+        with self.assertLogs('panel_admin.requests', 'WARNING') as logs:
+            self.client.get('/api/bots/')
+        registro = json.loads(logs.records[0].getMessage())
+        self.assertEqual(len(registro['sql']), registro['queries'])
+        self.assertTrue(any('core_bot' in consulta['sql'] for consulta in registro['sql']))
+
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_can_be_disabled(self):
+        """
+        Test: Con REQUEST_TIMING_ENABLED=False no se agrega el header
+        """
+        response = self.client.get('/api/bots/')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_nested_serialization_counted_once(self):
+        """
+        Test: La serialización anidada se mide una sola vez
+        """
+        actual = medicion.Medicion()
+        with medicion.medir(actual):
+            with medicion.serializando():
+                with medicion.serializando():
+                    pass
+                anidada = actual.serializacion
+        self.assertEqual(anidada, 0)
+        self.assertGreater(actual.serializacion, 0)
+        self.assertIsNone(medicion.actual())
@@ -0,0 +1,259 @@
+# core/test_stats.py
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from .models import Cliente, Bot, Servicio, Reserva, ResumenReservasDiario
+from .resumen import reconstruir_resumen
+from . import stats
+
+
+class StatsTestMixin:
+    """Datos comunes para los tests de estadísticas"""
+
+    def crear_datos(self):
+        self.superuser = User.objects.create_superuser(
+            username='admin_test', email='admin@test.com', password='admin123'
+        )
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        self.bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Activo', prompt_sistema='Sistema',
+            whatsapp_phone_id='111', activo=True
+        )
+        Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Inactivo', prompt_sistema='Sistema',
+            whatsapp_phone_id='222', activo=False
+        )
+        self.servicio = Servicio.objects.create(bot=self.bot, nombre='Corte', precio=10)
+
+        now = timezone.now()
+        for i, estado in enumerate(['Confirmada', 'Confirmada', 'Pendiente', 'Cancelada']):
+            inicio = now + timedelta(days=i + 1)
+            Reserva.objects.create(
+                bot=self.bot, servicio=self.servicio,
+                cliente_final_nombre='Cliente', cliente_final_telefono='000',
+                fecha_hora_inicio=inicio, fecha_hora_fin=inicio + timedelta(hours=1),
+                estado=estado
+            )
+
+
+class StatsModuleTestCase(StatsTestMixin, TestCase):
+    """
+    Tests para validar que cada bloque de estadísticas usa una consulta por tabla
+    """
+
+    def setUp(self):
+        self.crear_datos()
+
+    def test_admin_stats_one_query_per_table(self):
+        """
+        Test: Las estadísticas de admin usan una consulta por tabla
+        """
+        with self.assertNumQueries(4):
+            data = stats.admin_stats()
+
+        self.assertEqual(data['users'], {'total': 2, 'active': 2, 'superusers': 1, 'staff': 1})
+        self.assertEqual(data['clientes'], {'total': 1, 'with_bots': 1})
+        self.assertEqual(data['bots'], {'total': 2, 'active': 1, 'inactive': 1})
+        self.assertEqual(data['reservations'], {
+            'total': 4, 'confirmed': 2, 'pending': 1, 'cancelled': 1
+        })
+        self.assertEqual(data['recent_activity']['new_users_30d'], 2)
+
+    def test_emprendimiento_stats_one_query_per_table(self):
+        """
+        Test: Las estadísticas de emprendimiento usan una consulta por tabla
+        """
+        with self.assertNumQueries(2):
+            data = stats.emprendimiento_stats(self.cliente)
+
+        self.assertEqual(data['bots'], {'total': 2, 'active': 1, 'inactive': 1})
+        self.assertEqual(data['reservations']['total'], 4)
+        self.assertEqual(data['reservations']['pending'], 1)
+
+    def test_clientes_stats_by_status(self):
+        """
+        Test: Los conteos por status de emprendimientos son correctos
+        """
+        Cliente.objects.filter(pk=self.cliente.pk).update(status='suspendido')
+        with self.assertNumQueries(1):
+            data = stats.clientes_stats(desde=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(data['total'], 1)
+        self.assertEqual(data['suspendido'], 1)
+        self.assertEqual(data['activo'], 0)
+        self.assertEqual(data['nuevos'], 1)
+
+
+class EmprendimientosStatsEndpointTestCase(StatsTestMixin, APITestCase):
+    """
+    Tests del endpoint de estadísticas de emprendimientos
+    """
+
+    def setUp(self):
+        self.crear_datos()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.superuser)
+
+    def test_emprendimientos_stats_response(self):
+        """
+        Test: El endpoint conserva la forma de la respuesta
+        """
+        response = self.client.get('/api/admin/emprendimientos/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['total_emprendimientos'], 1)
+        self.assertEqual(response.data['emprendimientos_activos'], 1)
+        self.assertEqual(response.data['promedio_bots'], 2.0)
+        self.assertEqual(response.data['top_emprendimientos'][0], {
+            'id': self.cliente.id,
+            'nombre': 'Negocio Test',
+            'total_reservas': 4,
+            'cantidad_bots': 2
+        })
+
+
+class ResumenReservasTestCase(StatsTestMixin, TestCase):
+    """
+    Tests para validar que el resumen diario se mantiene con las señales de Reserva
+    """
+
+    def setUp(self):
+        self.crear_datos()
+
+    def resumen_actual(self):
+        return sorted(
+            ResumenReservasDiario.objects.values_list(
+                'bot_id', 'fecha', 'confirmadas', 'pendientes', 'canceladas', 'ingresos'
+            )
+        )
+
+    def test_signals_match_rebuild(self):
+        """
+        Test: El resumen incremental coincide con una reconstrucción completa
+        """
+        reserva = Reserva.objects.filter(estado='Pendiente').get()
+        reserva.estado = 'Confirmada'
+        reserva.fecha_hora_inicio += timedelta(days=3)
+        reserva.fecha_hora_fin += timedelta(days=3)
+        reserva.save()
+        Reserva.objects.filter(estado='Cancelada').get().delete()
+
+        incremental = self.resumen_actual()
+        reconstruir_resumen()
+        self.assertEqual(incremental, self.resumen_actual())
+
+    def test_estado_change_moves_counters(self):
+        """
+        Test: Cambiar el estado mueve la reserva entre contadores y ajusta ingresos
+        """
+        reserva = Reserva.objects.filter(estado='Confirmada').first()
+        fila = ResumenReservasDiario.objects.get(
+            bot=self.bot, fecha=timezone.localdate(reserva.fecha_hora_inicio)
+        )
+        self.assertEqual((fila.confirmadas, fila.canceladas), (1, 0))
+        self.assertEqual(fila.ingresos, 10)
+
+        reserva.estado = 'Cancelada'
+        reserva.save()
+
+        fila.refresh_from_db()
+        self.assertEqual((fila.confirmadas, fila.canceladas), (0, 1))
+        self.assertEqual(fila.ingresos, 0)
+
+    def test_servicio_changes_keep_ingresos(self):
+        """
+        Test: Cambiar el precio, reasignar o borrar el servicio mantiene los ingresos del resumen
+        """
+        self.servicio.precio = 25
+        self.servicio.save()
+        incremental = self.resumen_actual()
+        reconstruir_resumen()
+        self.assertEqual(incremental, self.resumen_actual())
+
+        otro = Servicio.objects.create(bot=self.bot, nombre='Color', precio=40)
+        reserva = Reserva.objects.filter(estado='Confirmada').first()
+        reserva.servicio = otro
+        reserva.save()
+        reserva.estado = 'Cancelada'
+        reserva.save()
+
+        self.servicio.delete()
+        incremental = self.resumen_actual()
+        reconstruir_resumen()
+        self.assertEqual(incremental, self.resumen_actual())
+        self.assertEqual(sum(fila[-1] for fila in incremental), 0)
+
+    def test_cascade_deletes_do_not_touch_resumen_per_reserva(self):
+        """
+        Test: Borrar un bot, un cliente o un usuario con reservas borra su resumen sin recorrer las reservas
+        """
+        otro = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Extra', prompt_sistema='Sistema', whatsapp_phone_id='333'
+        )
+        inicio = timezone.now() + timedelta(days=1)
+        Reserva.objects.create(
+            bot=otro, servicio=Servicio.objects.create(bot=otro, nombre='Color', precio=40),
+            cliente_final_nombre='Cliente', cliente_final_telefono='000',
+            fecha_hora_inicio=inicio, fecha_hora_fin=inicio + timedelta(hours=1)
+        )
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.delete(f'/api/bots/{self.bot.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ResumenReservasDiario.objects.filter(bot_id=self.bot.id).exists())
+        self.assertEqual(ResumenReservasDiario.objects.get().confirmadas, 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.user.delete()
+        self.assertFalse(Reserva.objects.exists())
+        self.assertFalse(ResumenReservasDiario.objects.exists())
+        self.assertFalse(any('UPDATE "core_resumenreservasdiario"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_bot_owner_change_moves_resumen(self):
+        """
+        Test: Si el bot pasa a otro cliente, su resumen diario y sus estadísticas pasan con él
+        """
+        otro = Cliente.objects.create(
+            user=User.objects.create_user(username='otro', password='otro123'),
+            nombre_emprendimiento='Otro Negocio'
+        )
+        self.bot.cliente = otro
+        self.bot.save()
+
+        self.assertFalse(ResumenReservasDiario.objects.exclude(cliente=otro).exists())
+        self.assertEqual(stats.emprendimiento_stats(otro)['reservations']['total'], 4)
+        self.assertEqual(stats.emprendimiento_stats(self.cliente)['reservations']['total'], 0)
+        incremental = self.resumen_actual()
+        reconstruir_resumen()
+        self.assertEqual(incremental, self.resumen_actual())
+
+    def test_rebuild_command(self):
+        """
+        Test: El comando de reconstrucción regenera el resumen
+        """
+        ResumenReservasDiario.objects.all().delete()
+        call_command('rebuild_resumen_reservas', stdout=StringIO())
+        self.assertEqual(stats.emprendimiento_stats(self.cliente)['reservations']['total'], 4)
+
+    def test_dashboard_stats_do_not_scan_reservas(self):
+        """
+        Test: Las estadísticas de dashboard no consultan la tabla de reservas
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            stats.admin_stats()
+            stats.emprendimiento_stats(self.cliente)
+        tabla = Reserva._meta.db_table
+        self.assertFalse(any(f'"{tabla}"' in q['sql'] for q in ctx.captured_queries))
@@ -0,0 +1,106 @@
+# core/test_tokens.py
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from .models import Cliente, Bot, Servicio, Reserva
+
+
+class TenantTokenTestCase(APITestCase):
+    """
+    Tests de los claims de tenant en los JWT y la autenticación sin consultas
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cliente_test', email='cliente@test.com', password='test123'
+        )
+        self.cliente = Cliente.objects.create(
+            user=self.user, nombre_emprendimiento='Negocio Test', max_bots_allowed=5
+        )
+        bot = Bot.objects.create(
+            cliente=self.cliente, nombre='Bot Test', prompt_sistema='Sistema',
+            whatsapp_phone_id='111'
+        )
+        servicio = Servicio.objects.create(bot=bot, nombre='Corte', precio=10)
+        inicio = timezone.now() + timedelta(days=1)
+        Reserva.objects.create(
+            bot=bot, servicio=servicio, cliente_final_nombre='Cliente',
+            cliente_final_telefono='000', fecha_hora_inicio=inicio,
+            fecha_hora_fin=inicio + timedelta(hours=1)
+        )
+        self.admin = User.objects.create_superuser(
+            username='admin_test', email='admin@test.com', password='admin123'
+        )
+        self.client = APIClient()
+
+    def login(self, username, password, url='/api/token/'):
+        response = self.client.post(url, {'username': username, 'password': password})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response
+
+    def test_tokens_carry_tenant_claims(self):
+        """
+        Test: /api/token/, dashboard_login y el refresh emiten los claims de tenant
+        """
+        response = self.login('cliente_test', 'test123')
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['cliente_id'], self.cliente.id)
+        self.assertFalse(access['is_staff'])
+        self.assertEqual(access['dashboard_type'], 'emprendimiento_dashboard')
+
+        refresh = self.client.post('/api/token/refresh/', {'refresh': response.data['refresh']})
+        self.assertEqual(AccessToken(refresh.data['access'])['cliente_id'], self.cliente.id)
+
+        response = self.login('admin_test', 'admin123', url='/api/dashboard/login/')
+        access = AccessToken(response.data['access'])
+        self.assertIsNone(access['cliente_id'])
+        self.assertTrue(access['is_staff'])
+        self.assertEqual(access['dashboard_type'], 'admin_dashboard')
+
+    def test_read_endpoints_skip_auth_tables(self):
+        """
+        Test: Los listados del tenant no consultan auth_user ni core_cliente
+        """
+        self.login('cliente_test', 'test123')
+        for url in ('/api/reservas/', '/api/bots/', '/api/dashboard/emprendimiento/stats/'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            for query in ctx.captured_queries:
+                self.assertNotIn('FROM "auth_user"', query['sql'], url)
+                self.assertNotIn('FROM "core_cliente"', query['sql'], url)
+
+        response = self.client.get('/api/reservas/')
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_lazy_user_loads_remaining_fields(self):
+        """
+        Test: Los endpoints que necesitan más datos del usuario los cargan
+        """
+        self.login('cliente_test', 'test123')
+        response = self.client.get('/api/me/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['email'], 'cliente@test.com')
+        self.assertEqual(response.data['cliente']['id'], self.cliente.id)
+
+        self.login('admin_test', 'admin123')
+        response = self.client.get('/api/me/')
+        self.assertIsNone(response.data['cliente'])
+        response = self.client.get('/api/dashboard/emprendimiento/stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_without_claims_uses_database_user(self):
+        """
+        Test: Un token sin claims de tenant sigue autenticando con el User de la base
+        """
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = self.client.get('/api/reservas/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
@@ -0,0 +1,61 @@
+# core/tokens.py
+"""
+Tokens JWT con el contexto del tenant.
+
+Los tokens emitidos por /api/token/ y dashboard_login llevan cliente_id,
+is_staff, is_superuser y dashboard_type. El access token copia los claims
+del refresh, así que también los conserva al renovarse, y guarda el JTI
+del refresh para quedar revocado cuando se revoca el refresh.
+"""
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from . import revocacion
+
+
+def claims_de_usuario(user):
+    """Claims de tenant para un usuario de la base"""
+    # Import local: dashboard_views importa este módulo
+    from .dashboard_views import get_dashboard_type
+
+    cliente = getattr(user, 'cliente', None)
+    return {
+        'cliente_id': cliente.id if cliente is not None else None,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'dashboard_type': get_dashboard_type(user),
+    }
+
+
+class TenantRefreshToken(RefreshToken):
+    """RefreshToken que incluye los claims de tenant"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, valor in claims_de_usuario(user).items():
+            token[claim] = valor
+        return token
+
+    @property
+    def access_token(self):
+        # El access token recuerda su refresh para revocarse junto con él
+        access = super().access_token
+        access[revocacion.CLAIM_REFRESH_JTI] = self[api_settings.JTI_CLAIM]
+        return access
+
+
+class TenantTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Serializer de /api/token/ que emite TenantRefreshToken"""
+    token_class = TenantRefreshToken
+
+
+class TenantTokenRefreshSerializer(TokenRefreshSerializer):
+    """Serializer de /api/token/refresh/ que rechaza refresh tokens revocados"""
+    token_class = TenantRefreshToken
+
+    def validate(self, attrs):
+        if revocacion.token_revocado(self.token_class(attrs['refresh'])):
+            raise InvalidToken('El token fue revocado')
+        return super().validate(attrs)
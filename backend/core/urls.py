@@ -0,0 +1,38 @@
+# core/urls.py
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from . import views, dashboard_views, emprendimiento_views
+
+router = DefaultRouter()
+router.register(r'clientes', views.ClienteViewSet, basename='cliente')
+router.register(r'bots', views.BotViewSet, basename='bot')
+router.register(r'servicios', views.ServicioViewSet, basename='servicio')
+router.register(r'reservas', views.ReservaViewSet, basename='reserva')
+router.register(r'admin/emprendimientos', emprendimiento_views.EmprendimientoViewSet, basename='emprendimiento')
+
+urlpatterns = [
+    # Autenticación JWT
+    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('me/', views.get_me, name='get_me'),
+
+    # Dashboards
+    path('dashboard/login/', dashboard_views.dashboard_login, name='dashboard_login'),
+    path('dashboard/logout/', dashboard_views.dashboard_logout, name='dashboard_logout'),
+    path('dashboard/config/', dashboard_views.get_dashboard_config, name='dashboard_config'),
+    path('dashboard/bootstrap/', dashboard_views.dashboard_bootstrap, name='dashboard_bootstrap'),
+    path('dashboard/admin/stats/', dashboard_views.admin_dashboard_stats, name='admin_dashboard_stats'),
+    path('dashboard/emprendimiento/stats/', dashboard_views.emprendimiento_dashboard_stats, name='emprendimiento_dashboard_stats'),
+    path('dashboard/admin/cache/', dashboard_views.response_cache_stats, name='response_cache_stats'),
+    path('metrics/', dashboard_views.metrics, name='metrics'),
+
+    # Gestión de emprendimientos (superusuario)
+    path('admin/emprendimientos/stats/', emprendimiento_views.emprendimientos_stats, name='emprendimientos_stats'),
+    path('admin/emprendimientos/<int:cliente_id>/bots/manage/', emprendimiento_views.bot_management, name='bot_management'),
+    path('admin/emprendimientos/<int:cliente_id>/bots/manage/<int:bot_id>/', emprendimiento_views.bot_management, name='bot_management_detail'),
+    path('admin/emprendimientos/<int:cliente_id>/bots/manage/<int:bot_id>/toggle_block/', emprendimiento_views.toggle_bot_block, name='toggle_bot_block'),
+    path('admin/emprendimientos/<int:cliente_id>/activity_log/', emprendimiento_views.emprendimiento_activity_log, name='emprendimiento_activity_log'),
+
+    path('', include(router.urls)),
+]
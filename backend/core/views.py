@@ -1,16 +1,89 @@
 # core/views.py
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Bot, Servicio, Reserva, Cliente
+from django.db.models import Prefetch, Sum
+from django.http import HttpResponse
+from .models import Bot, Servicio, Reserva, Cliente, ResumenReservasDiario
 from .serializers import (
     UserSerializer, ClienteSerializer, BotSerializer, 
-    ServicioSerializer, ReservaSerializer
+    ServicioSerializer, ReservaSerializer, ReservaLoteSerializer, ReservaCambioLoteSerializer,
+    ReservaCancelacionLoteSerializer
 )
-from .permissions import IsOwnerOrAdmin
-from datetime import datetime, timedelta
+from .permissions import IsOwnerOrAdmin, cliente_id_de
+from . import contexto_bot, disponibilidad, listados, reservas, exportar as exportacion
+from .listados import ListadoRapidoMixin
+from .colecciones import ETagListadoMixin
+from .idempotencia import idempotente
+from datetime import datetime, time, timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def parse_fecha_param(nombre, valor):
+    """
+    Convierte un parámetro de consulta 'YYYY-MM-DD' o ISO 8601 en un datetime
+    aware. Retorna (datetime, es_fecha) donde es_fecha indica que se recibió
+    solo la fecha (el datetime corresponde al inicio de ese día).
+    """
+    try:
+        fecha = parse_date(valor)
+        if fecha is not None:
+            return timezone.make_aware(datetime.combine(fecha, time.min)), True
+        fecha_hora = parse_datetime(valor)
+    except ValueError:
+        fecha_hora = None
+    if fecha_hora is None:
+        raise ValidationError({nombre: 'Formato inválido. Use YYYY-MM-DD o ISO 8601.'})
+    if timezone.is_naive(fecha_hora):
+        fecha_hora = timezone.make_aware(fecha_hora)
+    return fecha_hora, False
+
+
+def filtrar_por_fechas(queryset, params):
+    """
+    Aplica los filtros 'fecha', 'desde' y 'hasta' como rangos sobre
+    fecha_hora_inicio para que la consulta pueda usar índices.
+    'hasta' con solo fecha incluye el día completo.
+    """
+    fecha = params.get('fecha')
+    if fecha:
+        inicio, _ = parse_fecha_param('fecha', fecha)
+        queryset = queryset.filter(
+            fecha_hora_inicio__gte=inicio,
+            fecha_hora_inicio__lt=inicio + timedelta(days=1)
+        )
+
+    desde = params.get('desde')
+    if desde:
+        inicio, _ = parse_fecha_param('desde', desde)
+        queryset = queryset.filter(fecha_hora_inicio__gte=inicio)
+
+    hasta = params.get('hasta')
+    if hasta:
+        fin, es_fecha = parse_fecha_param('hasta', hasta)
+        if es_fecha:
+            queryset = queryset.filter(fecha_hora_inicio__lt=fin + timedelta(days=1))
+        else:
+            queryset = queryset.filter(fecha_hora_inicio__lte=fin)
+
+    return queryset
+
+
+class ReservaPagination(CursorPagination):
+    """Paginación por cursor sobre (fecha_hora_inicio, id) para reservas"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-fecha_hora_inicio', '-id')
+
+
+# Máximo de días que puede abarcar una consulta de disponibilidad
+MAX_DIAS_DISPONIBILIDAD = 31
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -42,17 +115,33 @@ class ClienteViewSet(viewsets.ModelViewSet):
     serializer_class = ClienteSerializer
     permission_classes = [permissions.IsAdminUser] # Solo Admins
 
-class BotViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        # Contadores anotados: sin ellos el serializer hace un COUNT por cliente
+        return Cliente.objects.with_stats()
+
+class BotViewSet(ETagListadoMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     """ API para Clientes: CRUD de sus Bots """
     serializer_class = BotSerializer
+    listado_rapido = listados.ListadoBots()
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
 
     def get_queryset(self):
+        queryset = Bot.objects.select_related('cliente')
+        campos = self.campos_pedidos()
+        if campos is None or 'servicios' in campos:
+            queryset = queryset.prefetch_related(
+                Prefetch('servicios', queryset=Servicio.objects.order_by('id'))
+            )
         if self.request.user.is_staff:
-            return Bot.objects.all() # Admin ve todo
-        if not hasattr(self.request.user, 'cliente'):
+            return queryset # Admin ve todo
+        cliente_id = cliente_id_de(self.request.user)
+        if cliente_id is None:
             return Bot.objects.none() # Usuario sin cliente no ve nada
-        return Bot.objects.filter(cliente=self.request.user.cliente)
+        return queryset.filter(cliente_id=cliente_id)
+
+    @idempotente
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         # Asegurar que el bot se asigne al cliente autenticado
@@ -65,77 +154,340 @@ class BotViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-class ServicioViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def disponibilidad(self, request, pk=None):
+        """
+        Turnos libres del bot entre 'desde' y 'hasta' (fechas inclusive) para
+        la duración del 'servicio' indicado, o de una hora si no se indica.
+        """
+        bot = self.get_object()
+        params = request.query_params
+
+        hoy = timezone.localdate()
+        desde = hoy
+        if params.get('desde'):
+            desde = timezone.localdate(parse_fecha_param('desde', params['desde'])[0])
+        hasta = desde + timedelta(days=6)
+        if params.get('hasta'):
+            hasta = timezone.localdate(parse_fecha_param('hasta', params['hasta'])[0])
+        if hasta < desde:
+            raise ValidationError({'hasta': 'Debe ser posterior o igual a desde.'})
+        if (hasta - desde).days >= MAX_DIAS_DISPONIBILIDAD:
+            raise ValidationError({'hasta': f'El rango no puede superar {MAX_DIAS_DISPONIBILIDAD} días.'})
+
+        servicio = None
+        duracion = timedelta(hours=1)
+        if params.get('servicio'):
+            try:
+                servicio = bot.servicios.get(pk=params['servicio'])
+            except (Servicio.DoesNotExist, ValueError):
+                raise ValidationError({'servicio': 'Servicio inexistente para este bot.'})
+            duracion = timedelta(minutes=servicio.duracion_minutos)
+
+        turnos = disponibilidad.turnos_libres(bot, desde, hasta, duracion)
+        return Response({
+            'bot': bot.id,
+            'servicio': servicio.id if servicio else None,
+            'duracion_minutos': int(duracion.total_seconds() // 60),
+            'desde': desde,
+            'hasta': hasta,
+            'turnos': [{'inicio': inicio, 'fin': fin} for inicio, fin in turnos],
+        })
+
+    @action(detail=False, methods=['get'], url_path=r'contexto/(?P<phone_id>[^/]+)')
+    def contexto(self, request, phone_id=None):
+        """
+        Contexto compilado del bot para el agente de WhatsApp: prompt,
+        servicios, horarios y status del emprendimiento. Se sirve desde el
+        cache en proceso mientras su versión siga vigente.
+        """
+        entrada = contexto_bot.obtener_contexto(phone_id)
+        if entrada is not None and not request.user.is_staff:
+            if cliente_id_de(request.user) != entrada[1]:
+                entrada = None
+        if entrada is None:
+            return Response({'error': 'Bot no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+        _, _, version, contenido = entrada
+        etag = '"%d.%d"' % version
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(contenido, content_type='application/json')
+        response['ETag'] = etag
+        return response
+
+class ServicioViewSet(ETagListadoMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     """ API para Clientes: CRUD de Servicios """
     serializer_class = ServicioSerializer
+    listado_rapido = listados.ListadoServicios()
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
 
     def get_queryset(self):
         # Filtra por bot, y el bot por cliente
+        queryset = Servicio.objects.select_related('bot').order_by('id')
         if self.request.user.is_staff:
-            return Servicio.objects.all()
-        if not hasattr(self.request.user, 'cliente'):
+            return queryset
+        cliente_id = cliente_id_de(self.request.user)
+        if cliente_id is None:
             return Servicio.objects.none()
-        return Servicio.objects.filter(bot__cliente=self.request.user.cliente)
+        return queryset.filter(bot__cliente_id=cliente_id)
 
     def perform_create(self, serializer):
         # Aquí necesitarías la lógica para asignar a un bot específico
         # Por ahora, lo dejamos así y el frontend debe enviar el bot_id
         serializer.save()
 
-class ReservaViewSet(viewsets.ModelViewSet):
+class ReservaViewSet(ETagListadoMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     """ API para Clientes: CRUD de Reservas """
     serializer_class = ReservaSerializer
+    listado_rapido = listados.ListadoReservas()
+    pagination_class = ReservaPagination
+    # puede_cancelar cambia con la hora aunque no cambien las reservas
+    vigencia_etag = 60
+    columnas_exportacion = [
+        ('id', 'id'), ('bot', 'bot_id'), ('bot_nombre', 'bot__nombre'),
+        ('servicio', 'servicio_id'), ('servicio_nombre', 'servicio__nombre'),
+        ('cliente_nombre', 'cliente__nombre_emprendimiento'),
+        ('cliente_final_nombre', 'cliente_final_nombre'),
+        ('cliente_final_telefono', 'cliente_final_telefono'),
+        ('fecha_hora_inicio', 'fecha_hora_inicio'), ('fecha_hora_fin', 'fecha_hora_fin'),
+        ('estado', 'estado'), ('notas', 'notas'),
+    ]
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
 
     def get_queryset(self):
+        queryset = self.permitidas(Reserva).select_related('servicio', 'bot', 'cliente')
+        return filtrar_por_fechas(queryset, self.request.query_params).order_by('-fecha_hora_inicio', '-id')
+
+    def permitidas(self, modelo):
+        """Bots o reservas del emprendimiento del usuario (todas para un admin)"""
         if self.request.user.is_staff:
-            return Reserva.objects.all()
-        if not hasattr(self.request.user, 'cliente'):
-            return Reserva.objects.none()
+            return modelo.objects.all()
+        cliente_id = cliente_id_de(self.request.user)
+        if cliente_id is None:
+            return modelo.objects.none()
+        return modelo.objects.filter(cliente_id=cliente_id)
 
-        # Filtra por fecha si se provee el query param
-        queryset = Reserva.objects.filter(bot__cliente=self.request.user.cliente)
-        fecha = self.request.query_params.get('fecha', None)
-        if fecha is not None:
-            queryset = queryset.filter(fecha_hora_inicio__date=fecha)
-        return queryset.order_by('-fecha_hora_inicio')
+    @idempotente
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def opcion_lote(self, nombre):
+        return self.request.data.get(nombre) in (True, 'true', '1', 1)
+
+    def items_lote(self, serializer_class):
+        """
+        Valida cada ítem de request.data['reservas']. Retorna los pares
+        (índice, datos) válidos y los errores por índice de los demás.
+        """
+        items = self.request.data.get('reservas') if isinstance(self.request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'reservas': 'Envíe una lista de reservas.'})
+        maximo = getattr(settings, 'RESERVAS_LOTE_MAXIMO', 5000)
+        if len(items) > maximo:
+            raise ValidationError({'reservas': f'El lote no puede superar {maximo} reservas.'})
+
+        validos, errores = [], {}
+        for indice, item in enumerate(items):
+            serializer = serializer_class(data=item)
+            if serializer.is_valid():
+                validos.append((indice, serializer.validated_data))
+            else:
+                errores[indice] = {'errores': serializer.errors}
+        return validos, errores
+
+    def respuesta_lote(self, resultados, hechos, status_exito):
+        """
+        Resultados por ítem ordenados por índice: 'id' si se aplicó o
+        'errores'. Status 207 si el lote se aplicó en parte y 400 si no se
+        aplicó ningún ítem con errores.
+        """
+        aplicados = sum('id' in resultado for resultado in resultados.values())
+        errores = len(resultados) - aplicados
+        if not errores:
+            codigo = status_exito
+        elif aplicados:
+            codigo = status.HTTP_207_MULTI_STATUS
+        else:
+            codigo = status.HTTP_400_BAD_REQUEST
+        return Response({
+            hechos: aplicados,
+            'errores': errores,
+            'resultados': [{'indice': indice, **resultado} for indice, resultado in sorted(resultados.items())],
+        }, status=codigo)
+
+    @action(detail=False, methods=['post', 'patch'])
+    @idempotente
+    def lote(self, request):
+        """
+        Crea (POST) o modifica (PATCH) muchas reservas en una transacción.
+        Cuerpo: {"reservas": [...], "todo_o_nada": false, "verificar_horario": false}.
+        Cada ítem de POST es como el de una reserva individual con bot y
+        servicio como ids; los de PATCH llevan el id de la reserva y los
+        campos a cambiar. Se validan solapamientos y reservas con el mismo
+        inicio contra la base y contra el resto del lote; con
+        verificar_horario (solo POST) también que caigan en el horario del bot.
+        """
+        if request.method == 'PATCH':
+            validos, resultados = self.items_lote(ReservaCambioLoteSerializer)
+            if not (resultados and self.opcion_lote('todo_o_nada')):
+                resultados.update(reservas.modificar_lote(
+                    validos, self.permitidas(Reserva), todo_o_nada=self.opcion_lote('todo_o_nada')
+                ))
+            return self.respuesta_lote(resultados, 'modificadas', status.HTTP_200_OK)
+
+        validos, resultados = self.items_lote(ReservaLoteSerializer)
+        if not (resultados and self.opcion_lote('todo_o_nada')):
+            resultados.update(reservas.crear_lote(
+                validos, self.permitidas(Bot),
+                verificar_horario=self.opcion_lote('verificar_horario'),
+                todo_o_nada=self.opcion_lote('todo_o_nada'),
+            ))
+        return self.respuesta_lote(resultados, 'creadas', status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='lote/cancelar')
+    def cancelar_lote(self, request):
+        """
+        Cancela muchas reservas con una sola escritura: {"ids": [...]} o todas
+        las activas de un bot en un día, {"bot": id, "fecha": "YYYY-MM-DD"}
+        (por ejemplo, por un cierre imprevisto)
+        """
+        serializer = ReservaCancelacionLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+        queryset = self.permitidas(Reserva)
+        ids = datos.get('ids')
+        if ids is not None:
+            canceladas = set(reservas.cancelar_lote(queryset.filter(pk__in=ids)))
+            existentes = set(queryset.filter(pk__in=ids).values_list('pk', flat=True))
+            resultados = {}
+            for indice, pk in enumerate(ids):
+                if pk in canceladas:
+                    resultados[indice] = {'id': pk}
+                    canceladas.discard(pk)
+                elif pk in existentes:
+                    resultados[indice] = {'errores': {'id': 'La reserva no está activa.'}}
+                else:
+                    resultados[indice] = {'errores': {'id': 'Reserva inexistente.'}}
+            return self.respuesta_lote(resultados, 'canceladas', status.HTTP_200_OK)
+
+        inicio = timezone.make_aware(datetime.combine(datos['fecha'], time.min))
+        canceladas = reservas.cancelar_lote(queryset.filter(
+            bot_id=datos['bot'], fecha_hora_inicio__gte=inicio, fecha_hora_inicio__lt=inicio + timedelta(days=1)
+        ))
+        return Response({'canceladas': len(canceladas), 'ids': canceladas})
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Historial completo de reservas (las del cliente, o todas para un admin)
+        en CSV o NDJSON según ?formato=, con los filtros fecha/desde/hasta
+        """
+        queryset = self.get_queryset().order_by('fecha_hora_inicio', 'id')
+        return exportacion.exportar(request, queryset, self.columnas_exportacion, 'reservas')
+
+    @action(detail=False, methods=['get'])
+    def calendario(self, request):
+        """
+        Cantidad de reservas por día y estado de un mes (?mes=YYYY-MM, el
+        actual por defecto; ?bot= opcional), con una consulta agrupada sobre
+        el resumen diario: el costo no depende del historial. Solo se listan
+        los días con reservas; el detalle de un día se pide a
+        reservas/?fecha=YYYY-MM-DD.
+        """
+        mes = request.query_params.get('mes')
+        try:
+            primero = datetime.strptime(mes, '%Y-%m').date() if mes else timezone.localdate().replace(day=1)
+            siguiente = (primero + timedelta(days=31)).replace(day=1)
+        except (ValueError, OverflowError):
+            raise ValidationError({'mes': 'Formato inválido. Use YYYY-MM.'})
+
+        def generar():
+            resumenes = self.permitidas(ResumenReservasDiario).filter(fecha__gte=primero, fecha__lt=siguiente)
+            bot_id = request.query_params.get('bot')
+            if bot_id:
+                if not bot_id.isdigit():
+                    raise ValidationError({'bot': 'Debe ser un id numérico.'})
+                resumenes = resumenes.filter(bot_id=bot_id)
+            dias = resumenes.values('fecha').annotate(
+                confirmadas=Sum('confirmadas'), pendientes=Sum('pendientes'), canceladas=Sum('canceladas'),
+            ).order_by('fecha')
+            return Response({
+                'mes': primero.strftime('%Y-%m'),
+                'dias': [
+                    {**dia, 'total': dia['confirmadas'] + dia['pendientes'] + dia['canceladas']}
+                    for dia in dias
+                ],
+            })
+
+        # Sin ?mes el mes sale de la fecha actual: entra en el ETag para no
+        # servir un 304 del mes anterior después del cambio de mes
+        return self.condicional(request, generar, variante=primero.isoformat())
 
     def perform_create(self, serializer):
-        # Crear reserva con datos adicionales
+        """
+        Crea la reserva con el bot bloqueado y verificando que el intervalo no
+        se solape con otra reserva activa (409 si se solapa). Acepta 'fecha' y
+        'hora' (la duración sale del servicio) o fecha_hora_inicio/fin.
+        """
+        datos = serializer.validated_data
         fecha = self.request.data.get('fecha')
         hora = self.request.data.get('hora')
-        servicio_id = self.request.data.get('servicio')
-        bot_id = self.request.data.get('bot')
-        notas = self.request.data.get('notas', '')
+        servicio = datos.get('servicio')
+        bot = datos.get('bot')
 
-        try:
+        if bot is None:
+            raise ValidationError({'bot': 'Este campo es requerido.'})
+        if not self.request.user.is_staff:
+            cliente_id = cliente_id_de(self.request.user)
+            if cliente_id is None or bot.cliente_id != cliente_id:
+                raise ValidationError({'bot': 'Bot inexistente para este emprendimiento.'})
+        if servicio is not None and servicio.bot_id != bot.id:
+            raise ValidationError({'servicio': 'El servicio no pertenece al bot.'})
+
+        if fecha and hora:
             # Combinar fecha y hora
-            fecha_hora = datetime.strptime(f"{fecha} {hora}", "%Y-%m-%d %H:%M")
+            try:
+                fecha_hora = datetime.strptime(f"{fecha} {hora}", "%Y-%m-%d %H:%M")
+            except ValueError:
+                raise ValidationError({'hora': 'Formato inválido. Use fecha YYYY-MM-DD y hora HH:MM.'})
+            if servicio is None:
+                raise ValidationError({'servicio': 'Este campo es requerido.'})
             fecha_hora_inicio = timezone.make_aware(fecha_hora)
-            
-            # Obtener servicio para calcular duración (asumimos 1 hora por defecto)
-            servicio = Servicio.objects.get(id=servicio_id)
-            fecha_hora_fin = fecha_hora_inicio + timedelta(hours=1)
-            
-            # Obtener bot
-            bot = Bot.objects.get(id=bot_id, cliente=self.request.user.cliente)
-            
+            fecha_hora_fin = fecha_hora_inicio + timedelta(minutes=servicio.duracion_minutos)
+        else:
+            fecha_hora_inicio = datos.get('fecha_hora_inicio')
+            fecha_hora_fin = datos.get('fecha_hora_fin')
+            if fecha_hora_inicio is None or fecha_hora_fin is None:
+                raise ValidationError({'fecha_hora_inicio': 'Indique fecha y hora o fecha_hora_inicio y fecha_hora_fin.'})
+        if fecha_hora_fin <= fecha_hora_inicio:
+            raise ValidationError({'fecha_hora_fin': 'Debe ser posterior a fecha_hora_inicio.'})
+
+        estado = datos.get('estado', 'Confirmada')
+        with reservas.reserva_exclusiva(bot.id, fecha_hora_inicio, fecha_hora_fin, estado):
             serializer.save(
-                bot=bot,
-                servicio=servicio,
                 fecha_hora_inicio=fecha_hora_inicio,
                 fecha_hora_fin=fecha_hora_fin,
-                cliente_final_nombre="Cliente Web",  # Por ahora un valor por defecto
-                cliente_final_telefono="000000000",  # Por ahora un valor por defecto
-                estado="Confirmada"
-            )
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
+                cliente_final_nombre=datos.get('cliente_final_nombre') or "Cliente Web",
+                cliente_final_telefono=datos.get('cliente_final_telefono') or "000000000",
+                estado=estado
             )
 
+    def perform_update(self, serializer):
+        """Actualiza la reserva verificando solapamientos con el bot bloqueado"""
+        instance = serializer.instance
+        datos = serializer.validated_data
+        bot = datos.get('bot', instance.bot)
+        inicio = datos.get('fecha_hora_inicio', instance.fecha_hora_inicio)
+        fin = datos.get('fecha_hora_fin', instance.fecha_hora_fin)
+        estado = datos.get('estado', instance.estado)
+        if fin <= inicio:
+            raise ValidationError({'fecha_hora_fin': 'Debe ser posterior a fecha_hora_inicio.'})
+
+        with reservas.reserva_exclusiva(bot.id, inicio, fin, estado, excluir=instance.pk):
+            serializer.save()
+
     def partial_update(self, request, *args, **kwargs):
         """Actualización parcial para cancelar reservas"""
         instance = self.get_object()
@@ -143,8 +495,12 @@ class ReservaViewSet(viewsets.ModelViewSet):
         # Solo permitir cambio de estado
         if 'estado' in request.data:
             instance.estado = request.data['estado']
-            instance.save()
+            with reservas.reserva_exclusiva(
+                instance.bot_id, instance.fecha_hora_inicio, instance.fecha_hora_fin,
+                instance.estado, excluir=instance.pk
+            ):
+                instance.save()
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
         
-        return super().partial_update(request, *args, **kwargs)
\ No newline at end of file
+        return super().partial_update(request, *args, **kwargs)
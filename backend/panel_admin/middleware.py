@@ -0,0 +1,92 @@
+# panel_admin/middleware.py
+"""
+Instrumentación de cada request con el header Server-Timing.
+
+Registra el tiempo total, la cantidad y el tiempo de las consultas SQL (con
+connection.execute_wrapper), el tiempo de serialización y el de render (ver
+core/medicion.py), los agrega como Server-Timing y escribe una línea JSON
+por request en el logger 'panel_admin.requests' (nivel INFO). Si el request
+supera SLOW_REQUEST_MS la línea sale como WARNING e incluye sus consultas.
+Las mismas mediciones alimentan las métricas agregadas de core/metricas.py.
+Con REQUEST_TIMING_ENABLED = False no se instrumenta el SQL ni se agrega
+el header, pero las métricas siguen registrando status y latencia.
+
+El costo por request son unos pocos perf_counter() por consulta; el JSON
+solo se arma si el logger lo va a escribir.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from core import medicion, metricas
+
+logger = logging.getLogger('panel_admin.requests')
+
+
+class ServerTimingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'REQUEST_TIMING_ENABLED', True):
+            inicio = time.perf_counter()
+            response = self.get_response(request)
+            self.observar(request, response, time.perf_counter() - inicio, None)
+            return response
+
+        umbral = getattr(settings, 'SLOW_REQUEST_MS', None)
+        with medicion.medir(medicion.Medicion(guardar_sql=umbral is not None)) as actual:
+            with ExitStack() as wrappers:
+                for alias in connections:
+                    wrappers.enter_context(connections[alias].execute_wrapper(actual.ejecutar))
+                response = self.get_response(request)
+        actual.terminar()
+
+        self.observar(request, response, actual.total, actual.consultas)
+        response['Server-Timing'] = actual.server_timing()
+        lento = umbral is not None and actual.total * 1000 >= umbral
+        if lento:
+            registro = self.registro(request, response, actual)
+            registro['sql'] = [
+                {'sql': sql, 'ms': round(duracion * 1000, 2)} for sql, duracion in actual.sql
+            ]
+            logger.warning(json.dumps(registro))
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(self.registro(request, response, actual)))
+        return response
+
+    def observar(self, request, response, duracion, consultas):
+        coincidencia = request.resolver_match
+        metricas.registro.observar(
+            coincidencia.view_name if coincidencia else None,
+            request.method, response.status_code, duracion, consultas,
+        )
+
+    def process_template_response(self, request, response):
+        """Mide el render de las respuestas de DRF, que ocurre después de la vista"""
+        actual = medicion.actual()
+        if actual is not None:
+            inicio = time.perf_counter()
+
+            def renderizada(response):
+                actual.render += time.perf_counter() - inicio
+
+            response.add_post_render_callback(renderizada)
+        return response
+
+    def registro(self, request, response, actual):
+        coincidencia = request.resolver_match
+        return {
+            'method': request.method,
+            'path': request.path,
+            'view': coincidencia.view_name if coincidencia else None,
+            'status': response.status_code,
+            'total_ms': round(actual.total * 1000, 2),
+            'db_ms': round(actual.tiempo_sql * 1000, 2),
+            'queries': actual.consultas,
+            'serializer_ms': round(actual.serializacion * 1000, 2),
+            'render_ms': round(actual.render * 1000, 2),
+        }
@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero, para que el tiempo total incluya al resto de los middlewares
+    'panel_admin.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -83,6 +85,15 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Escrituras concurrentes (reservas): core.reservas.bloquear_bots toma
+        # el lock de escritura al empezar y los demás esperan hasta `timeout`
+        'OPTIONS': {
+            'timeout': 20,
+        },
+        # Base de tests en archivo para que los tests con hilos compartan datos
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -131,7 +142,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Configuración de DRF (Django Rest Framework)
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.TenantJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -142,10 +153,79 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    # Los tokens llevan cliente_id, is_staff y dashboard_type
+    'TOKEN_OBTAIN_SERIALIZER': 'core.tokens.TenantTokenObtainPairSerializer',
+    # Rechaza refresh tokens revocados por logout
+    'TOKEN_REFRESH_SERIALIZER': 'core.tokens.TenantTokenRefreshSerializer',
 }
 
+# Filtro de Bloom por proceso delante de la tabla de tokens revocados
+JWT_REVOCATION_BLOOM_BITS = 1 << 20
+JWT_REVOCATION_BLOOM_HASHES = 7
+JWT_REVOCATION_BLOOM_REFRESH = timedelta(seconds=30)
+
 # Configuración de CORS (para permitir que el frontend hable con el backend)
 CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5500",
     "http://localhost:5500",
-]
\ No newline at end of file
+]
+# Tiempo durante el cual se reenvía la respuesta de un Idempotency-Key
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+# Cantidad de contextos de bot compilados que guarda cada proceso
+BOT_CONTEXT_CACHE_SIZE = 1024
+
+# Filas por lote al leer y escribir las exportaciones CSV/NDJSON
+EXPORT_CHUNK_SIZE = 2000
+
+# Máximo de ítems por petición en los endpoints de reservas por lote
+RESERVAS_LOTE_MAXIMO = 5000
+
+# Instrumentación por request (panel_admin/middleware.py): header
+# Server-Timing y una línea JSON por request en 'panel_admin.requests'
+# (subir el logger a INFO para verlas). Con SLOW_REQUEST_MS en
+# milisegundos los requests más lentos se registran como WARNING con su SQL.
+# Desactivada, las métricas registran status y latencia pero no consultas.
+REQUEST_TIMING_ENABLED = True
+SLOW_REQUEST_MS = None
+
+# Métricas por vista en /api/metrics/ (core/metricas.py). Con varios
+# procesos del mismo host, METRICS_DIR es un directorio compartido donde
+# cada uno vuelca su estado cada METRICS_FLUSH_SECONDS; los archivos de
+# procesos terminados se eliminan en el scrape.
+METRICS_DIR = None
+METRICS_FLUSH_SECONDS = 5
+METRICS_MAX_SERIES = 500
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'panel_admin.requests': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Cache de respuestas de dashboard (core/cache_respuestas.py). Puede ser
+    # 'django.core.cache.backends.filebased.FileBasedCache' con LOCATION un
+    # directorio, o 'django.core.cache.backends.db.DatabaseCache' con LOCATION
+    # una tabla creada con `manage.py createcachetable`.
+    'respuestas': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'respuestas',
+    },
+}
+
+# Alias de CACHES y TTL en segundos por vista del cache de respuestas
+RESPONSE_CACHE_ALIAS = 'respuestas'
+RESPONSE_CACHE_TTLS = {
+    'dashboard_config': 300,
+    'emprendimiento_dashboard_stats': 60,
+    'emprendimientos_stats': 120,
+}
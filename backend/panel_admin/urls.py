@@ -41,4 +41,5 @@ def home_view(request):
 urlpatterns = [
     path('', home_view, name='home'),
     path('admin/', admin.site.urls),
+    path('api/', include('core.urls')),
 ]
\ No newline at end of file
@@ -8,6 +8,8 @@ const appState = {
     bots: [],
     reservations: [],
     services: [],
+    // Conteos por día del mes visible: { 'YYYY-MM-DD': { confirmadas, pendientes, canceladas, total } }
+    calendarDays: {},
     currentDate: new Date()
 };
 
@@ -25,12 +27,10 @@ async function initializeApp() {
     }
 
     try {
-        // Verificar si el token es válido
-        const userData = await fetchUserData();
-        if (userData) {
-            appState.currentUser = userData;
+        // Verificar el token cargando los datos iniciales en una sola petición
+        if (await loadInitialData()) {
             showDashboard();
-            await loadInitialData();
+            renderInitialData();
             setupEventListeners();
         } else {
             showLogin();
@@ -82,11 +82,9 @@ async function handleLogin(event) {
             localStorage.setItem('accessToken', data.access);
             localStorage.setItem('refreshToken', data.refresh);
             
-            const userData = await fetchUserData();
-            appState.currentUser = userData;
-            
-            showDashboard();
             await loadInitialData();
+            showDashboard();
+            renderInitialData();
             setupEventListeners();
             
             errorDiv.classList.add('hidden');
@@ -103,11 +101,24 @@ async function handleLogin(event) {
 }
 
 function logout() {
+    // Revoca los tokens en el servidor; el estado local se limpia igual
+    const token = localStorage.getItem('accessToken');
+    if (token) {
+        fetch(`${API_BASE_URL}dashboard/logout/`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${token}`
+            },
+            body: JSON.stringify({ refresh: localStorage.getItem('refreshToken') })
+        }).catch(() => {});
+    }
     localStorage.removeItem('accessToken');
     localStorage.removeItem('refreshToken');
     appState.currentUser = null;
     appState.bots = [];
     appState.reservations = [];
+    appState.calendarDays = {};
     showLogin();
 }
 
@@ -163,35 +174,36 @@ async function refreshToken() {
     return false;
 }
 
-async function fetchUserData() {
-    try {
-        const response = await fetchWithAuth('me/');
-        if (response.ok) {
-            return await response.json();
-        }
-    } catch (error) {
-        console.error('Error al obtener datos del usuario:', error);
-    }
-    return null;
-}
-
 // ===== CARGA INICIAL DE DATOS =====
 async function loadInitialData() {
+    // Usuario, bots, servicios y reservas del calendario en una sola petición
     try {
-        await Promise.all([
-            loadBots(),
-            loadReservations(),
-            loadServices(),
-            updateDashboardStats()
-        ]);
+        const { desde, hasta } = getCalendarRange();
+        const response = await fetchWithAuth(
+            `dashboard/bootstrap/?secciones=me,bots,servicios,reservas&desde=${desde}&hasta=${hasta}&page_size=500`
+        );
+        if (!response.ok) return false;
         
-        // Renderizar secciones iniciales
-        renderBotsSection();
-        renderCalendar();
-        renderReservationsTable();
+        const data = await response.json();
+        appState.currentUser = data.me;
+        appState.bots = data.bots;
+        appState.services = data.servicios;
+        [appState.reservations] = await Promise.all([
+            fetchReservationPages(data.reservas),
+            loadCalendarSummary()
+        ]);
+        return true;
     } catch (error) {
         console.error('Error al cargar datos iniciales:', error);
     }
+    return false;
+}
+
+function renderInitialData() {
+    updateDashboardStats();
+    renderBotsSection();
+    renderCalendar();
+    renderReservationsTable();
 }
 
 async function loadBots() {
@@ -205,17 +217,64 @@ async function loadBots() {
     }
 }
 
+// Rango de fechas visible en el calendario (6 semanas desde el domingo previo al día 1)
+function getCalendarRange() {
+    const year = appState.currentDate.getFullYear();
+    const month = appState.currentDate.getMonth();
+    const firstDay = new Date(year, month, 1);
+    const start = new Date(firstDay);
+    start.setDate(start.getDate() - firstDay.getDay());
+    const end = new Date(start);
+    end.setDate(end.getDate() + 41);
+    return {
+        desde: start.toISOString().split('T')[0],
+        hasta: end.toISOString().split('T')[0]
+    };
+}
+
 async function loadReservations() {
+    // Carga solo el rango visible del calendario siguiendo el cursor de paginación
+    try {
+        const { desde, hasta } = getCalendarRange();
+        appState.reservations = await fetchReservationPages(
+            { results: [], next: `reservas/?desde=${desde}&hasta=${hasta}&page_size=500` }
+        );
+    } catch (error) {
+        console.error('Error al cargar reservas:', error);
+    }
+}
+
+// Conteos por día y estado del mes visible, sin traer las reservas
+async function loadCalendarSummary() {
     try {
-        const response = await fetchWithAuth('reservas/');
+        const year = appState.currentDate.getFullYear();
+        const month = String(appState.currentDate.getMonth() + 1).padStart(2, '0');
+        const response = await fetchWithAuth(`reservas/calendario/?mes=${year}-${month}`);
         if (response.ok) {
-            appState.reservations = await response.json();
+            const data = await response.json();
+            appState.calendarDays = Object.fromEntries(data.dias.map(dia => [dia.fecha, dia]));
         }
     } catch (error) {
-        console.error('Error al cargar reservas:', error);
+        console.error('Error al cargar el calendario:', error);
     }
 }
 
+// Junta los resultados de una página de reservas y de las siguientes
+async function fetchReservationPages(page) {
+    const reservations = [...page.results];
+    let url = page.next;
+    
+    while (url) {
+        const response = await fetchWithAuth(url);
+        if (!response.ok) break;
+        const nextPage = await response.json();
+        reservations.push(...nextPage.results);
+        url = nextPage.next;
+    }
+    
+    return reservations;
+}
+
 async function loadServices() {
     try {
         const response = await fetchWithAuth('servicios/');
@@ -523,7 +582,8 @@ function renderCalendar() {
             const cellDate = new Date(currentWeekDate);
             const isCurrentMonth = cellDate.getMonth() === month;
             const isToday = isDateToday(cellDate);
-            const hasEvents = hasReservationsOnDate(cellDate);
+            const dateKey = toDateKey(cellDate);
+            const hasEvents = hasReservationsOnDate(dateKey);
             
             let cellClass = '';
             if (isToday) cellClass += ' today';
@@ -531,7 +591,7 @@ function renderCalendar() {
             if (!isCurrentMonth) cellClass += ' other-month';
             
             calendarHTML += `
-                <td class="${cellClass}" data-date="${cellDate.toISOString().split('T')[0]}" onclick="selectCalendarDate('${cellDate.toISOString().split('T')[0]}')">
+                <td class="${cellClass}" data-date="${dateKey}" onclick="selectCalendarDate('${dateKey}')">
                     ${cellDate.getDate()}
                     ${hasEvents ? '<div class="event-indicator"></div>' : ''}
                 </td>
@@ -548,27 +608,28 @@ function renderCalendar() {
     calendarContainer.innerHTML = calendarHTML;
 }
 
-function navigateMonth(direction) {
+async function navigateMonth(direction) {
     appState.currentDate.setMonth(appState.currentDate.getMonth() + direction);
+    await Promise.all([loadCalendarSummary(), loadReservations()]);
     renderCalendar();
+    renderReservationsTable();
 }
 
-function hasReservationsOnDate(date) {
-    const dateString = date.toISOString().split('T')[0];
-    return appState.reservations.some(reservation => {
-        const reservationDate = new Date(reservation.fecha_hora_inicio).toISOString().split('T')[0];
-        return reservationDate === dateString && reservation.estado !== 'Cancelada';
-    });
+// Reservas activas en el día según el resumen del mes
+function hasReservationsOnDate(dateKey) {
+    const day = appState.calendarDays[dateKey];
+    return Boolean(day) && day.confirmadas + day.pendientes > 0;
 }
 
-function selectCalendarDate(dateString) {
-    const selectedDate = new Date(dateString);
-    const reservationsOnDate = appState.reservations.filter(reservation => {
-        const reservationDate = new Date(reservation.fecha_hora_inicio).toISOString().split('T')[0];
-        return reservationDate === dateString;
-    });
+async function selectCalendarDate(dateString) {
+    const selectedDate = new Date(`${dateString}T00:00:00`);
+    const day = appState.calendarDays[dateString];
     
-    if (reservationsOnDate.length > 0) {
+    if (day && day.total > 0) {
+        // El detalle del día se pide recién al seleccionarlo
+        const reservationsOnDate = await fetchReservationPages(
+            { results: [], next: `reservas/?fecha=${dateString}&page_size=500` }
+        );
         // Mostrar reservas del día
         showDayReservations(selectedDate, reservationsOnDate);
     } else {
@@ -695,7 +756,7 @@ async function handleReservationForm(event) {
         
         if (response.ok) {
             hideModal(document.getElementById('reservation-modal'));
-            await loadReservations();
+            await Promise.all([loadReservations(), loadCalendarSummary()]);
             renderReservationsTable();
             renderCalendar();
             updateDashboardStats();
@@ -723,7 +784,7 @@ async function cancelReservation(reservationId) {
         });
         
         if (response.ok) {
-            await loadReservations();
+            await Promise.all([loadReservations(), loadCalendarSummary()]);
             renderReservationsTable();
             renderCalendar();
             updateDashboardStats();
@@ -836,6 +897,13 @@ function formatTime(dateString) {
     }).format(date);
 }
 
+// Fecha local 'YYYY-MM-DD', como las fechas del resumen diario
+function toDateKey(date) {
+    const month = String(date.getMonth() + 1).padStart(2, '0');
+    const day = String(date.getDate()).padStart(2, '0');
+    return `${date.getFullYear()}-${month}-${day}`;
+}
+
 function isDateToday(date) {
     const today = new Date();
     return date.toDateString() === today.toDateString();
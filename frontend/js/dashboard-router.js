@@ -56,23 +56,26 @@ async function initializeDashboardRouter() {
     }
 }
 
+// Solo la sección de configuración de los datos iniciales del dashboard
+const DASHBOARD_CONFIG_URL = '/api/dashboard/bootstrap/?secciones=config';
+
 /**
  * Obtiene la configuración del dashboard desde el servidor
  */
 async function getDashboardConfiguration() {
     try {
-        const response = await fetchWithAuthRouter('/api/dashboard/config/');
+        const response = await fetchWithAuthRouter(DASHBOARD_CONFIG_URL);
         
         if (response.ok) {
-            return await response.json();
+            return (await response.json()).config;
         } else if (response.status === 401) {
             // Token expirado, intentar refrescar
             const refreshed = await refreshAuthToken();
             if (refreshed) {
                 // Reintentar
-                const retryResponse = await fetchWithAuthRouter('/api/dashboard/config/');
+                const retryResponse = await fetchWithAuthRouter(DASHBOARD_CONFIG_URL);
                 if (retryResponse.ok) {
-                    return await retryResponse.json();
+                    return (await retryResponse.json()).config;
                 }
             }
         }
@@ -178,7 +181,10 @@ async function handleDashboardLogout() {
         console.log('🚪 Cerrando sesión...');
         
         // Intentar logout en el servidor
-        await fetchWithAuthRouter('/api/dashboard/logout/', { method: 'POST' });
+        await fetchWithAuthRouter('/api/dashboard/logout/', {
+            method: 'POST',
+            body: JSON.stringify({ refresh: localStorage.getItem('refreshToken') })
+        });
         
         // Limpiar estado local
         localStorage.removeItem('accessToken');